@@ -159,7 +159,29 @@ class TRGPTApp:
             async def shutdown():
                 """應用程式關閉時執行"""
                 logger.info("應用程式正在關閉...")
-                # 這裡可以添加清理邏輯
+                # 先等背景對話寫入完成，其產生的稽核記錄才會被下方一併寫出
+                try:
+                    from domain.services.conversation_service import ConversationService
+                    await self.container.get(ConversationService).wait_pending_writes()
+                except Exception as e:
+                    logger.warning("等待背景對話寫入失敗: %s", e)
+                try:
+                    from domain.services.audit_service import AuditService
+                    await self.container.get(AuditService).aclose()
+                except Exception as e:
+                    logger.warning("寫出本地稽核記錄失敗: %s", e)
+                # IT 服務僅在處理過 IT 請求後才會建立；未建立時不為了關閉而建立
+                from features.it_support.service import ITSupportService
+                it_service = self.container.get_if_created(ITSupportService)
+                if it_service is not None:
+                    try:
+                        await it_service.asana.aclose()
+                    except Exception as e:
+                        logger.warning("關閉 Asana 連線失敗: %s", e)
+                    try:
+                        await it_service.email_notifier.aclose()
+                    except Exception as e:
+                        logger.warning("關閉 SMTP 連線失敗: %s", e)
                 logger.info("應用程式已關閉")
             
         except Exception as e:
@@ -31,6 +31,7 @@ class OpenAIConfig:
     max_tokens: int
     temperature: float
     timeout: int
+    context_window: int = 128000  # 模型上下文視窗（tokens），用於限制對話上下文長度
 
 
 @dataclass
@@ -48,6 +49,8 @@ class S3Config:
     secret_key: str
     bucket_name: str
     region: str
+    upload_concurrency: int = 8  # 批次上傳稽核日誌時的最大並行數
+    kms_key_id: str = ""  # 設定後稽核日誌改以 gzip + SSE-KMS 上傳，取代密碼 zip
 
 
 @dataclass
@@ -56,6 +59,7 @@ class GraphAPIConfig:
     tenant_id: str
     client_id: str
     client_secret: str
+    max_concurrency: int = 16  # 同時進行中的 Graph 請求上限，避免尖峰時被節流（429）
 
 
 @dataclass
@@ -156,7 +160,8 @@ class AppConfig:
                 vision_model=os.getenv("OPENAI_VISION_MODEL", "gpt-4o"),
                 max_tokens=int(os.getenv("MAX_TOKENS", "4000")),
                 temperature=float(os.getenv("TEMPERATURE", "0.7")),
-                timeout=int(os.getenv("OPENAI_TIMEOUT", "30"))
+                timeout=int(os.getenv("OPENAI_TIMEOUT", "30")),
+                context_window=int(os.getenv("OPENAI_CONTEXT_WINDOW", "128000"))
             ),
             
             database=DatabaseConfig(
@@ -168,13 +173,16 @@ class AppConfig:
                 access_key=os.getenv("AWS_ACCESS_KEY", ""),
                 secret_key=os.getenv("AWS_SECRET_KEY", ""),
                 bucket_name=os.getenv("S3_BUCKET_NAME", ""),
-                region=os.getenv("S3_REGION", "ap-northeast-1")
+                region=os.getenv("S3_REGION", "ap-northeast-1"),
+                upload_concurrency=int(os.getenv("S3_UPLOAD_CONCURRENCY", "8")),
+                kms_key_id=os.getenv("S3_KMS_KEY_ID", "")
             ),
             
             graph_api=GraphAPIConfig(
                 tenant_id=os.getenv("TENANT_ID", ""),
                 client_id=os.getenv("CLIENT_ID", ""),
-                client_secret=os.getenv("CLIENT_SECRET", "")
+                client_secret=os.getenv("CLIENT_SECRET", ""),
+                max_concurrency=int(os.getenv("GRAPH_MAX_CONCURRENCY", "16"))
             ),
             
             tasks=TaskConfig(
@@ -216,6 +216,15 @@ class Container:
                 f"創建 {implementation.__name__} 實例失敗: {str(e)}"
             ) from e
     
+    def get_if_created(self, service_type: Type[T]) -> Optional[T]:
+        """取得已建立的服務實例；尚未建立時回傳 None，不會觸發建立（供關閉時釋放資源使用）"""
+        descriptor = self._services.get(service_type)
+        if descriptor is not None and descriptor.instance is not None:
+            return descriptor.instance
+        if service_type in self._singletons:
+            return self._singletons[service_type]
+        return self._scoped_instances.get(service_type)
+    
     def clear_scoped(self):
         """清除作用域實例 (在請求結束時調用)"""
         self._scoped_instances.clear()
@@ -15,7 +15,7 @@ class ConversationState(Enum):
     ARCHIVED = "archived"
 
 
-@dataclass
+@dataclass(slots=True)
 class ConversationMessage:
     """對話訊息"""
     role: MessageRole
@@ -7,7 +7,7 @@ from typing import Optional, Dict, Any
 from botbuilder.schema import ConversationReference
 
 
-@dataclass
+@dataclass(slots=True)
 class UserProfile:
     """用戶資料"""
     email: str
@@ -51,7 +51,7 @@ class UserProfile:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class UserSession:
     """用戶會話"""
     user_mail: str
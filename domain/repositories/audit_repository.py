@@ -1,8 +1,10 @@
 """
 稽核日誌 Repository
 """
+import heapq
 from abc import ABC, abstractmethod
-from typing import List, Optional, Dict, Any
+from operator import attrgetter
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
 
 from domain.models.audit import AuditLog, AuditLogEntry, MessageRole
@@ -33,9 +35,14 @@ class AuditRepository(ABC):
     @abstractmethod
     async def get_entries_by_conversation(
         self, 
-        conversation_id: str
+        conversation_id: str,
+        limit: Optional[int] = None,
+        before_ts: Optional[datetime] = None
     ) -> List[AuditLogEntry]:
-        """根據對話 ID 獲取稽核條目"""
+        """根據對話 ID 獲取稽核條目（時間舊到新）
+
+        指定 limit 時只回傳 before_ts 之前最新的 limit 筆，供分頁往前翻閱。
+        """
         pass
     
     @abstractmethod
@@ -70,6 +77,42 @@ class AuditRepository(ABC):
     async def export_user_logs(self, user_mail: str) -> List[Dict[str, Any]]:
         """匯出用戶稽核日誌"""
         pass
+    
+    @abstractmethod
+    async def search(
+        self,
+        user_mail: Optional[str] = None,
+        conversation_id: Optional[str] = None,
+        role: Optional[MessageRole] = None,
+        keyword: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        limit: int = 100
+    ) -> List[AuditLogEntry]:
+        """依條件搜尋稽核條目，依時間新到舊排序並最多回傳 limit 筆"""
+        pass
+    
+    @abstractmethod
+    async def get_user_log_meta(self, user_mail: str) -> Tuple[int, Optional[datetime]]:
+        """只取得用戶日誌的 (條目數, 最後更新時間)，不載入條目內容"""
+        pass
+    
+    @abstractmethod
+    async def get_user_log_summaries_bulk(
+        self, 
+        user_mails: List[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """一次取得多位用戶的日誌投影 {user_mail: {"total_entries", "last_updated"}}"""
+        pass
+    
+    @abstractmethod
+    async def get_recent_counts_bulk(
+        self, 
+        user_mails: List[str], 
+        since: datetime
+    ) -> Dict[str, int]:
+        """一次取得多位用戶在指定時間後的條目數"""
+        pass
 
 
 class InMemoryAuditRepository(AuditRepository):
@@ -78,6 +121,8 @@ class InMemoryAuditRepository(AuditRepository):
     def __init__(self):
         self._user_logs: Dict[str, AuditLog] = {}
         self._entry_counter = 0
+        # entry.id -> 小寫內容，寫入時建立一次，關鍵字搜尋不必逐筆 lower()
+        self._content_lower: Dict[str, str] = {}
     
     async def create_entry(
         self, 
@@ -111,6 +156,7 @@ class InMemoryAuditRepository(AuditRepository):
         
         # 添加條目
         self._user_logs[user_mail].add_entry(entry)
+        self._content_lower[entry_id] = content.lower()
         
         return entry
     
@@ -120,18 +166,26 @@ class InMemoryAuditRepository(AuditRepository):
     
     async def get_entries_by_conversation(
         self, 
-        conversation_id: str
+        conversation_id: str,
+        limit: Optional[int] = None,
+        before_ts: Optional[datetime] = None
     ) -> List[AuditLogEntry]:
         """根據對話 ID 獲取稽核條目"""
-        entries = []
+        entries = (
+            e
+            for user_log in self._user_logs.values()
+            for e in user_log.entries
+            if e.conversation_id == conversation_id
+            and (before_ts is None or e.timestamp < before_ts)
+        )
         
-        for user_log in self._user_logs.values():
-            conversation_entries = user_log.get_entries_by_conversation(conversation_id)
-            entries.extend(conversation_entries)
+        if limit is None:
+            return sorted(entries, key=attrgetter("timestamp"))
         
-        # 按時間排序
-        entries.sort(key=lambda x: x.timestamp)
-        return entries
+        # 只保留最新的 limit 筆，再轉回時間舊到新
+        page = heapq.nlargest(limit, entries, key=attrgetter("timestamp"))
+        page.reverse()
+        return page
     
     async def get_entries_by_user_after(
         self, 
@@ -155,6 +209,9 @@ class InMemoryAuditRepository(AuditRepository):
         if not user_log:
             return 0
         
+        removed_ids = [e.id for e in user_log.entries if e.timestamp < before_timestamp]
+        for entry_id in removed_ids:
+            self._content_lower.pop(entry_id, None)
         return user_log.clear_entries_before(before_timestamp)
     
     async def get_all_users_with_logs(self) -> List[str]:
@@ -198,6 +255,80 @@ class InMemoryAuditRepository(AuditRepository):
         
         return [entry.to_dict() for entry in user_log.entries]
     
+    async def search(
+        self,
+        user_mail: Optional[str] = None,
+        conversation_id: Optional[str] = None,
+        role: Optional[MessageRole] = None,
+        keyword: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        limit: int = 100
+    ) -> List[AuditLogEntry]:
+        """依條件搜尋稽核條目"""
+        if conversation_id:
+            entries = await self.get_entries_by_conversation(conversation_id)
+            if user_mail:
+                entries = [e for e in entries if e.user_mail == user_mail]
+        elif user_mail:
+            user_log = self._user_logs.get(user_mail)
+            entries = user_log.entries if user_log else []
+        else:
+            entries = (e for user_log in self._user_logs.values() for e in user_log.entries)
+        
+        keyword_lower = keyword.lower() if keyword else None
+        content_lower = self._content_lower
+        
+        def _match(e: AuditLogEntry) -> bool:
+            if role and e.role != role:
+                return False
+            if date_from and e.timestamp < date_from:
+                return False
+            if date_to and e.timestamp > date_to:
+                return False
+            if keyword_lower and keyword_lower not in (content_lower.get(e.id) or e.content.lower()):
+                return False
+            return True
+        
+        # 單次走訪套用所有條件，並只保留最新的 limit 筆，不必整批排序
+        return heapq.nlargest(limit, (e for e in entries if _match(e)), key=attrgetter("timestamp"))
+    
+    async def get_user_log_summaries_bulk(
+        self, 
+        user_mails: List[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """一次取得多位用戶的日誌投影（僅筆數與最後更新時間）"""
+        summaries = {}
+        for user_mail in user_mails:
+            total_entries, last_updated = await self.get_user_log_meta(user_mail)
+            summaries[user_mail] = {
+                "total_entries": total_entries,
+                "last_updated": last_updated,
+            }
+        return summaries
+    
+    async def get_user_log_meta(self, user_mail: str) -> Tuple[int, Optional[datetime]]:
+        """只取得用戶日誌的 (條目數, 最後更新時間)"""
+        user_log = self._user_logs.get(user_mail)
+        if not user_log:
+            return 0, None
+        return len(user_log.entries), user_log.last_updated
+    
+    async def get_recent_counts_bulk(
+        self, 
+        user_mails: List[str], 
+        since: datetime
+    ) -> Dict[str, int]:
+        """一次取得多位用戶在指定時間後的條目數"""
+        counts = {}
+        for user_mail in user_mails:
+            user_log = self._user_logs.get(user_mail)
+            counts[user_mail] = (
+                sum(1 for entry in user_log.entries if entry.timestamp > since)
+                if user_log else 0
+            )
+        return counts
+    
     async def get_logs_for_upload(self) -> Dict[str, AuditLog]:
         """獲取需要上傳的日誌（所有日誌）"""
         return self._user_logs.copy()
@@ -206,5 +337,7 @@ class InMemoryAuditRepository(AuditRepository):
         """清除已上傳的日誌"""
         for user_mail in user_mails:
             if user_mail in self._user_logs:
+                for entry in self._user_logs[user_mail].entries:
+                    self._content_lower.pop(entry.id, None)
                 self._user_logs[user_mail].entries.clear()
                 self._user_logs[user_mail].last_updated = get_taiwan_time()
\ No newline at end of file
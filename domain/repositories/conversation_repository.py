@@ -3,10 +3,10 @@
 """
 import logging
 from abc import ABC, abstractmethod
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
 
-from domain.models.conversation import Conversation, ConversationMessage, MessageRole
+from domain.models.conversation import Conversation, ConversationMessage, ConversationState, MessageRole
 from shared.exceptions import RepositoryError, NotFoundError
 from shared.utils.helpers import generate_id, get_taiwan_time
 
@@ -46,6 +46,15 @@ class ConversationRepository(ABC):
         """更新對話狀態"""
         pass
     
+    @abstractmethod
+    async def get_recent_messages(
+        self, 
+        conversation_id: str, 
+        limit: int
+    ) -> List[ConversationMessage]:
+        """只取得對話最新的 limit 則訊息（時間舊到新），對話不存在時回傳空列表"""
+        pass
+    
     @abstractmethod
     async def add_message(
         self, 
@@ -55,6 +64,15 @@ class ConversationRepository(ABC):
         """向對話添加訊息"""
         pass
     
+    @abstractmethod
+    async def add_messages(
+        self, 
+        conversation_id: str, 
+        messages: List[ConversationMessage]
+    ) -> Optional[Conversation]:
+        """一次向對話添加多則訊息"""
+        pass
+    
     @abstractmethod
     async def update(self, conversation: Conversation) -> Conversation:
         """更新對話記錄"""
@@ -88,6 +106,23 @@ class ConversationRepository(ABC):
     async def clean_old_conversations(self, before_date: datetime) -> int:
         """清理舊對話"""
         pass
+    
+    @abstractmethod
+    async def search_by_keyword(
+        self, 
+        user_mail: str, 
+        keyword: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        limit: Optional[int] = None
+    ) -> List[Conversation]:
+        """依關鍵字（不分大小寫）與建立時間範圍搜尋用戶對話，依最後更新時間新到舊排序"""
+        pass
+    
+    @abstractmethod
+    async def get_stats(self, user_mail: str, since: datetime) -> Dict[str, int]:
+        """一次彙總用戶對話統計：總數、進行中、已完成、訊息總數、since 之後有活動的對話數"""
+        pass
 
 
 class InMemoryConversationRepository(ConversationRepository):
@@ -96,6 +131,9 @@ class InMemoryConversationRepository(ConversationRepository):
     def __init__(self):
         self._conversations: Dict[str, Conversation] = {}
         self._user_conversations: Dict[str, List[str]] = {}  # user_mail -> [conversation_ids]
+        # 關鍵字搜尋索引：conversation_id -> (訊息列表, 已索引訊息數, 最後索引訊息, 小寫合併內容)
+        # 只有新增訊息時僅補上新訊息的小寫內容，列表被替換或清空時才整段重建
+        self._search_text: Dict[str, Tuple[List[ConversationMessage], int, Optional[ConversationMessage], str]] = {}
     
     async def create(self, conversation_id: str, user_mail: str) -> Conversation:
         """創建對話記錄（如果已存在則返回現有的）"""
@@ -105,11 +143,13 @@ class InMemoryConversationRepository(ConversationRepository):
             logger.debug("對話 %s 已存在，返回現有對話", conversation_id)
             return existing_conversation
         
+        now = get_taiwan_time()
         conversation = Conversation(
             id=conversation_id,
             user_mail=user_mail,
-            created_at=get_taiwan_time(),
-            last_updated=get_taiwan_time()
+            created_at=now,
+            last_updated=now,
+            last_activity_at=now
         )
         
         self._conversations[conversation_id] = conversation
@@ -165,25 +205,60 @@ class InMemoryConversationRepository(ConversationRepository):
         conversation.last_updated = get_taiwan_time()
         return conversation
     
+    async def get_recent_messages(
+        self, 
+        conversation_id: str, 
+        limit: int
+    ) -> List[ConversationMessage]:
+        """只取得對話最新的 limit 則訊息"""
+        conversation = self._conversations.get(conversation_id)
+        if not conversation:
+            return []
+        return conversation.get_recent_messages(limit)
+    
     async def add_message(
         self, 
         conversation_id: str, 
         message: ConversationMessage
     ) -> Optional[Conversation]:
         """向對話添加訊息"""
-        conversation = await self.get_by_id(conversation_id)
+        conversation = self._conversations.get(conversation_id)
         if not conversation:
             return None
         
         conversation.add_message(message)
+        self._touch(conversation)
+        return conversation
+    
+    async def add_messages(
+        self, 
+        conversation_id: str, 
+        messages: List[ConversationMessage]
+    ) -> Optional[Conversation]:
+        """一次向對話添加多則訊息（中間不讓出事件迴圈，整批寫入不會與其他回合交錯）"""
+        conversation = self._conversations.get(conversation_id)
+        if not conversation:
+            return None
+        
+        for message in messages:
+            conversation.add_message(message)
+        self._touch(conversation)
         return conversation
     
+    @staticmethod
+    def _touch(conversation: Conversation) -> None:
+        """以台灣時間更新對話的最後更新與活動時間（與 create/update_state 一致，避免混用 naive 時間）"""
+        now = get_taiwan_time()
+        conversation.last_updated = now
+        conversation.last_activity_at = now
+    
     async def update(self, conversation: Conversation) -> Conversation:
         """更新對話記錄"""
         if conversation.id not in self._conversations:
             raise NotFoundError(f"對話 {conversation.id} 不存在")
         
         self._conversations[conversation.id] = conversation
+        self._search_text.pop(conversation.id, None)
         return conversation
     
     async def delete(self, conversation_id: str) -> bool:
@@ -193,6 +268,7 @@ class InMemoryConversationRepository(ConversationRepository):
             return False
         
         del self._conversations[conversation_id]
+        self._search_text.pop(conversation_id, None)
         
         # 從用戶列表中移除
         if conversation.user_mail in self._user_conversations:
@@ -247,6 +323,77 @@ class InMemoryConversationRepository(ConversationRepository):
         
         return cleaned_count
     
+    async def search_by_keyword(
+        self, 
+        user_mail: str, 
+        keyword: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        limit: Optional[int] = None
+    ) -> List[Conversation]:
+        """依關鍵字與建立時間範圍搜尋用戶對話"""
+        keyword_lower = keyword.lower() if keyword else None
+        results = []
+        
+        for conversation in await self.get_by_user(user_mail):
+            # 先套用便宜的時間條件，再比對內容
+            if date_from and conversation.created_at < date_from:
+                continue
+            if date_to and conversation.created_at > date_to:
+                continue
+            if keyword_lower and keyword_lower not in self._get_search_text(conversation):
+                continue
+            results.append(conversation)
+            if limit and len(results) >= limit:
+                break
+        
+        return results
+    
+    async def get_stats(self, user_mail: str, since: datetime) -> Dict[str, int]:
+        """單次走訪用戶對話彙總統計，不建立中間清單"""
+        stats = {
+            "total_conversations": 0,
+            "active_conversations": 0,
+            "completed_conversations": 0,
+            "total_messages": 0,
+            "recent_conversations": 0,
+        }
+        for conv_id in self._user_conversations.get(user_mail, []):
+            conversation = self._conversations.get(conv_id)
+            if not conversation:
+                continue
+            stats["total_conversations"] += 1
+            stats["total_messages"] += len(conversation.messages)
+            if conversation.state == ConversationState.ACTIVE:
+                stats["active_conversations"] += 1
+            elif conversation.state == ConversationState.COMPLETED:
+                stats["completed_conversations"] += 1
+            if conversation.last_activity_at >= since:
+                stats["recent_conversations"] += 1
+        return stats
+    
+    def _get_search_text(self, conversation: Conversation) -> str:
+        """取得對話的小寫合併內容，每則訊息只在首次被索引時轉小寫一次"""
+        messages = conversation.messages
+        count = len(messages)
+        cached = self._search_text.get(conversation.id)
+        if (
+            cached
+            and cached[0] is messages
+            and cached[1] <= count
+            and (cached[1] == 0 or messages[cached[1] - 1] is cached[2])
+        ):
+            # 既有訊息未變動：沿用索引，只補上之後新增的訊息
+            if cached[1] == count:
+                return cached[3]
+            new_text = "\x00".join(message.content.lower() for message in messages[cached[1]:])
+            text = f"{cached[3]}\x00{new_text}" if cached[1] else new_text
+        else:
+            # 以 \x00 分隔各訊息，避免關鍵字跨訊息誤判命中
+            text = "\x00".join(message.content.lower() for message in messages)
+        self._search_text[conversation.id] = (messages, count, messages[-1] if messages else None, text)
+        return text
+    
     async def get_conversation_stats(self, user_mail: str) -> Dict[str, Any]:
         """獲取對話統計信息"""
         conversations = await self.get_by_user(user_mail)
@@ -49,6 +49,23 @@ class TodoRepository(ABC):
         """標記待辦事項為已完成"""
         pass
     
+    @abstractmethod
+    async def batch_mark_completed(self, todo_ids: List[str], user_mail: str) -> List[TodoItem]:
+        """一次將多筆屬於該用戶且未完成的待辦標記為已完成，回傳實際完成的項目（依傳入順序）"""
+        pass
+    
+    @abstractmethod
+    async def search(
+        self,
+        user_mail: str,
+        keyword: Optional[str] = None,
+        status: Optional[TodoStatus] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None
+    ) -> List[TodoItem]:
+        """依關鍵字（不分大小寫）、狀態與建立時間範圍搜尋用戶待辦，依建立時間排序"""
+        pass
+    
     @abstractmethod
     async def clean_old_todos(self, before_date: datetime) -> int:
         """清理舊的待辦事項"""
@@ -58,6 +75,16 @@ class TodoRepository(ABC):
     async def get_user_stats(self, user_mail: str) -> Dict[str, int]:
         """獲取用戶統計信息"""
         pass
+    
+    @abstractmethod
+    async def get_all_pending_grouped(self) -> Dict[str, List[TodoItem]]:
+        """一次取得所有用戶的待處理事項（user_mail -> 依建立時間排序的待辦），不含沒有待辦的用戶"""
+        pass
+    
+    @abstractmethod
+    async def get_user_stats_extended(self, user_mail: str, since: datetime) -> Dict[str, Any]:
+        """一次彙總用戶統計：各狀態數量、平均完成時數（無已完成項目時為 None）、since 之後建立的數量"""
+        pass
 
 
 class InMemoryTodoRepository(TodoRepository):
@@ -143,9 +170,46 @@ class InMemoryTodoRepository(TodoRepository):
         if not todo:
             return None
         
-        todo.mark_completed()
+        todo.mark_completed(get_taiwan_time())
         return await self.update(todo)
     
+    async def batch_mark_completed(self, todo_ids: List[str], user_mail: str) -> List[TodoItem]:
+        """批量標記待辦事項為已完成；不存在、非該用戶或已非待處理的項目略過"""
+        completed_at = get_taiwan_time()
+        completed_todos = []
+        for todo_id in todo_ids:
+            todo = self._todos.get(todo_id)
+            if not todo or todo.user_mail != user_mail or not todo.is_pending:
+                continue
+            todo.mark_completed(completed_at)
+            completed_todos.append(todo)
+        return completed_todos
+    
+    async def search(
+        self,
+        user_mail: str,
+        keyword: Optional[str] = None,
+        status: Optional[TodoStatus] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None
+    ) -> List[TodoItem]:
+        """單次走訪用戶待辦，先套用便宜的狀態與時間條件，再比對關鍵字"""
+        keyword_lower = keyword.lower() if keyword else None
+        results = []
+        
+        for todo in await self.get_by_user(user_mail):
+            if status and todo.status != status:
+                continue
+            if date_from and todo.created_at < date_from:
+                continue
+            if date_to and todo.created_at > date_to:
+                continue
+            if keyword_lower and keyword_lower not in todo.content.lower():
+                continue
+            results.append(todo)
+        
+        return results
+    
     async def clean_old_todos(self, before_date: datetime) -> int:
         """清理舊的待辦事項"""
         cleaned_count = 0
@@ -174,17 +238,46 @@ class InMemoryTodoRepository(TodoRepository):
         
         return stats
     
+    async def get_user_stats_extended(self, user_mail: str, since: datetime) -> Dict[str, Any]:
+        """單次走訪用戶待辦彙總統計"""
+        stats: Dict[str, Any] = {"total": 0, "pending": 0, "completed": 0, "cancelled": 0}
+        completion_seconds = 0.0
+        completion_count = 0
+        recent_count = 0
+        
+        for todo_id in self._user_todos.get(user_mail, []):
+            todo = self._todos.get(todo_id)
+            if not todo:
+                continue
+            stats["total"] += 1
+            if todo.is_pending:
+                stats["pending"] += 1
+            elif todo.is_completed:
+                stats["completed"] += 1
+                if todo.completed_at:
+                    completion_seconds += (todo.completed_at - todo.created_at).total_seconds()
+                    completion_count += 1
+            elif todo.is_cancelled:
+                stats["cancelled"] += 1
+            if todo.created_at >= since:
+                recent_count += 1
+        
+        stats["average_completion_hours"] = (
+            completion_seconds / completion_count / 3600 if completion_count else None
+        )
+        stats["recent_count"] = recent_count
+        return stats
+    
+    async def get_all_pending_grouped(self) -> Dict[str, List[TodoItem]]:
+        """單次走訪所有待辦，依用戶分組待處理事項"""
+        grouped: Dict[str, List[TodoItem]] = {}
+        for todo in self._todos.values():
+            if todo.is_pending:
+                grouped.setdefault(todo.user_mail, []).append(todo)
+        for todos in grouped.values():
+            todos.sort(key=lambda x: x.created_at)
+        return grouped
+    
     async def get_all_users_with_todos(self) -> List[str]:
         """獲取所有有待辦事項的用戶"""
         return list(self._user_todos.keys())
-    
-    async def batch_mark_completed(self, todo_ids: List[str]) -> List[TodoItem]:
-        """批量標記待辦事項為已完成"""
-        completed_todos = []
-        
-        for todo_id in todo_ids:
-            todo = await self.mark_completed(todo_id)
-            if todo:
-                completed_todos.append(todo)
-        
-        return completed_todos
\ No newline at end of file
@@ -1,8 +1,9 @@
 """
 用戶 Repository
 """
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List, Optional, Dict, Any
+from typing import Callable, List, Optional, Dict, Any
 from datetime import datetime
 from botbuilder.schema import ConversationReference
 
@@ -11,6 +12,8 @@ from shared.exceptions import RepositoryError, NotFoundError
 from shared.utils.helpers import get_taiwan_time
 from infrastructure.external.graph_api_client import GraphAPIClient
 
+_MISSING = object()
+
 
 class UserRepository(ABC):
     """用戶 Repository 接口"""
@@ -78,7 +81,30 @@ class InMemoryUserRepository(UserRepository):
         self._profiles: Dict[str, UserProfile] = {}
         self._sessions: Dict[str, UserSession] = {}
         self._display_names: Dict[str, str] = {}  # email -> display_name cache
+        # email -> last_active，與 _profiles 平行維護，統計掃描時不需逐一解參照 profile
+        self._last_active: Dict[str, datetime] = {}
+        # email -> 建立中的 Future，避免同一用戶並發建立時重複呼叫 Graph API
+        self._inflight: Dict[str, "asyncio.Future[UserProfile]"] = {}
+        # 資料異動觀察者 (email, profile)；顯示名稱快取透過事件同步
+        self._profile_observers: List[Callable[[str, UserProfile], None]] = []
         self.graph_client = graph_client
+        self.subscribe_profile_change(self._sync_display_name)
+        self._stats = self._build_stats_fn()
+
+    def subscribe_profile_change(self, callback: Callable[[str, UserProfile], None]) -> None:
+        """訂閱用戶資料異動事件"""
+        self._profile_observers.append(callback)
+
+    def _notify_profile_change(self, email: str, profile: UserProfile) -> None:
+        """通知所有觀察者用戶資料已異動"""
+        for callback in self._profile_observers:
+            callback(email, profile)
+
+    def _sync_display_name(self, email: str, profile: UserProfile) -> None:
+        """顯示名稱有變動時才更新快取"""
+        name = profile.display_name
+        if name and name != self._display_names.get(email):
+            self._display_names[email] = name
     
     async def create_profile(self, email: str, **kwargs) -> UserProfile:
         """創建用戶資料（優先從 Graph API 讀取）。"""
@@ -121,10 +147,8 @@ class InMemoryUserRepository(UserRepository):
         )
 
         self._profiles[email] = profile
-
-        # 更新顯示名稱快取
-        if profile.display_name:
-            self._display_names[email] = profile.display_name
+        self._last_active[email] = profile.last_active
+        self._notify_profile_change(email, profile)
 
         return profile
     
@@ -138,25 +162,23 @@ class InMemoryUserRepository(UserRepository):
             raise NotFoundError(f"用戶 {profile.email} 不存在")
         
         self._profiles[profile.email] = profile
-        
-        # 更新顯示名稱快取
-        if profile.display_name:
-            self._display_names[profile.email] = profile.display_name
-        
+        self._last_active[profile.email] = profile.last_active
+        self._notify_profile_change(profile.email, profile)
+
         return profile
     
     async def delete_profile(self, email: str) -> bool:
         """刪除用戶資料"""
-        if email in self._profiles:
-            del self._profiles[email]
-            if email in self._display_names:
-                del self._display_names[email]
+        if self._profiles.pop(email, _MISSING) is not _MISSING:
+            self._last_active.pop(email, None)
+            self._display_names.pop(email, None)
             return True
         return False
 
     async def clear_profiles(self) -> None:
         """清空所有用戶資料與顯示名稱快取（管理用途）。"""
         self._profiles.clear()
+        self._last_active.clear()
         self._display_names.clear()
     
     async def create_session(self, user_mail: str) -> UserSession:
@@ -181,10 +203,7 @@ class InMemoryUserRepository(UserRepository):
     
     async def delete_session(self, user_mail: str) -> bool:
         """刪除用戶會話"""
-        if user_mail in self._sessions:
-            del self._sessions[user_mail]
-            return True
-        return False
+        return self._sessions.pop(user_mail, _MISSING) is not _MISSING
 
     async def clear_sessions(self) -> None:
         """清空所有用戶會話（管理用途）。"""
@@ -194,8 +213,8 @@ class InMemoryUserRepository(UserRepository):
         """清除超過指定天數未活動的用戶資料，回傳清除數量。"""
         cutoff = get_taiwan_time()
         to_delete = [
-            email for email, profile in self._profiles.items()
-            if (cutoff - profile.last_active).days >= inactive_days
+            email for email, last_active in self._last_active.items()
+            if (cutoff - last_active).days >= inactive_days
         ]
         for email in to_delete:
             await self.delete_profile(email)
@@ -211,30 +230,63 @@ class InMemoryUserRepository(UserRepository):
     
     async def update_user_activity(self, email: str) -> None:
         """更新用戶活動時間"""
-        profile = await self.get_profile(email)
+        profile = self._profiles.get(email)
         if profile:
-            profile.update_activity()
+            self._touch_profile(email, profile)
+
+    def _touch_profile(self, email: str, profile: UserProfile) -> None:
+        """同步更新 profile 與 last_active 索引（純記憶體操作，不需 await）"""
+        now = get_taiwan_time()
+        profile.last_active = now
+        self._last_active[email] = now
     
     async def get_or_create_profile(
         self, 
         email: str, 
         **defaults
     ) -> UserProfile:
-        """獲取或創建用戶資料"""
-        profile = await self.get_profile(email)
+        """獲取或創建用戶資料（同一 email 並發呼叫只會建立一次）"""
+        profile = self._profiles.get(email)
         if profile:
-            await self.update_user_activity(email)
+            self._touch_profile(email, profile)
             return profile
-        
-        return await self.create_profile(email, **defaults)
+
+        fut = self._inflight.get(email)
+        if fut is not None:
+            return await asyncio.shield(fut)
+
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[email] = fut
+        try:
+            profile = await self.create_profile(email, **defaults)
+            fut.set_result(profile)
+            return profile
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except Exception as e:
+            fut.set_exception(e)
+            # 沒有其他等待者時避免 "exception was never retrieved" 警告
+            fut.exception()
+            raise
+        finally:
+            self._inflight.pop(email, None)
     
     async def get_or_create_session(self, user_mail: str) -> UserSession:
         """獲取或創建用戶會話"""
-        session = await self.get_session(user_mail)
+        return self._get_or_create_session(user_mail)
+
+    def _get_or_create_session(self, user_mail: str) -> UserSession:
+        """setdefault 保證並發時只保留第一個建立的會話"""
+        session = self._sessions.get(user_mail)
         if session:
             return session
-        
-        return await self.create_session(user_mail)
+
+        now = get_taiwan_time()
+        return self._sessions.setdefault(
+            user_mail,
+            UserSession(user_mail=user_mail, created_at=now, last_updated=now),
+        )
     
     async def set_conversation_reference(
         self, 
@@ -242,7 +294,7 @@ class InMemoryUserRepository(UserRepository):
         conversation_ref: ConversationReference
     ) -> None:
         """設置用戶對話參考"""
-        session = await self.get_or_create_session(user_mail)
+        session = self._get_or_create_session(user_mail)
         session.update_conversation_reference(conversation_ref)
     
     async def get_conversation_reference(
@@ -250,17 +302,17 @@ class InMemoryUserRepository(UserRepository):
         user_mail: str
     ) -> Optional[ConversationReference]:
         """獲取用戶對話參考"""
-        session = await self.get_session(user_mail)
+        session = self._sessions.get(user_mail)
         return session.conversation_reference if session else None
     
     async def set_model_preference(self, user_mail: str, model: str) -> None:
         """設置用戶模型偏好"""
-        session = await self.get_or_create_session(user_mail)
+        session = self._get_or_create_session(user_mail)
         session.update_model_preference(model)
     
     async def get_model_preference(self, user_mail: str) -> Optional[str]:
         """獲取用戶模型偏好"""
-        session = await self.get_session(user_mail)
+        session = self._sessions.get(user_mail)
         return session.model_preference if session else None
     
     async def get_display_name(self, email: str) -> Optional[str]:
@@ -269,21 +321,38 @@ class InMemoryUserRepository(UserRepository):
     
     async def set_display_name(self, email: str, display_name: str) -> None:
         """設置用戶顯示名稱"""
-        self._display_names[email] = display_name
-        
-        # 同時更新資料
-        profile = await self.get_profile(email)
-        if profile:
-            profile.display_name = display_name
+        profile = self._profiles.get(email)
+        if profile is None:
+            self._display_names[email] = display_name
+            return
+
+        # 同時更新資料，快取由異動事件同步
+        profile.display_name = display_name
+        self._notify_profile_change(email, profile)
     
     async def get_user_stats(self) -> Dict[str, Any]:
         """獲取用戶統計信息"""
-        return {
-            "total_profiles": len(self._profiles),
-            "total_sessions": len(self._sessions),
-            "users_with_display_names": len(self._display_names),
-            "recent_active_users": len([
-                p for p in self._profiles.values() 
-                if (get_taiwan_time() - p.last_active).days <= 7
-            ])
-        }
+        return self._stats(get_taiwan_time())
+
+    def _build_stats_fn(self) -> Callable[[datetime], Dict[str, Any]]:
+        """建立直接綁定內部字典的統計函式，省去每次呼叫的 self 屬性查找。
+
+        各字典只會 clear() 不會重新指派，閉包持有的參照始終有效。
+        """
+        profiles = self._profiles
+        sessions = self._sessions
+        display_names = self._display_names
+        last_active_values = self._last_active.values
+
+        def _stats(now: datetime) -> Dict[str, Any]:
+            return {
+                "total_profiles": len(profiles),
+                "total_sessions": len(sessions),
+                "users_with_display_names": len(display_names),
+                "recent_active_users": sum(
+                    1 for last_active in last_active_values()
+                    if (now - last_active).days <= 7
+                )
+            }
+
+        return _stats
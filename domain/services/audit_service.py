@@ -2,18 +2,48 @@
 稽核日誌業務邏輯服務
 重構自原始 app.py 中的稽核日誌相關功能
 """
-from typing import List, Dict, Any, Optional, Set
+from typing import List, Dict, Any, Optional, Set, Tuple
+import asyncio
+import gzip
 import os
 import re
-import json
+import shutil
+import time
 import logging
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
 
 from domain.models.audit import AuditLog, AuditLogEntry, MessageRole
 from domain.repositories.audit_repository import AuditRepository
 from config.settings import AppConfig
 from shared.exceptions import BusinessLogicError
-from shared.utils.helpers import get_taiwan_time
+from shared.utils.helpers import TTLCache, get_taiwan_time, json_dumps, json_loads
+
+# 本地稽核檔副檔名：.jsonl 為目前格式，.json 為舊版整檔陣列格式（仍可讀取與上傳）
+_LOCAL_LOG_SUFFIXES = (".jsonl", ".json")
+
+# 稽核 zip 壓縮等級：日誌為重複性高的文字，低等級即可取得大部分壓縮效益且省 CPU
+_ZIP_COMPRESSLEVEL = 3
+
+# 本地稽核檔批次寫入的累積時間窗（秒）
+_LOCAL_FLUSH_INTERVAL = 0.25
+
+# S3 list_objects 結果快取秒數與前綴數上限（管理介面常重複列出檔案；前綴來自用戶/日期查詢條件）
+_LIST_CACHE_TTL = 30.0
+_LIST_CACHE_SIZE = 256
+
+# 稽核封存檔的 S3 key：trgpt/{user_mail}/{YYYY-MM-DD}/{user_mail}_{YYYY-MM-DD}_{時間戳}{副檔名}
+_S3_KEY_TEMPLATE = "trgpt/{user_mail}/{date}/{user_mail}_{date}_{ts}{ext}"
+_ZIP_ARCHIVE_EXT = ".json.zip"
+_GZIP_ARCHIVE_EXT = ".jsonl.gz"
+
+# SSE-KMS 模式的 gzip 壓縮等級與分段上傳設定
+_GZIP_COMPRESSLEVEL = 1
+_MULTIPART_THRESHOLD = 8 * 1024 * 1024
+_MULTIPART_CONCURRENCY = 8
+
+# 有稽核日誌的用戶清單快取秒數（同一次管理頁面刷新內的多次查詢共用）
+_USERS_CACHE_TTL = 5.0
 
 
 class AuditService:
@@ -24,6 +54,20 @@ class AuditService:
         self.audit_repository = audit_repository
         self.s3_client = s3_client
         self._logger = logging.getLogger(__name__)
+        # 本地稽核檔寫入佇列 (file_path, line)，由背景任務批次寫入；首次記錄時才建立
+        self._write_queue: Optional["asyncio.Queue[Tuple[str, str]]"] = None
+        self._flusher_task: Optional[asyncio.Task] = None
+        # 本地稽核檔的當日日期字串快取，跨過台灣時間午夜才重新計算
+        self._today_date_str = ""
+        self._tomorrow_epoch = 0.0
+        # S3 list_objects 快取：prefix -> 物件清單
+        self._list_cache = TTLCache(maxsize=_LIST_CACHE_SIZE, ttl=_LIST_CACHE_TTL)
+        # 本地稽核檔筆數快取：path -> (st_mtime_ns, st_size, 筆數)
+        self._record_counts: Dict[str, Tuple[int, int, int]] = {}
+        # 有稽核日誌的用戶清單快取：(到期時間 monotonic, 用戶清單, 用戶集合)
+        self._users_cache: Optional[Tuple[float, List[str], Set[str]]] = None
+        # S3 上傳專用執行緒池，大小與上傳並行數一致，不與預設執行緒池搶 worker；首次上傳時才建立
+        self._s3_executor: Optional[ThreadPoolExecutor] = None
     
     async def log_user_message(
         self, 
@@ -40,6 +84,7 @@ class AuditService:
             content=content,
             metadata=metadata or {}
         )
+        self._note_user(user_mail)
         # 即時增量寫入本地檔案
         self._append_local_log_entry(user_mail, entry)
         return entry
@@ -59,6 +104,7 @@ class AuditService:
             content=content,
             metadata=metadata or {}
         )
+        self._note_user(user_mail)
         self._append_local_log_entry(user_mail, entry)
         return entry
     
@@ -77,6 +123,7 @@ class AuditService:
             content=action_description,
             metadata=metadata or {}
         )
+        self._note_user(user_mail)
         self._append_local_log_entry(user_mail, entry)
         return entry
     
@@ -98,21 +145,30 @@ class AuditService:
         if target_user:
             content += f" (目標用戶: {target_user})"
         
-        return await self.audit_repository.create_entry(
+        entry = await self.audit_repository.create_entry(
             conversation_id="ADMIN_ACTION",
             user_mail=admin_mail,
             role=MessageRole.SYSTEM,
             content=content,
             metadata=metadata
         )
+        self._note_user(admin_mail)
+        return entry
     
     async def get_user_audit_log(self, user_mail: str) -> Optional[AuditLog]:
         """獲取用戶的稽核日誌"""
         return await self.audit_repository.get_user_log(user_mail)
     
-    async def get_conversation_history(self, conversation_id: str) -> List[AuditLogEntry]:
-        """獲取對話的完整歷史記錄"""
-        return await self.audit_repository.get_entries_by_conversation(conversation_id)
+    async def get_conversation_history(
+        self,
+        conversation_id: str,
+        limit: Optional[int] = 100,
+        before_ts: Optional[datetime] = None
+    ) -> List[AuditLogEntry]:
+        """獲取對話的歷史記錄（分頁：before_ts 之前最新的 limit 筆，limit=None 取全部）"""
+        return await self.audit_repository.get_entries_by_conversation(
+            conversation_id, limit=limit, before_ts=before_ts
+        )
     
     async def get_user_recent_activity(
         self, 
@@ -125,16 +181,18 @@ class AuditService:
     
     async def get_audit_summary(self) -> Dict[str, Any]:
         """獲取所有用戶稽核日誌摘要（系統層級）"""
-        users = await self.audit_repository.get_all_users_with_logs()
+        users = await self.get_all_users_with_logs()
 
         summary_users: List[Dict[str, Any]] = []
         total_pending = 0
 
+        summaries = await self.audit_repository.get_user_log_summaries_bulk(users)
         for user_mail in users:
-            user_log = await self.audit_repository.get_user_log(user_mail)
-            pending = len(user_log.entries) if user_log else 0
+            user_summary = summaries.get(user_mail) or {}
+            pending = user_summary.get("total_entries", 0)
             total_pending += pending
-            last_updated = user_log.last_updated.isoformat() if user_log and user_log.last_updated else None
+            last_updated = user_summary.get("last_updated")
+            last_updated = last_updated.isoformat() if last_updated else None
             if pending:
                 summary_users.append({
                     "user_mail": user_mail,
@@ -166,8 +224,20 @@ class AuditService:
         return await self.audit_repository.clear_user_entries_before(user_mail, cutoff_time)
     
     async def get_all_users_with_logs(self) -> List[str]:
-        """獲取所有有稽核日誌的用戶"""
-        return await self.audit_repository.get_all_users_with_logs()
+        """獲取所有有稽核日誌的用戶（短時間快取，出現新用戶時失效）"""
+        now = time.monotonic()
+        cached = self._users_cache
+        if cached and now < cached[0]:
+            return list(cached[1])
+        users = await self.audit_repository.get_all_users_with_logs()
+        self._users_cache = (now + _USERS_CACHE_TTL, users, set(users))
+        return list(users)
+
+    def _note_user(self, user_mail: str) -> None:
+        """記錄寫入後呼叫：若為快取中沒有的新用戶，清除用戶清單快取。"""
+        cached = self._users_cache
+        if cached and user_mail not in cached[2]:
+            self._users_cache = None
     
     async def get_system_audit_overview(self) -> Dict[str, Any]:
         """獲取系統稽核總覽"""
@@ -181,17 +251,24 @@ class AuditService:
             "timestamp": get_taiwan_time().isoformat()
         }
         
-        # 統計各用戶的日誌摘要
-        for user_mail in all_users:
-            user_summary = await self.audit_repository.get_user_log_summary(user_mail)
-            overview["users"].append(user_summary)
-            overview["total_entries"] += user_summary.get("total_entries", 0)
-        
-        # 統計最近 24 小時的活動
+        # 各用戶的日誌摘要與最近 24 小時活動，以批次查詢一次取得
         day_ago = get_taiwan_time() - timedelta(hours=24)
+        summaries, recent_counts = await asyncio.gather(
+            self.audit_repository.get_user_log_summaries_bulk(all_users),
+            self.audit_repository.get_recent_counts_bulk(all_users, day_ago),
+        )
+
         for user_mail in all_users:
-            recent_entries = await self.audit_repository.get_entries_by_user_after(user_mail, day_ago)
-            overview["last_24h_entries"] += len(recent_entries)
+            user_summary = summaries.get(user_mail) or {}
+            total_entries = user_summary.get("total_entries", 0)
+            last_updated = user_summary.get("last_updated")
+            overview["users"].append({
+                "user_mail": user_mail,
+                "total_entries": total_entries,
+                "last_updated": last_updated.isoformat() if last_updated else None,
+            })
+            overview["total_entries"] += total_entries
+            overview["last_24h_entries"] += recent_counts.get(user_mail, 0)
         
         return overview
     
@@ -205,52 +282,16 @@ class AuditService:
         date_to: Optional[datetime] = None,
         limit: int = 100
     ) -> List[AuditLogEntry]:
-        """搜索稽核日誌"""
-        # 這是一個簡化的搜索實現
-        # 在生產環境中，應該考慮更高效的搜索機制
-        
-        if conversation_id:
-            entries = await self.get_conversation_history(conversation_id)
-        elif user_mail:
-            user_log = await self.get_user_audit_log(user_mail)
-            entries = user_log.entries if user_log else []
-        else:
-            # 搜索所有用戶（性能考量，實際使用時應該分頁）
-            all_users = await self.get_all_users_with_logs()
-            entries = []
-            for u_mail in all_users[:10]:  # 限制搜索前10個用戶
-                user_log = await self.get_user_audit_log(u_mail)
-                if user_log:
-                    entries.extend(user_log.entries)
-        
-        # 應用過濾條件
-        filtered_entries = entries
-        
-        if role:
-            filtered_entries = [e for e in filtered_entries if e.role == role]
-        
-        if keyword:
-            keyword_lower = keyword.lower()
-            filtered_entries = [
-                e for e in filtered_entries 
-                if keyword_lower in e.content.lower()
-            ]
-        
-        if date_from:
-            filtered_entries = [
-                e for e in filtered_entries 
-                if e.timestamp >= date_from
-            ]
-        
-        if date_to:
-            filtered_entries = [
-                e for e in filtered_entries 
-                if e.timestamp <= date_to
-            ]
-        
-        # 按時間排序並限制結果數量
-        filtered_entries.sort(key=lambda x: x.timestamp, reverse=True)
-        return filtered_entries[:limit]
+        """搜索稽核日誌（過濾、排序與筆數限制皆由 repository 處理）"""
+        return await self.audit_repository.search(
+            user_mail=user_mail,
+            conversation_id=conversation_id,
+            role=role,
+            keyword=keyword,
+            date_from=date_from,
+            date_to=date_to,
+            limit=limit,
+        )
     
     async def get_audit_stats_by_date_range(
         self, 
@@ -263,16 +304,21 @@ class AuditService:
         
         # 按角色統計
         role_stats = {}
-        date_stats = {}
+        ordinal_stats: Dict[int, int] = {}
         
         for entry in entries:
             # 角色統計
             role_key = entry.role.value
             role_stats[role_key] = role_stats.get(role_key, 0) + 1
             
-            # 日期統計
-            date_key = entry.timestamp.strftime('%Y-%m-%d')
-            date_stats[date_key] = date_stats.get(date_key, 0) + 1
+            # 日期統計（以日序數分組，最後才格式化成字串）
+            date_key = entry.timestamp.toordinal()
+            ordinal_stats[date_key] = ordinal_stats.get(date_key, 0) + 1
+        
+        date_stats = {
+            date.fromordinal(ordinal).isoformat(): count
+            for ordinal, count in ordinal_stats.items()
+        }
         
         return {
             "user_mail": user_mail,
@@ -303,9 +349,8 @@ class AuditService:
 
     async def get_user_audit_status(self, user_mail: str) -> Dict[str, Any]:
         """查詢用戶稽核日誌狀態（待上傳數、最近時間）。"""
-        user_log = await self.audit_repository.get_user_log(user_mail)
-        pending = len(user_log.entries) if user_log else 0
-        last_activity = user_log.last_updated.isoformat() if user_log and user_log.last_updated else None
+        pending, last_updated = await self.audit_repository.get_user_log_meta(user_mail)
+        last_activity = last_updated.isoformat() if last_updated else None
         return {
             "user_mail": user_mail,
             "pending_logs": pending,
@@ -322,64 +367,41 @@ class AuditService:
         if not logs:
             return {"success": False, "message": "沒有找到該用戶的稽核日誌"}
 
+        # 先寫出佇列中的記錄，避免上傳刪檔後又被背景任務重新建立
+        await self.flush_local_logs()
+
         # 先將完整內容寫入本地檔案（方便稽核與除錯）
         taiwan_now = get_taiwan_time()
         date_str = taiwan_now.strftime("%Y-%m-%d")
         os.makedirs("./local_audit_logs", exist_ok=True)
-        file_path = os.path.join("./local_audit_logs", f"{user_mail}_{date_str}.json")
+        file_path = os.path.join("./local_audit_logs", f"{user_mail}_{date_str}.jsonl")
         try:
             with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(logs, f, ensure_ascii=False, indent=2)
+                f.writelines(json_dumps(log) + "\n" for log in logs)
         except Exception as e:
             return {"success": False, "message": f"保存稽核日誌檔案失敗: {e}"}
 
-        # 照原本做法：以 AES ZIP（密碼 rinnai）上傳到 trgpt/{user_mail}/{YYYY-MM-DD}/
-        try:
-            import pyzipper  # type: ignore
-        except Exception as e:
-            return {"success": False, "message": f"zip 模組載入失敗: {e}"}
+        # 上傳到 trgpt/{user_mail}/{YYYY-MM-DD}/（未設定 KMS 金鑰時照原本做法使用 AES ZIP）
+        pyzipper = None
+        if not self._use_kms():
+            try:
+                import pyzipper  # type: ignore
+            except Exception as e:
+                return {"success": False, "message": f"zip 模組載入失敗: {e}"}
 
-        timestamp_str = taiwan_now.strftime("%Y%m%d_%H%M%S")
-        base_filename = os.path.basename(file_path)
-        name_without_ext = os.path.splitext(base_filename)[0]
-        s3_filename_noext = f"{name_without_ext}_{timestamp_str}"
-        s3_key = f"trgpt/{user_mail}/{date_str}/{s3_filename_noext}.json.zip"
+        s3_key = self._build_s3_key(user_mail, date_str, taiwan_now)
 
-        zip_path = f"{file_path}.zip"
         try:
-            with pyzipper.AESZipFile(
-                zip_path,
-                "w",
-                compression=pyzipper.ZIP_DEFLATED,
-                encryption=pyzipper.WZ_AES,
-            ) as zf:
-                zf.setpassword(b"rinnai")
-                with open(file_path, "rb") as src:
-                    data = src.read()
-                zf.writestr(os.path.basename(file_path), data)
-
-            # 透過 S3 原生 client 上傳 zip
-            loop = __import__("asyncio").get_event_loop()
-            await loop.run_in_executor(
-                None,
-                lambda: self.s3_client.client.upload_file(
-                    zip_path,
-                    self.s3_client.bucket_name,
-                    s3_key,
-                    ExtraArgs={"ContentType": "application/zip"},
-                ),
-            )
+            await self._archive_and_upload(pyzipper, file_path, s3_key)
             ok = True
         except Exception as e:
             ok = False
             upload_err = e
         finally:
-            # 刪除本地檔案（原始與壓縮）
+            # 刪除本地原始檔案（暫存封存檔由 _archive_and_upload 清理）
             try:
                 if os.path.exists(file_path):
                     os.remove(file_path)
-                if os.path.exists(zip_path):
-                    os.remove(zip_path)
             except Exception as e:
                 self._logger.warning(f"清理本地檔案失敗: {e}")
 
@@ -387,6 +409,7 @@ class AuditService:
             return {"success": False, "message": f"上傳到 S3 失敗: {upload_err}"}
 
         if ok:
+            self._invalidate_list_cache(s3_key)
             # 清空已上傳的記錄
             try:
                 await self.audit_repository.clear_uploaded_logs([user_mail])
@@ -396,6 +419,91 @@ class AuditService:
         else:
             return {"success": False, "message": "上傳到 S3 失敗"}
 
+    def _use_kms(self) -> bool:
+        """是否已設定 KMS 金鑰，改以 gzip + SSE-KMS 上傳。"""
+        kms_key_id = self.config.s3.kms_key_id
+        return isinstance(kms_key_id, str) and bool(kms_key_id)
+
+    def _build_s3_key(self, user_mail: str, date_str: str, now: datetime) -> str:
+        """依固定樣板組出稽核封存檔的 S3 key。"""
+        return _S3_KEY_TEMPLATE.format_map({
+            "user_mail": user_mail,
+            "date": date_str,
+            "ts": now.strftime("%Y%m%d_%H%M%S"),
+            "ext": _GZIP_ARCHIVE_EXT if self._use_kms() else _ZIP_ARCHIVE_EXT,
+        })
+
+    async def _archive_and_upload(self, pyzipper, file_path: str, s3_key: str) -> None:
+        """壓縮單一本地稽核檔並上傳至 S3，完成後刪除暫存封存檔。
+
+        設定 KMS 金鑰時以 gzip 壓縮並由 S3 做 SSE-KMS 加密；否則沿用 AES ZIP（密碼 rinnai）。
+        """
+        use_kms = self._use_kms()
+        archive_path = f"{file_path}.gz" if use_kms else f"{file_path}.zip"
+        bucket_name = self.s3_client.bucket_name
+        try:
+            # 壓縮與上傳皆為阻塞工作，交由執行緒池避免阻塞事件迴圈
+            loop = asyncio.get_running_loop()
+            if use_kms:
+                from boto3.s3.transfer import TransferConfig
+
+                await loop.run_in_executor(None, self._gzip_audit_file, file_path, archive_path)
+                upload_kwargs: Dict[str, Any] = {
+                    "ExtraArgs": {
+                        "ContentType": "application/gzip",
+                        "ServerSideEncryption": "aws:kms",
+                        "SSEKMSKeyId": self.config.s3.kms_key_id,
+                    },
+                    "Config": TransferConfig(
+                        multipart_threshold=_MULTIPART_THRESHOLD,
+                        max_concurrency=_MULTIPART_CONCURRENCY,
+                    ),
+                }
+            else:
+                await loop.run_in_executor(
+                    None, self._zip_audit_file, pyzipper, file_path, archive_path, os.path.basename(file_path)
+                )
+                upload_kwargs = {"ExtraArgs": {"ContentType": "application/zip"}}
+
+            await loop.run_in_executor(
+                self._get_s3_executor(),
+                lambda: self.s3_client.client.upload_file(archive_path, bucket_name, s3_key, **upload_kwargs),
+            )
+        finally:
+            if os.path.exists(archive_path):
+                try:
+                    os.remove(archive_path)
+                except Exception as exc:
+                    self._logger.warning(f"刪除暫存封存檔失敗: {archive_path} - {exc}")
+
+    def _get_s3_executor(self) -> ThreadPoolExecutor:
+        """取得 S3 上傳專用執行緒池（延遲建立）。"""
+        if self._s3_executor is None:
+            self._s3_executor = ThreadPoolExecutor(
+                max_workers=self.config.s3.upload_concurrency or 8,
+                thread_name_prefix="audit-s3-upload",
+            )
+        return self._s3_executor
+
+    @staticmethod
+    def _gzip_audit_file(file_path: str, gz_path: str) -> None:
+        """以 gzip 分塊壓縮單一稽核檔（加密交由 S3 SSE-KMS 處理）。"""
+        with open(file_path, "rb") as src, gzip.open(gz_path, "wb", compresslevel=_GZIP_COMPRESSLEVEL) as dst:
+            shutil.copyfileobj(src, dst)
+
+    @staticmethod
+    def _zip_audit_file(pyzipper, file_path: str, zip_path: str, arcname: str) -> None:
+        """以 AES ZIP（密碼 rinnai）壓縮單一稽核檔；write 會分塊讀取來源檔，不整檔載入記憶體。"""
+        with pyzipper.AESZipFile(
+            zip_path,
+            "w",
+            compression=pyzipper.ZIP_DEFLATED,
+            compresslevel=_ZIP_COMPRESSLEVEL,
+            encryption=pyzipper.WZ_AES,
+        ) as zf:
+            zf.setpassword(b"rinnai")
+            zf.write(file_path, arcname=arcname)
+
     async def upload_all_users_audit_logs(self) -> Dict[str, Any]:
         """上傳所有用戶的稽核日誌到 S3。"""
         if not self.s3_client:
@@ -421,17 +529,31 @@ class AuditService:
         except AttributeError:
             # 後備方案：逐一讀取使用者日誌
             logs_map = {}
-            for u in await self.audit_repository.get_all_users_with_logs():
+            for u in await self.get_all_users_with_logs():
                 user_log = await self.audit_repository.export_user_logs(u)
                 if user_log:
                     logs_map[u] = user_log
 
-        for user_mail, logs in logs_map.items():
-            if not logs:
-                continue
+        # get_logs_for_upload 回傳 AuditLog，後備方案回傳 list，皆以實際條目判斷是否需上傳
+        pending_users = [
+            user_mail for user_mail, logs in logs_map.items()
+            if getattr(logs, "entries", logs)
+        ]
+        sem = asyncio.Semaphore(self.config.s3.upload_concurrency or 8)
+
+        async def _upload_one(user_mail: str) -> Dict[str, Any]:
+            async with sem:
+                return await self.upload_user_audit_logs(user_mail)
+
+        upload_results = await asyncio.gather(
+            *[_upload_one(u) for u in pending_users], return_exceptions=True
+        )
+
+        for user_mail, result in zip(pending_users, upload_results):
             users_processed.add(user_mail)
             total_files += 1
-            result = await self.upload_user_audit_logs(user_mail)
+            if isinstance(result, BaseException):
+                result = {"success": False, "message": f"上傳到 S3 失敗: {result}"}
             if result.get("success"):
                 total_success += 1
             else:
@@ -476,7 +598,7 @@ class AuditService:
         objects: List[Dict[str, Any]] = []
         for p in prefixes:
             try:
-                resp = await self.s3_client.list_objects(prefix=p)
+                resp = await self._list_objects_cached(p)
             except Exception:
                 resp = []
             for obj in resp:
@@ -508,18 +630,34 @@ class AuditService:
                     "filename": parts[3],
                 })
 
-            if include_download_url:
-                try:
-                    info["presigned_download_url"] = await self.s3_client.generate_presigned_url(key, expiration)
-                except Exception:
-                    info["presigned_download_url"] = None
-
             files.append(info)
 
+        if include_download_url and files:
+            # 預簽名為各自獨立的計算，一次併發產生，避免逐檔序列等待
+            urls = await asyncio.gather(
+                *[self.s3_client.generate_presigned_url(f["key"], expiration) for f in files],
+                return_exceptions=True,
+            )
+            for info, url in zip(files, urls):
+                info["presigned_download_url"] = None if isinstance(url, BaseException) else url
+
         # 依最後修改時間排序（若可用）
         files.sort(key=lambda x: x.get("last_modified", ""), reverse=True)
         return files
 
+    async def _list_objects_cached(self, prefix: str) -> List[Dict[str, Any]]:
+        """列出 S3 物件，同一前綴於 TTL 內重用上次結果。"""
+        cached = self._list_cache.get(prefix)
+        if cached is not None:
+            return cached
+        resp = await self.s3_client.list_objects(prefix=prefix)
+        self._list_cache.set(prefix, resp)
+        return resp
+
+    def _invalidate_list_cache(self, s3_key: str) -> None:
+        """新物件上傳後，清除所有涵蓋該 key 的前綴快取。"""
+        self._list_cache.remove_if(lambda prefix: s3_key.startswith(prefix))
+
     async def generate_download_url(self, s3_key: str, expiration: int = 3600) -> str:
         """取得指定 S3 物件的預簽名下載 URL。"""
         if not self.s3_client:
@@ -538,30 +676,27 @@ class AuditService:
 
     async def get_local_audit_files(self) -> List[Dict[str, Any]]:
         """查看本地稽核日誌檔案狀態（./local_audit_logs）。"""
+        await self.flush_local_logs()
         log_dir = "./local_audit_logs"
         files: List[Dict[str, Any]] = []
         if os.path.exists(log_dir):
-            for filename in os.listdir(log_dir):
-                if not filename.endswith(".json"):
-                    continue
-                file_path = os.path.join(log_dir, filename)
-                try:
-                    stats = os.stat(file_path)
+            # scandir 的 DirEntry 帶有目錄項資訊與已組好的路徑，省去逐檔 join 與額外 stat
+            with os.scandir(log_dir) as it:
+                for de in it:
+                    if not de.name.endswith(_LOCAL_LOG_SUFFIXES):
+                        continue
                     try:
-                        with open(file_path, "r", encoding="utf-8") as f:
-                            logs = json.load(f)
-                            record_count = len(logs) if isinstance(logs, list) else 0
+                        stats = de.stat()
+                        record_count = self._local_record_count(de.path, stats)
+                        files.append({
+                            "filename": de.name,
+                            "path": de.path,
+                            "size": stats.st_size,
+                            "modified": datetime.fromtimestamp(stats.st_mtime).isoformat(),
+                            "record_count": record_count,
+                        })
                     except Exception:
-                        record_count = -1
-                    files.append({
-                        "filename": filename,
-                        "path": file_path,
-                        "size": stats.st_size,
-                        "modified": datetime.fromtimestamp(stats.st_mtime).isoformat(),
-                        "record_count": record_count,
-                    })
-                except Exception:
-                    continue
+                        continue
         return sorted(files, key=lambda x: x.get("modified", ""), reverse=True)
 
     async def _upload_pending_local_files(self) -> Dict[str, Any]:
@@ -574,15 +709,16 @@ class AuditService:
             "failed_files": 0,
         }
 
+        await self.flush_local_logs()
         log_dir = "./local_audit_logs"
         if not os.path.exists(log_dir):
             return summary
 
-        pattern = re.compile(r"^(?P<mail>.+)_(?P<date>\d{4}-\d{2}-\d{2})\.json$")
+        pattern = re.compile(r"^(?P<mail>.+)_(?P<date>\d{4}-\d{2}-\d{2})\.jsonl?$")
         grouped: Dict[str, List[Dict[str, str]]] = {}
 
         for filename in os.listdir(log_dir):
-            if not filename.endswith(".json"):
+            if not filename.endswith(_LOCAL_LOG_SUFFIXES):
                 continue
             match = pattern.match(filename)
             if not match:
@@ -669,60 +805,33 @@ class AuditService:
                 "source": "local_cache",
             }
 
-        try:
-            import pyzipper  # type: ignore
-        except Exception as exc:  # pragma: no cover - 依賴環境
-            return {
-                "success": False,
-                "message": f"zip 模組載入失敗: {exc}",
-                "filename": filename,
-                "local_path": file_path,
-                "source": "local_cache",
-            }
+        pyzipper = None
+        if not self._use_kms():
+            try:
+                import pyzipper  # type: ignore
+            except Exception as exc:  # pragma: no cover - 依賴環境
+                return {
+                    "success": False,
+                    "message": f"zip 模組載入失敗: {exc}",
+                    "filename": filename,
+                    "local_path": file_path,
+                    "source": "local_cache",
+                }
 
         taiwan_now = get_taiwan_time()
-        timestamp_str = taiwan_now.strftime("%Y%m%d_%H%M%S")
         date_for_key = (log_date or taiwan_now.strftime("%Y-%m-%d")).strip()
-        base_name_no_ext = os.path.splitext(filename)[0]
-        s3_filename_noext = f"{base_name_no_ext}_{timestamp_str}"
-        s3_key = f"trgpt/{user_mail}/{date_for_key}/{s3_filename_noext}.json.zip"
-        zip_path = f"{file_path}.zip"
+        s3_key = self._build_s3_key(user_mail, date_for_key, taiwan_now)
 
         upload_error: Optional[Exception] = None
         success = False
 
         try:
-            with pyzipper.AESZipFile(
-                zip_path,
-                "w",
-                compression=pyzipper.ZIP_DEFLATED,
-                encryption=pyzipper.WZ_AES,
-            ) as zf:
-                zf.setpassword(b"rinnai")
-                with open(file_path, "rb") as src:
-                    zf.writestr(filename, src.read())
-
-            loop = __import__("asyncio").get_event_loop()
-            await loop.run_in_executor(
-                None,
-                lambda: self.s3_client.client.upload_file(
-                    zip_path,
-                    bucket_name,
-                    s3_key,
-                    ExtraArgs={"ContentType": "application/zip"},
-                ),
-            )
+            await self._archive_and_upload(pyzipper, file_path, s3_key)
             success = True
         except Exception as exc:
             upload_error = exc
             self._logger.error(f"上傳本地稽核檔案失敗: {file_path} - {exc}")
         finally:
-            if os.path.exists(zip_path):
-                try:
-                    os.remove(zip_path)
-                except Exception as exc:
-                    self._logger.warning(f"刪除暫存壓縮檔失敗: {zip_path} - {exc}")
-
             if success and os.path.exists(file_path):
                 try:
                     os.remove(file_path)
@@ -730,6 +839,7 @@ class AuditService:
                     self._logger.warning(f"刪除已上傳檔案失敗: {file_path} - {exc}")
 
         if success:
+            self._invalidate_list_cache(s3_key)
             return {
                 "success": True,
                 "message": f"成功上傳本地稽核檔案 {filename}",
@@ -748,32 +858,112 @@ class AuditService:
             "source": "local_cache",
         }
 
-    # 內部：增量寫入本地稽核檔案（每日一檔）
+    # 內部：增量寫入本地稽核檔案（每日一檔，JSON Lines 每筆一行，僅需附加不需重寫整檔）
+    # 實際寫檔交由背景任務批次處理，呼叫端不會因磁碟 I/O 阻塞
     def _append_local_log_entry(self, user_mail: str, entry: AuditLogEntry) -> None:
         try:
-            taiwan_now = get_taiwan_time()
-            date_str = taiwan_now.strftime("%Y-%m-%d")
-            log_dir = "./local_audit_logs"
-            os.makedirs(log_dir, exist_ok=True)
-            file_path = os.path.join(log_dir, f"{user_mail}_{date_str}.json")
+            date_str = self._local_log_date_str()
+            file_path = os.path.join("./local_audit_logs", f"{user_mail}_{date_str}.jsonl")
+            line = json_dumps(entry.to_dict()) + "\n"
+
+            if self._write_queue is None:
+                self._write_queue = asyncio.Queue()
+            self._write_queue.put_nowait((file_path, line))
+            if self._flusher_task is None or self._flusher_task.done():
+                self._flusher_task = asyncio.get_running_loop().create_task(self._flush_loop())
+        except Exception as e:
+            self._logger.warning(f"寫入本地稽核檔失敗: {e}")
 
-            existing_logs = []
-            if os.path.exists(file_path):
+    def _local_log_date_str(self) -> str:
+        """取得本地稽核檔使用的台灣日期字串（每日只格式化一次）。"""
+        if time.time() >= self._tomorrow_epoch:
+            taiwan_now = get_taiwan_time()
+            self._today_date_str = taiwan_now.strftime("%Y-%m-%d")
+            next_midnight = (taiwan_now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+            self._tomorrow_epoch = next_midnight.timestamp()
+        return self._today_date_str
+
+    async def _flush_loop(self) -> None:
+        """背景任務：等待第一筆寫入後累積一個時間窗，再一次寫出整批。"""
+        queue = self._write_queue
+        while True:
+            first = await queue.get()
+            try:
+                await asyncio.sleep(_LOCAL_FLUSH_INTERVAL)
+            finally:
+                # 即使任務被取消，已取出的記錄也要寫出
+                self._write_local_batch([first])
+
+    def _write_local_batch(self, batch: List[Tuple[str, str]]) -> None:
+        """取出佇列剩餘項目，依檔案分組後各以一次 write 附加。"""
+        queue = self._write_queue
+        if queue is not None:
+            while True:
                 try:
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        existing_logs = json.load(f)
-                        if not isinstance(existing_logs, list):
-                            existing_logs = []
-                except Exception:
-                    existing_logs = []
+                    batch.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+        if not batch:
+            return
 
-            existing_logs.append(entry.to_dict())
+        grouped: Dict[str, List[str]] = {}
+        for file_path, line in batch:
+            grouped.setdefault(file_path, []).append(line)
 
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(existing_logs, f, ensure_ascii=False, indent=2)
+        try:
+            os.makedirs("./local_audit_logs", exist_ok=True)
         except Exception as e:
-            self._logger.warning(f"寫入本地稽核檔失敗: {e}")
+            self._logger.warning(f"建立本地稽核目錄失敗: {e}")
+            return
+        for file_path, lines in grouped.items():
+            try:
+                with open(file_path, "a", encoding="utf-8") as f:
+                    f.write("".join(lines))
+            except Exception as e:
+                self._logger.warning(f"寫入本地稽核檔失敗: {file_path} - {e}")
+
+    async def flush_local_logs(self) -> None:
+        """立即寫出佇列中尚未落地的本地稽核記錄。"""
+        self._write_local_batch([])
+
+    async def aclose(self) -> None:
+        """停止背景寫入任務並寫出剩餘記錄（應用程式關閉時呼叫）。"""
+        task, self._flusher_task = self._flusher_task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await self.flush_local_logs()
+        executor, self._s3_executor = self._s3_executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    @staticmethod
+    def _count_local_records(file_path: str) -> int:
+        """計算本地稽核檔筆數；.jsonl 以換行數計（不解碼），舊版 .json 陣列仍以解析計算。"""
+        try:
+            if file_path.endswith(".jsonl"):
+                # 每筆記錄固定以 "\n" 結尾，分塊計算換行即可，不需逐行建立物件
+                with open(file_path, "rb") as f:
+                    return sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 16), b""))
+            with open(file_path, "rb") as f:
+                logs = json_loads(f.read())
+                return len(logs) if isinstance(logs, list) else 0
+        except Exception:
+            return -1
     
+    def _local_record_count(self, file_path: str, stats: os.stat_result) -> int:
+        """取得本地稽核檔筆數，檔案的修改時間與大小未變時直接沿用上次結果。"""
+        cached = self._record_counts.get(file_path)
+        if cached and cached[0] == stats.st_mtime_ns and cached[1] == stats.st_size:
+            return cached[2]
+        count = self._count_local_records(file_path)
+        if count >= 0:
+            self._record_counts[file_path] = (stats.st_mtime_ns, stats.st_size, count)
+        return count
+
     async def validate_audit_integrity(self, user_mail: str) -> Dict[str, Any]:
         """驗證稽核日誌完整性"""
         user_log = await self.get_user_audit_log(user_mail)
@@ -785,25 +975,25 @@ class AuditService:
             }
         
         issues = []
+        entries = user_log.entries
         
-        # 檢查時間序列是否正確
-        entries = sorted(user_log.entries, key=lambda x: x.timestamp)
-        for i in range(1, len(entries)):
-            if entries[i].timestamp < entries[i-1].timestamp:
-                issues.append(f"時間序列異常: 條目 {entries[i].id}")
+        # 單次走訪同時檢查：時間序列（依儲存順序）、空內容、對話ID格式
+        empty_content = 0
+        invalid_conversation_ids = 0
+        prev_ts = None
+        for e in entries:
+            if prev_ts is not None and e.timestamp < prev_ts:
+                issues.append(f"時間序列異常: 條目 {e.id}")
+            prev_ts = e.timestamp
+            if not e.content.strip():
+                empty_content += 1
+            if not e.conversation_id or len(e.conversation_id) < 5:
+                invalid_conversation_ids += 1
         
-        # 檢查是否有空內容
-        empty_content = [e.id for e in entries if not e.content.strip()]
         if empty_content:
-            issues.append(f"空內容條目: {len(empty_content)} 個")
-        
-        # 檢查對話ID格式
-        invalid_conversation_ids = [
-            e.id for e in entries 
-            if not e.conversation_id or len(e.conversation_id) < 5
-        ]
+            issues.append(f"空內容條目: {empty_content} 個")
         if invalid_conversation_ids:
-            issues.append(f"無效對話ID: {len(invalid_conversation_ids)} 個")
+            issues.append(f"無效對話ID: {invalid_conversation_ids} 個")
         
         return {
             "user_mail": user_mail,
@@ -812,50 +1002,3 @@ class AuditService:
             "issues": issues,
             "validated_at": get_taiwan_time().isoformat()
         }
-    
-    async def generate_download_url(self, s3_key: str, expiration: int = 3600) -> Optional[str]:
-        """生成S3檔案的預簽名下載URL"""
-        try:
-            if self.s3_client:
-                # 使用S3客戶端生成預簽名URL
-                return await self.s3_client.generate_presigned_url(s3_key, expiration)
-            return None
-        except Exception:
-            return None
-    
-    async def get_local_audit_files(self) -> List[Dict[str, Any]]:
-        """獲取本地稽核檔案列表"""
-        import os
-        import json
-        from datetime import datetime
-        
-        try:
-            log_dir = "./local_audit_logs"
-            files = []
-            
-            if os.path.exists(log_dir):
-                for filename in os.listdir(log_dir):
-                    if filename.endswith(".json"):
-                        file_path = os.path.join(log_dir, filename)
-                        file_stats = os.stat(file_path)
-                        
-                        # 讀取檔案內容以獲取記錄數量
-                        try:
-                            with open(file_path, "r", encoding="utf-8") as f:
-                                logs = json.load(f)
-                                record_count = len(logs) if isinstance(logs, list) else 0
-                        except:
-                            record_count = -1
-                        
-                        files.append({
-                            "filename": filename,
-                            "path": file_path,
-                            "size": file_stats.st_size,
-                            "modified": datetime.fromtimestamp(file_stats.st_mtime).isoformat(),
-                            "record_count": record_count
-                        })
-            
-            return files
-            
-        except Exception:
-            return []
@@ -3,8 +3,11 @@
 重構自原始 app.py 中的對話相關功能
 """
 
+import asyncio
+import hashlib
 import logging
-from typing import List, Dict, Any, Optional
+import re
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
 from datetime import datetime, timedelta
 from uuid import uuid4
 
@@ -19,7 +22,27 @@ from domain.services.audit_service import AuditService
 from infrastructure.external.openai_client import OpenAIClient
 from config.settings import AppConfig
 from shared.exceptions import BusinessLogicError, NotFoundError, OpenAIServiceError
-from shared.utils.helpers import get_taiwan_time
+from shared.utils.helpers import TTLCache, get_taiwan_time, json_dumps
+
+# get_ai_response 組上下文時帶入的最近消息數（含本次用戶消息）
+_AI_CONTEXT_MESSAGES = 10
+
+# 新對話的系統提示；系統消息 dict 於各請求間共用，請勿修改其內容
+_SYSTEM_PROMPT = "你是一個智能助理，負責協助用戶處理各種問題和任務。請用繁體中文回應。"
+_SYSTEM_MESSAGE: Dict[str, str] = {"role": "system", "content": _SYSTEM_PROMPT}
+
+# 對話上下文最多佔用模型上下文視窗的比例，其餘保留給系統提示與回應
+_CONTEXT_BUDGET_RATIO = 0.8
+
+# 超出預算的舊消息改以啟發式摘要呈現，摘要的最大字元數
+_SUMMARY_MAX_CHARS = 1000
+
+# AI 回應快取：完全相同的請求（模型、參數與上下文）於存活時間內直接重用回應
+_RESPONSE_CACHE_SIZE = 256
+_RESPONSE_CACHE_TTL = 300.0
+
+# 摘要擷取首句用的句尾標點
+_SENTENCE_END = re.compile(r"(?<=[。！？!?\n])|(?<=\.\s)")
 
 
 class ConversationService:
@@ -37,6 +60,15 @@ class ConversationService:
         self.audit_service = audit_service
         self.openai_client = openai_client
         self.logger = logging.getLogger(__name__)
+        self._response_cache = TTLCache(
+            maxsize=_RESPONSE_CACHE_SIZE, ttl=_RESPONSE_CACHE_TTL
+        )
+        # stream_ai_response 排入背景、尚未完成的對話寫入
+        self._pending_writes: Set[asyncio.Task] = set()
+        # 單則輸入的最大字元數：中文約一字一 token，以上下文預算的 token 數作為字元上限
+        self._max_input_chars = int(
+            config.openai.context_window * _CONTEXT_BUDGET_RATIO
+        )
 
     async def start_conversation(
         self, conversation_id: str, user_mail: str
@@ -59,8 +91,9 @@ class ConversationService:
         user_mail: str,
         content: str,
         metadata: Optional[Dict[str, Any]] = None,
+        timestamp: Optional[datetime] = None,
     ) -> ConversationMessage:
-        """添加用戶消息"""
+        """添加用戶消息（timestamp 未指定時使用當下台灣時間）"""
         conversation = await self.conversation_repository.get_by_id(conversation_id)
         if not conversation:
             # 自動創建對話，保持與原始行為一致
@@ -75,21 +108,19 @@ class ConversationService:
         message = ConversationMessage(
             role=MessageRole.USER,
             content=content,
-            timestamp=get_taiwan_time(),
+            timestamp=timestamp or get_taiwan_time(),
             metadata=metadata or {},
         )
 
-        # 添加到對話歷史
-        updated_conversation = await self.conversation_repository.add_message(
-            conversation_id, message
-        )
-
-        # 記錄到稽核日誌
-        await self.audit_service.log_user_message(
-            conversation_id=conversation_id,
-            user_mail=user_mail,
-            content=content,
-            metadata=metadata,
+        # 添加到對話歷史與記錄稽核日誌互不相依，併發執行
+        await asyncio.gather(
+            self.conversation_repository.add_message(conversation_id, message),
+            self.audit_service.log_user_message(
+                conversation_id=conversation_id,
+                user_mail=user_mail,
+                content=content,
+                metadata=metadata,
+            ),
         )
 
         return message
@@ -100,8 +131,9 @@ class ConversationService:
         user_mail: str,
         content: str,
         metadata: Optional[Dict[str, Any]] = None,
+        timestamp: Optional[datetime] = None,
     ) -> ConversationMessage:
-        """添加助手回應"""
+        """添加助手回應（timestamp 未指定時使用當下台灣時間）"""
         conversation = await self.conversation_repository.get_by_id(conversation_id)
         if not conversation:
             # 自動創建對話，保持與原始行為一致
@@ -113,21 +145,19 @@ class ConversationService:
         message = ConversationMessage(
             role=MessageRole.ASSISTANT,
             content=content,
-            timestamp=get_taiwan_time(),
+            timestamp=timestamp or get_taiwan_time(),
             metadata=metadata or {},
         )
 
-        # 添加到對話歷史
-        updated_conversation = await self.conversation_repository.add_message(
-            conversation_id, message
-        )
-
-        # 記錄到稽核日誌
-        await self.audit_service.log_assistant_message(
-            conversation_id=conversation_id,
-            user_mail=user_mail,
-            content=content,
-            metadata=metadata,
+        # 添加到對話歷史與記錄稽核日誌互不相依，併發執行
+        await asyncio.gather(
+            self.conversation_repository.add_message(conversation_id, message),
+            self.audit_service.log_assistant_message(
+                conversation_id=conversation_id,
+                user_mail=user_mail,
+                content=content,
+                metadata=metadata,
+            ),
         )
 
         return message
@@ -147,11 +177,13 @@ class ConversationService:
         if user_mail and conversation.user_mail != user_mail:
             raise BusinessLogicError("無權限查看此對話")
 
-        messages = conversation.messages
         if limit:
-            messages = messages[-limit:]  # 獲取最新的 N 條消息
+            # 只向 repository 取最新的 N 條消息，不複製整段歷史
+            return await self.conversation_repository.get_recent_messages(
+                conversation_id, limit
+            )
 
-        return messages
+        return conversation.messages
 
     async def get_conversation_context(
         self, conversation_id: str, user_mail: str, max_messages: int = 10
@@ -161,17 +193,8 @@ class ConversationService:
             conversation_id, user_mail, max_messages
         )
 
-        # 轉換為 OpenAI 格式
-        context = []
-        for message in messages:
-            context.append(
-                {
-                    "role": message.role.value,  # 使用 enum 的 value
-                    "content": message.content,
-                }
-            )
-
-        return context
+        # 轉換為 OpenAI 格式（超出 token 預算的舊消息以摘要取代）
+        return self._context_from_messages(messages)
 
     async def end_conversation(
         self, conversation_id: str, user_mail: str, reason: Optional[str] = None
@@ -215,55 +238,24 @@ class ConversationService:
         date_to: Optional[datetime] = None,
     ) -> List[Conversation]:
         """搜索對話"""
-        conversations = await self.conversation_repository.get_by_user(user_mail, True)
-
-        # 應用過濾條件
-        filtered = conversations
-
-        if keyword:
-            keyword_lower = keyword.lower()
-            filtered = []
-            for conv in conversations:
-                # 搜索消息內容
-                for message in conv.messages:
-                    if keyword_lower in message.content.lower():
-                        filtered.append(conv)
-                        break
-
-        if date_from:
-            filtered = [c for c in filtered if c.created_at >= date_from]
-
-        if date_to:
-            filtered = [c for c in filtered if c.created_at <= date_to]
-
-        return filtered
+        return await self.conversation_repository.search_by_keyword(
+            user_mail, keyword, date_from, date_to
+        )
 
     async def get_conversation_stats(self, user_mail: str) -> Dict[str, Any]:
         """獲取對話統計"""
-        conversations = await self.get_user_conversations(user_mail, True)
-
-        total_messages = sum(len(c.messages) for c in conversations)
-        active_count = len(
-            [c for c in conversations if c.state == ConversationState.ACTIVE]
-        )
-        completed_count = len(
-            [c for c in conversations if c.state == ConversationState.COMPLETED]
-        )
-
-        # 最近活動
         week_ago = get_taiwan_time() - timedelta(days=7)
-        recent_conversations = [
-            c for c in conversations if c.last_activity_at >= week_ago
-        ]
+        stats = await self.conversation_repository.get_stats(user_mail, week_ago)
+        total = stats["total_conversations"]
 
         return {
-            "total_conversations": len(conversations),
-            "active_conversations": active_count,
-            "completed_conversations": completed_count,
-            "total_messages": total_messages,
-            "recent_week_conversations": len(recent_conversations),
+            "total_conversations": total,
+            "active_conversations": stats["active_conversations"],
+            "completed_conversations": stats["completed_conversations"],
+            "total_messages": stats["total_messages"],
+            "recent_week_conversations": stats["recent_conversations"],
             "average_messages_per_conversation": round(
-                total_messages / max(len(conversations), 1), 2
+                stats["total_messages"] / max(total, 1), 2
             ),
         }
 
@@ -288,118 +280,399 @@ class ConversationService:
         self, conversation_id: str, user_mail: str, message: str, **kwargs
     ) -> str:
         """獲取 AI 回應"""
+        message = self._normalize_ai_input(conversation_id, user_mail, message)
+        if not message:
+            return ""
+
+        user_message: Optional[ConversationMessage] = None
         try:
-            model_name = kwargs.get("model", self.config.openai.model)
-            request_id = kwargs.get("request_id")
-            if not request_id:
-                request_id = str(uuid4())
-                kwargs["request_id"] = request_id
-            prompt_preview = (message or "").strip()
-            if len(prompt_preview) > 120:
-                prompt_preview = f"{prompt_preview[:117]}..."
-            self.logger.info(
-                "AI response requested user_mail=%s conversation_id=%s model=%s request_id=%s",
-                user_mail,
-                conversation_id,
-                model_name,
-                request_id,
+            user_message, request_params = await self._prepare_ai_request(
+                conversation_id, user_mail, message, kwargs
             )
-            if prompt_preview:
-                self.logger.debug(
-                    "AI request prompt preview request_id=%s conversation_id=%s text=\"%s\"",
-                    request_id,
-                    conversation_id,
-                    prompt_preview,
-                )
-            # 確保對話存在（自動創建機制，模擬原始行為）
-            conversation = await self.conversation_repository.get_by_id(conversation_id)
-            if not conversation:
+            request_id = kwargs["request_id"]
+            # 調用 OpenAI API（完全相同的請求直接使用快取回應）
+            cache_key = self._response_cache_key(request_params)
+            response = self._response_cache.get(cache_key)
+            if response is None:
+                response = await self.openai_client.chat_completion(**request_params)
+                if response:
+                    self._response_cache.set(cache_key, response)
+            else:
                 self.logger.info(
-                    "Conversation missing, creating new conversation user_mail=%s conversation_id=%s request_id=%s",
-                    user_mail,
+                    "AI response served from cache conversation_id=%s request_id=%s",
                     conversation_id,
                     request_id,
                 )
-                conversation = await self.conversation_repository.create(
-                    conversation_id, user_mail
-                )
 
-            # 添加用戶消息到對話歷史
-            await self.add_user_message(conversation_id, user_mail, message)
-
-            # 獲取對話上下文
-            context = await self.get_conversation_context(conversation_id, user_mail)
-            # 如果是新對話，添加系統提示
-            if len(context) <= 1:  # 只有用戶消息或空對話
-                system_prompt = self._get_system_prompt(user_mail)
-                context = [{"role": "system", "content": system_prompt}] + context
-            # 注入知識庫參考資料（由 message_handler 查詢部門對應 KB 後傳入）
-            kb_context = kwargs.get("kb_context", "")
-            if kb_context:
-                kb_system_msg = {
-                    "role": "system",
-                    "content": (
-                        "以下是從公司知識庫中查詢到的參考資料，請優先參考這些內容來回答使用者的問題。"
-                        "如果知識庫內容與問題相關，請據此回答；如果不相關，則用你自己的知識回答。\n\n"
-                        f"【知識庫參考】\n{kb_context}"
-                    ),
-                }
-                # 插入到 system prompt 之後、使用者訊息之前
-                if context and context[0].get("role") == "system":
-                    context.insert(1, kb_system_msg)
-                else:
-                    context.insert(0, kb_system_msg)
+            # 用戶消息與 AI 回應一次寫入對話歷史
+            await self._record_messages(
+                conversation_id,
+                user_mail,
+                [user_message, self._assistant_message(response)],
+            )
+            user_message = None  # 已寫入，失敗處理不需再補寫
+            self._log_response_stored(user_mail, conversation_id, request_id, response)
+
+            return response
+
+        except Exception as e:
+            await self._handle_ai_failure(
+                conversation_id, user_mail, user_message, kwargs.get("request_id")
+            )
+            raise OpenAIServiceError(f"AI 回應生成失敗: {str(e)}")
+
+    async def stream_ai_response(
+        self, conversation_id: str, user_mail: str, message: str, **kwargs
+    ) -> AsyncIterator[str]:
+        """流式獲取 AI 回應
+
+        逐段產出模型輸出；最後一段送出後才在背景寫入對話歷史與稽核日誌，
+        寫入不佔用回應的等待時間。可用 wait_pending_writes 等待背景寫入完成。
+        """
+        message = self._normalize_ai_input(conversation_id, user_mail, message)
+        if not message:
+            return
+
+        user_message: Optional[ConversationMessage] = None
+        try:
+            user_message, request_params = await self._prepare_ai_request(
+                conversation_id, user_mail, message, kwargs
+            )
+            request_id = kwargs["request_id"]
+            cache_key = self._response_cache_key(request_params)
+            response = self._response_cache.get(cache_key)
+            if response is None:
+                chunks: List[str] = []
+                async for chunk in self.openai_client.chat_completion_stream(
+                    **request_params
+                ):
+                    chunks.append(chunk)
+                    yield chunk
+                response = "".join(chunks)
+                if response:
+                    self._response_cache.set(cache_key, response)
+            else:
                 self.logger.info(
-                    "KB context injected into conversation user_mail=%s conversation_id=%s kb_len=%d request_id=%s",
-                    user_mail, conversation_id, len(kb_context), request_id,
+                    "AI response served from cache conversation_id=%s request_id=%s",
+                    conversation_id,
+                    request_id,
                 )
+                yield response
+        except Exception as e:
+            await self._handle_ai_failure(
+                conversation_id, user_mail, user_message, kwargs.get("request_id")
+            )
+            raise OpenAIServiceError(f"AI 回應生成失敗: {str(e)}")
 
-            max_tokens = 4000
-            # 記錄上下文資訊（避免記錄完整內容）
-            self.logger.debug(
-                "Prepared OpenAI context user_mail=%s conversation_id=%s messages=%d request_id=%s",
-                user_mail,
+        self._schedule_write(
+            self._persist_turn(
                 conversation_id,
-                len(context),
+                user_mail,
                 request_id,
+                user_message,
+                self._assistant_message(response),
+            )
+        )
+
+    async def wait_pending_writes(self) -> None:
+        """等待 stream_ai_response 排入背景的對話寫入完成"""
+        if self._pending_writes:
+            await asyncio.gather(*self._pending_writes, return_exceptions=True)
+
+    def _normalize_ai_input(
+        self, conversation_id: str, user_mail: str, message: str
+    ) -> str:
+        """空白輸入回傳空字串（不需呼叫模型）；超過上下文預算的輸入先截斷，避免送出後才被 API 拒絕"""
+        if not message or not message.strip():
+            self.logger.info(
+                "AI response skipped for blank input user_mail=%s conversation_id=%s",
+                user_mail,
+                conversation_id,
             )
-            # 調用 OpenAI API
-            response = await self.openai_client.chat_completion(
-                messages=context,
-                model=model_name,
-                max_tokens=kwargs.get("max_tokens", max_tokens),
-                temperature=kwargs.get("temperature", 1.0),
+            return ""
+        if len(message) > self._max_input_chars:
+            self.logger.warning(
+                "AI request input truncated user_mail=%s conversation_id=%s len=%d limit=%d",
+                user_mail,
+                conversation_id,
+                len(message),
+                self._max_input_chars,
             )
+            message = message[: self._max_input_chars]
+        return message
 
-            # 添加AI回應到對話歷史
-            await self.add_assistant_message(conversation_id, user_mail, response)
-            response_preview = (response or "").strip()
-            if len(response_preview) > 120:
-                response_preview = f"{response_preview[:117]}..."
+    async def _prepare_ai_request(
+        self,
+        conversation_id: str,
+        user_mail: str,
+        message: str,
+        kwargs: Dict[str, Any],
+    ) -> Tuple[ConversationMessage, Dict[str, Any]]:
+        """確認對話與權限後，建立本次用戶消息與 OpenAI 請求參數（會補上 kwargs["request_id"]）"""
+        model_name = kwargs.get("model", self.config.openai.model)
+        request_id = kwargs.get("request_id")
+        if not request_id:
+            request_id = str(uuid4())
+            kwargs["request_id"] = request_id
+        prompt_preview = (message or "").strip()
+        if len(prompt_preview) > 120:
+            prompt_preview = f"{prompt_preview[:117]}..."
+        self.logger.info(
+            "AI response requested user_mail=%s conversation_id=%s model=%s request_id=%s",
+            user_mail,
+            conversation_id,
+            model_name,
+            request_id,
+        )
+        if prompt_preview:
+            self.logger.debug(
+                "AI request prompt preview request_id=%s conversation_id=%s text=\"%s\"",
+                request_id,
+                conversation_id,
+                prompt_preview,
+            )
+        # 確保對話存在（自動創建機制，模擬原始行為）
+        conversation = await self.conversation_repository.get_by_id(conversation_id)
+        if not conversation:
             self.logger.info(
-                "AI response stored user_mail=%s conversation_id=%s len=%d request_id=%s preview=\"%s\"",
+                "Conversation missing, creating new conversation user_mail=%s conversation_id=%s request_id=%s",
                 user_mail,
                 conversation_id,
-                len(response or ""),
                 request_id,
-                response_preview or "<empty>",
+            )
+            conversation = await self.conversation_repository.create(
+                conversation_id, user_mail
             )
 
-            return response
+        if conversation.user_mail != user_mail:
+            raise BusinessLogicError("無權限操作此對話")
 
-        except Exception as e:
+        # 用戶消息先在本地建立，與 AI 回應於最後一次寫入
+        user_message = ConversationMessage(
+            role=MessageRole.USER,
+            content=message,
+            timestamp=get_taiwan_time(),
+            metadata={},
+        )
+
+        # 由已取得的對話組出上下文（含本次用戶消息），不再重新讀取 repository
+        history = conversation.messages[-(_AI_CONTEXT_MESSAGES - 1):]
+        context = self._context_from_messages(history + [user_message])
+        # 如果是新對話，添加系統提示
+        if len(context) <= 1:  # 只有用戶消息或空對話
+            context.insert(0, self._get_system_message(user_mail))
+        # 注入知識庫參考資料（由 message_handler 查詢部門對應 KB 後傳入）
+        kb_context = kwargs.get("kb_context", "")
+        if kb_context:
+            kb_system_msg = {
+                "role": "system",
+                "content": (
+                    "以下是從公司知識庫中查詢到的參考資料，請優先參考這些內容來回答使用者的問題。"
+                    "如果知識庫內容與問題相關，請據此回答；如果不相關，則用你自己的知識回答。\n\n"
+                    f"【知識庫參考】\n{kb_context}"
+                ),
+            }
+            # 插入到 system prompt 之後、使用者訊息之前
+            if context and context[0].get("role") == "system":
+                context.insert(1, kb_system_msg)
+            else:
+                context.insert(0, kb_system_msg)
+            self.logger.info(
+                "KB context injected into conversation user_mail=%s conversation_id=%s kb_len=%d request_id=%s",
+                user_mail, conversation_id, len(kb_context), request_id,
+            )
+
+        max_tokens = 4000
+        # 記錄上下文資訊（避免記錄完整內容）
+        self.logger.debug(
+            "Prepared OpenAI context user_mail=%s conversation_id=%s messages=%d request_id=%s",
+            user_mail,
+            conversation_id,
+            len(context),
+            request_id,
+        )
+        request_params = {
+            "messages": context,
+            "model": model_name,
+            "max_tokens": kwargs.get("max_tokens", max_tokens),
+            "temperature": kwargs.get("temperature", 1.0),
+        }
+        return user_message, request_params
+
+    @staticmethod
+    def _response_cache_key(request_params: Dict[str, Any]) -> str:
+        """以請求參數（模型、參數與上下文）的雜湊作為回應快取鍵"""
+        return hashlib.blake2b(
+            json_dumps(request_params).encode("utf-8"), digest_size=16
+        ).hexdigest()
+
+    @staticmethod
+    def _assistant_message(response: str) -> ConversationMessage:
+        """建立 AI 回應消息"""
+        return ConversationMessage(
+            role=MessageRole.ASSISTANT,
+            content=response,
+            timestamp=get_taiwan_time(),
+            metadata={},
+        )
+
+    def _log_response_stored(
+        self, user_mail: str, conversation_id: str, request_id: str, response: str
+    ) -> None:
+        """記錄 AI 回應已寫入（僅記錄預覽）"""
+        response_preview = (response or "").strip()
+        if len(response_preview) > 120:
+            response_preview = f"{response_preview[:117]}..."
+        self.logger.info(
+            "AI response stored user_mail=%s conversation_id=%s len=%d request_id=%s preview=\"%s\"",
+            user_mail,
+            conversation_id,
+            len(response or ""),
+            request_id,
+            response_preview or "<empty>",
+        )
+
+    async def _handle_ai_failure(
+        self,
+        conversation_id: str,
+        user_mail: str,
+        user_message: Optional[ConversationMessage],
+        request_id: Optional[str],
+    ) -> None:
+        """記錄失敗；AI 呼叫失敗時仍保留用戶消息與稽核記錄（與逐則寫入時的行為一致）"""
+        self.logger.exception(
+            "獲取 AI 回應失敗 user_mail=%s conversation_id=%s request_id=%s",
+            user_mail,
+            conversation_id,
+            request_id,
+        )
+        if user_message is not None:
+            try:
+                await self._record_messages(conversation_id, user_mail, [user_message])
+            except Exception:
+                self.logger.exception(
+                    "保存用戶消息失敗 user_mail=%s conversation_id=%s",
+                    user_mail,
+                    conversation_id,
+                )
+
+    async def _persist_turn(
+        self,
+        conversation_id: str,
+        user_mail: str,
+        request_id: str,
+        user_message: ConversationMessage,
+        assistant_message: ConversationMessage,
+    ) -> None:
+        """背景寫入一回合的用戶消息與 AI 回應"""
+        try:
+            await self._record_messages(
+                conversation_id, user_mail, [user_message, assistant_message]
+            )
+        except Exception:
             self.logger.exception(
-                "獲取 AI 回應失敗 user_mail=%s conversation_id=%s request_id=%s",
+                "背景保存對話失敗 user_mail=%s conversation_id=%s request_id=%s",
                 user_mail,
                 conversation_id,
-                kwargs.get("request_id"),
+                request_id,
             )
-            raise OpenAIServiceError(f"AI 回應生成失敗: {str(e)}")
+            return
+        self._log_response_stored(
+            user_mail, conversation_id, request_id, assistant_message.content
+        )
+
+    def _schedule_write(self, coro) -> None:
+        """排入背景寫入並保留 task 參照，避免尚未完成即被回收"""
+        task = asyncio.get_running_loop().create_task(coro)
+        self._pending_writes.add(task)
+        task.add_done_callback(self._pending_writes.discard)
+
+    def _context_from_messages(
+        self,
+        messages: List[ConversationMessage],
+    ) -> List[Dict[str, str]]:
+        """將對話消息轉為 OpenAI 格式，並限制在 token 預算內
+
+        由新到舊納入消息直到用掉上下文視窗的 _CONTEXT_BUDGET_RATIO；
+        放不下的較舊消息合併為一則啟發式摘要（不額外呼叫模型）。
+        """
+        budget = int(self.config.openai.context_window * _CONTEXT_BUDGET_RATIO)
+        used = 0
+        start = len(messages)
+        # 最新一則（通常是本次用戶消息）一定保留
+        while start > 0:
+            cost = self._estimate_tokens(messages[start - 1])
+            if used + cost > budget and start < len(messages):
+                break
+            used += cost
+            start -= 1
+
+        context = [
+            {"role": message.role.value, "content": message.content}
+            for message in messages[start:]
+        ]
+        if start:
+            context.insert(
+                0, {"role": "system", "content": self._heuristic_summary(messages[:start])}
+            )
+        return context
+
+    @staticmethod
+    def _estimate_tokens(message: ConversationMessage) -> int:
+        """粗估消息 token 數：UTF-8 位元組數 / 3（中文約一字一 token，英文約三到四字元一 token）"""
+        return len(message.content.encode("utf-8")) // 3 + 1
+
+    @staticmethod
+    def _heuristic_summary(messages: List[ConversationMessage]) -> str:
+        """將較舊消息壓縮為摘要：每則取首句，並保留條列（- 開頭）的重點"""
+        lines = []
+        for message in messages:
+            content = message.content.strip()
+            if not content:
+                continue
+            first_sentence = _SENTENCE_END.split(content, maxsplit=1)[0].strip()
+            lines.append(f"{message.role.value}: {first_sentence}")
+            lines.extend(
+                line.strip()
+                for line in content.splitlines()[1:]
+                if line.lstrip().startswith("- ")
+            )
+        summary = "\n".join(lines)
+        if len(summary) > _SUMMARY_MAX_CHARS:
+            summary = summary[-_SUMMARY_MAX_CHARS:]
+        return f"先前對話摘要（較舊內容已壓縮）：\n{summary}"
+
+    async def _record_messages(
+        self,
+        conversation_id: str,
+        user_mail: str,
+        messages: List[ConversationMessage],
+    ) -> None:
+        """批次寫入對話消息，並併發記錄對應的稽核日誌"""
+        await asyncio.gather(
+            self.conversation_repository.add_messages(conversation_id, messages),
+            *(
+                self.audit_service.log_user_message(
+                    conversation_id=conversation_id,
+                    user_mail=user_mail,
+                    content=m.content,
+                    metadata=m.metadata,
+                )
+                if m.role == MessageRole.USER
+                else self.audit_service.log_assistant_message(
+                    conversation_id=conversation_id,
+                    user_mail=user_mail,
+                    content=m.content,
+                    metadata=m.metadata,
+                )
+                for m in messages
+            )
+        )
 
-    def _get_system_prompt(self, user_mail: str) -> str:
-        """獲取系統提示"""
+    def _get_system_message(self, user_mail: str) -> Dict[str, str]:
+        """獲取系統消息（OpenAI 格式），回傳共用的常數 dict"""
         # 簡化的系統提示，可以根據用戶語言偏好調整
-        return "你是一個智能助理，負責協助用戶處理各種問題和任務。請用繁體中文回應。"
+        return _SYSTEM_MESSAGE
 
     async def get_conversation_summary(self, user_mail: str) -> Dict[str, Any]:
         """獲取用戶對話摘要"""
@@ -4,20 +4,99 @@
 """
 
 import logging
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional, Tuple
 import json
 import re
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 
 from config.settings import AppConfig
 from infrastructure.external.openai_client import OpenAIClient
 from shared.exceptions import OpenAIServiceError
-from shared.utils.helpers import clean_json_response, extract_json_from_text
+from shared.utils.helpers import TTLCache, clean_json_response, extract_json_from_text
 
 logger = logging.getLogger(__name__)
 
+# 意圖結果快取：意圖 prompt 為固定內容，相同（正規化後的）輸入可直接重用結果
+_INTENT_CACHE_SIZE = 1024
+_INTENT_CACHE_TTL = 3600.0
 
-@dataclass
+
+# 模型選擇功能說明，僅 OpenAI 模式支援
+_MODEL_FEATURES = """
+🧠 模型選擇 (Model Selection):
+  - category: "model"
+  - action: "select" (切換/選擇模型)
+  - 觸發詞: 切換模型、換模型、使用 gpt-4o、選擇模型等
+"""
+
+
+def _render_intent_prompt(model_features: str) -> str:
+    """組出意圖分析 prompt，僅於模組載入時執行"""
+    return f"""你是專業的意圖分析助手。分析用戶輸入並判斷是否符合以下現有功能，必須嚴格按照 JSON 格式回傳結果。
+
+=== 現有功能分類 ===
+
+📝 待辦事項管理 (TODO Management):
+  - category: "todo"
+  - actions:
+    - query: 查詢/查看待辦事項、任務清單
+    - add: 新增/添加待辦事項
+    - smart_add: 智能新增待辦（含重複檢查）
+    - complete: 完成/標記完成待辦事項
+
+🏢 會議管理 (Meeting Management):
+  - category: "meeting" 
+  - actions:
+    - book: 預約/預定會議室
+    - query: 查詢會議、查看行程
+    - cancel: 取消會議/預約
+
+ℹ️ 資訊查詢 (Information Query):
+  - category: "info"
+  - actions:
+    - user_info: 用戶個人資訊查詢（我是誰、我的部門、我的職稱、我的email等）
+    - bot_info: 機器人介紹（你是誰、你的功能、自我介紹等）
+    - help: 使用幫助、系統說明
+    - status: 系統狀態查詢
+
+{model_features}
+
+=== 重要識別規則 ===
+• "我是誰" → info.user_info (用戶查詢自己的身份)
+• "你是誰" → info.bot_info (詢問機器人身份)  
+• "我的部門/單位/職稱/email" → info.user_info
+• "你會什麼/你的功能" → info.bot_info
+
+=== 輸出格式 (必須是有效JSON) ===
+{{
+  "is_existing_feature": true/false,
+  "category": "功能分類",
+  "action": "具體動作", 
+  "content": "相關內容",
+  "confidence": 0.0到1.0之間的數值,
+  "reason": "判斷依據"
+}}
+
+=== 判斷標準 ===
+- 如果用戶輸入明確對應上述功能 → is_existing_feature: true, confidence: 0.8-0.95
+- 如果可能相關但不確定 → is_existing_feature: true, confidence: 0.6-0.79  
+- 如果完全無關（如天氣、數學題、寫報告等） → is_existing_feature: false, confidence: 0.0-0.5
+
+請直接返回JSON，不要添加任何其他文字或格式符號。"""
+
+
+# 意圖分析 prompt 與允許的類別，依 use_azure 預先建立（Azure 模式不支援模型切換）
+_INTENT_PROMPTS = {
+    True: _render_intent_prompt(""),
+    False: _render_intent_prompt(_MODEL_FEATURES),
+}
+_ALLOWED_CATEGORIES = {
+    True: frozenset({"todo", "meeting", "info"}),
+    False: frozenset({"todo", "meeting", "info", "model"}),
+}
+
+
+@dataclass(slots=True)
 class IntentResult:
     """意圖分析結果"""
 
@@ -58,6 +137,9 @@ class IntentService:
     def __init__(self, config: AppConfig, openai_client: OpenAIClient):
         self.config = config
         self.openai_client = openai_client
+        self._intent_cache = TTLCache(maxsize=_INTENT_CACHE_SIZE, ttl=_INTENT_CACHE_TTL)
+        # (use_azure, intent_model) -> (模型名稱, 訊息構建函式, temperature)，設定不變時不再重複判斷模型類型
+        self._call_plans: Dict[Tuple[bool, str], Tuple[str, Callable[[str, str], list], Optional[float]]] = {}
 
     async def analyze_intent(self, user_message: str) -> IntentResult:
         """
@@ -75,28 +157,29 @@ class IntentService:
             )
 
         try:
-            # 構建意圖分析 prompt
-            system_prompt = self._build_intent_prompt()
-
-            # 選擇適當的模型
-            model_name = self._get_intent_model()
+            # 依目前設定取得已解析的模型、訊息構建函式與溫度
+            model_name, build_messages, temperature = self._get_call_plan()
 
-            logger.debug("[意圖分析] 使用模型: %s", model_name)
-            logger.debug("[意圖分析] 用戶輸入: %s", user_message)
+            # 快取鍵：Azure 旗標（決定 prompt）+ 實際模型 + 僅正規化空白的原始訊息。
+            # 不轉小寫——結果中的 content 取自原文，大小寫不同的訊息不可共用結果
+            cache_key = (bool(self.config.openai.use_azure), model_name, " ".join(user_message.split()))
+            cached = self._intent_cache.get(cache_key)
+            if cached is not None:
+                logger.debug("[意圖分析] 使用快取結果: %s", user_message)
+                return replace(cached)
 
-            # 構建訊息
-            messages = self._build_messages(system_prompt, user_message, model_name)
+            logger.debug("[意圖分析] 使用模型: %s 用戶輸入: %s", model_name, user_message)
 
             # 調用 OpenAI API
             response_text = await self.openai_client.chat_completion(
-                messages=messages,
+                messages=build_messages(self._build_intent_prompt(), user_message),
                 model=model_name,
                 max_tokens=300,
-                temperature=0.1 if not model_name.startswith("o1") else None,
+                temperature=temperature,
             )
 
-            logger.debug("[意圖分析] AI回應: %s", response_text)
-            logger.debug("[意圖分析] 回應長度: %d 字符", len(response_text))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[意圖分析] AI回應 (%d 字符): %s", len(response_text), response_text)
 
             # 解析回應
             result = self._parse_intent_response(response_text)
@@ -104,6 +187,10 @@ class IntentService:
             logger.info("[意圖分析] 解析成功: 類別=%s 動作=%s 現有功能=%s 信心度=%s",
                         result.category, result.action, result.is_existing_feature, result.confidence)
 
+            # 只快取模型有給出判斷的結果，空回應或無法解析時下次重新分析
+            if result.is_existing_feature or result.confidence > 0:
+                self._intent_cache.set(cache_key, replace(result))
+
             return result
 
         except Exception as e:
@@ -118,95 +205,42 @@ class IntentService:
             )
 
     def _build_intent_prompt(self) -> str:
-        """構建意圖分析 prompt"""
-        # 根據模式決定是否支援模型切換
-        model_features = ""
-        if not self.config.openai.use_azure:
-            model_features = """
-🧠 模型選擇 (Model Selection):
-  - category: "model"
-  - action: "select" (切換/選擇模型)
-  - 觸發詞: 切換模型、換模型、使用 gpt-4o、選擇模型等
-"""
-
-        return f"""你是專業的意圖分析助手。分析用戶輸入並判斷是否符合以下現有功能，必須嚴格按照 JSON 格式回傳結果。
-
-=== 現有功能分類 ===
-
-📝 待辦事項管理 (TODO Management):
-  - category: "todo"
-  - actions:
-    - query: 查詢/查看待辦事項、任務清單
-    - add: 新增/添加待辦事項
-    - smart_add: 智能新增待辦（含重複檢查）
-    - complete: 完成/標記完成待辦事項
-
-🏢 會議管理 (Meeting Management):
-  - category: "meeting" 
-  - actions:
-    - book: 預約/預定會議室
-    - query: 查詢會議、查看行程
-    - cancel: 取消會議/預約
-
-ℹ️ 資訊查詢 (Information Query):
-  - category: "info"
-  - actions:
-    - user_info: 用戶個人資訊查詢（我是誰、我的部門、我的職稱、我的email等）
-    - bot_info: 機器人介紹（你是誰、你的功能、自我介紹等）
-    - help: 使用幫助、系統說明
-    - status: 系統狀態查詢
-
-{model_features}
-
-=== 重要識別規則 ===
-• "我是誰" → info.user_info (用戶查詢自己的身份)
-• "你是誰" → info.bot_info (詢問機器人身份)  
-• "我的部門/單位/職稱/email" → info.user_info
-• "你會什麼/你的功能" → info.bot_info
-
-=== 輸出格式 (必須是有效JSON) ===
-{{
-  "is_existing_feature": true/false,
-  "category": "功能分類",
-  "action": "具體動作", 
-  "content": "相關內容",
-  "confidence": 0.0到1.0之間的數值,
-  "reason": "判斷依據"
-}}
-
-=== 判斷標準 ===
-- 如果用戶輸入明確對應上述功能 → is_existing_feature: true, confidence: 0.8-0.95
-- 如果可能相關但不確定 → is_existing_feature: true, confidence: 0.6-0.79  
-- 如果完全無關（如天氣、數學題、寫報告等） → is_existing_feature: false, confidence: 0.0-0.5
-
-請直接返回JSON，不要添加任何其他文字或格式符號。"""
+        """取得意圖分析 prompt（內容固定，僅依是否為 Azure 模式二選一）"""
+        return _INTENT_PROMPTS[bool(self.config.openai.use_azure)]
 
     def _get_intent_model(self) -> str:
         """獲取意圖分析模型"""
         if self.config.openai.use_azure:
             return "gpt-4o-mini"  # Azure 模式使用穩定模型
-        else:
-            # OpenAI 模式：優先使用穩定的模型，避免 gpt-5 系列的相容性問題
-            original_model = self.config.openai.intent_model
-            # if original_model.startswith("gpt-5") or original_model.startswith("o1"):
-            #     print(f"⚠️ [意圖分析] {original_model} 可能不穩定，改用 gpt-4o-mini")
-            #     return "gpt-4o-mini"
-            return original_model
-
-    def _build_messages(
-        self, system_prompt: str, user_message: str, model_name: str
-    ) -> list:
-        """構建訊息列表"""
-        if model_name.startswith("o1"):
-            # o1 模型不支援 system role，需要合併到 user message
-            combined_prompt = f"{system_prompt}\n\n用戶輸入: {user_message}"
-            return [{"role": "user", "content": combined_prompt}]
-        else:
-            # 標準模型支援 system role
-            return [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_message},
-            ]
+        # OpenAI 模式：使用設定的意圖分析模型
+        return self.config.openai.intent_model
+
+    def _get_call_plan(self) -> Tuple[str, Callable[[str, str], list], Optional[float]]:
+        """依設定解析意圖分析的模型、訊息構建函式與 temperature，同一組設定只解析一次"""
+        key = (bool(self.config.openai.use_azure), self.config.openai.intent_model)
+        plan = self._call_plans.get(key)
+        if plan is None:
+            model_name = self._get_intent_model()
+            if model_name.startswith("o1"):
+                plan = (model_name, self._build_messages_o1, None)
+            else:
+                plan = (model_name, self._build_messages_standard, 0.1)
+            self._call_plans[key] = plan
+        return plan
+
+    @staticmethod
+    def _build_messages_standard(system_prompt: str, user_message: str) -> list:
+        """構建訊息列表（標準模型支援 system role）"""
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_message},
+        ]
+
+    @staticmethod
+    def _build_messages_o1(system_prompt: str, user_message: str) -> list:
+        """構建訊息列表（o1 模型不支援 system role，需要合併到 user message）"""
+        combined_prompt = f"{system_prompt}\n\n用戶輸入: {user_message}"
+        return [{"role": "user", "content": combined_prompt}]
 
     def _parse_intent_response(self, response_text: str) -> IntentResult:
         """解析意圖分析回應"""
@@ -242,26 +276,23 @@ class IntentService:
 
     def _normalize_intent_result(self, result: IntentResult) -> IntentResult:
         """正規化意圖結果"""
-        allowed_categories = {"todo", "meeting", "info", "model"}
-
         # Azure 模式不支援模型切換
-        if self.config.openai.use_azure:
-            allowed_categories.discard("model")
-
-        # 檢查類別是否合法
-        if result.category.lower() not in allowed_categories:
+        allowed_categories = _ALLOWED_CATEGORIES[bool(self.config.openai.use_azure)]
+
+        # 檢查類別是否合法（多數回應已是小寫，免去 lower() 配置新字串）
+        category = result.category
+        normalized = category if category.islower() else category.lower()
+        if normalized in allowed_categories:
+            # 合法類別即為現有功能
+            result.category = normalized
+            result.is_existing_feature = True
+            # 確保信心度在合理範圍內
+            confidence = result.confidence
+            result.confidence = 0.0 if confidence < 0.0 else 1.0 if confidence > 1.0 else confidence
+        else:
             result.is_existing_feature = False
             result.category = ""
             result.confidence = 0.0
-            result.reason = f"不支援的類別: {result.category}"
-        else:
-            result.category = result.category.lower()
-
-        # 確保信心度在合理範圍內
-        result.confidence = max(0.0, min(1.0, result.confidence))
-
-        # 如果沒有明確的 is_existing_feature，根據類別判斷
-        if result.category and result.category in allowed_categories:
-            result.is_existing_feature = True
+            result.reason = f"不支援的類別: {category}"
 
         return result
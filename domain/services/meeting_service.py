@@ -4,20 +4,103 @@
 """
 
 import logging
-from typing import List, Dict, Any, Optional
+import time
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 
 from domain.models.user import UserProfile
 from domain.repositories.user_repository import UserRepository
 from config.settings import AppConfig
 from shared.exceptions import BusinessLogicError, NotFoundError
-from shared.utils.helpers import get_taiwan_time
+from shared.utils.helpers import TAIWAN_TZ, TTLCache, get_taiwan_time
 from config.meeting_rooms import get_meeting_rooms as cfg_get_meeting_rooms
-import pytz
 from infrastructure.external.graph_api_client import GraphAPIClient
 
 logger = logging.getLogger(__name__)
 
+# 查詢我的預約時 calendarView 取回的欄位
+_CALENDAR_SELECT = "id,subject,start,end,location,organizer,attendees"
+
+# 我的預約快取：提醒與卡片短時間內重複查詢同一用戶時重用結果；預約/取消後立即失效
+_MEETINGS_CACHE_SIZE = 512
+_MEETINGS_CACHE_TTL = 60.0
+
+# 會議室列表快取存活秒數（設定檔內容幾乎不變）
+_ROOMS_CACHE_TTL = 600.0
+
+# 會議室列表快取：(建立時間, 會議室列表, 小寫 email -> 顯示名稱)
+_rooms_cache: Optional[Tuple[float, List[Dict[str, str]], Dict[str, str]]] = None
+
+
+def _get_rooms_index() -> Tuple[List[Dict[str, str]], Dict[str, str]]:
+    """取得會議室列表與 email 對應名稱索引，過期才重新讀取設定"""
+    global _rooms_cache
+    cached = _rooms_cache
+    now = time.monotonic()
+    if cached is None or now - cached[0] > _ROOMS_CACHE_TTL:
+        rooms = cfg_get_meeting_rooms()
+        email_to_name = {
+            r["emailAddress"].lower(): r.get("displayName")
+            for r in rooms
+            if r.get("emailAddress")
+        }
+        cached = (now, rooms, email_to_name)
+        _rooms_cache = cached
+    return cached[1], cached[2]
+
+
+def _parse_booking_datetime(date_str: str, time_str: str) -> datetime:
+    """解析 YYYY-MM-DD 與 HH:MM 為台灣時間
+
+    固定寬度格式直接切片轉整數；其他寫法（如單位數月日）退回 strptime，
+    格式錯誤時一律拋出 ValueError。
+    """
+    if (
+        len(date_str) == 10
+        and len(time_str) == 5
+        and date_str[4] == date_str[7] == "-"
+        and time_str[2] == ":"
+    ):
+        naive = datetime(
+            int(date_str[0:4]),
+            int(date_str[5:7]),
+            int(date_str[8:10]),
+            int(time_str[0:2]),
+            int(time_str[3:5]),
+        )
+    else:
+        naive = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M")
+    return TAIWAN_TZ.localize(naive)
+
+
+def _parse_graph_datetime(dt_dict: Optional[dict]) -> Optional[datetime]:
+    """解析 Graph 事件時間為台灣時間
+
+    若 Graph 回傳已為台灣時間（header Prefer 設為 Taipei），則不再額外 +8；
+    若包含 Z 或明確時區偏移，才轉為台灣時區。
+    """
+    s = ((dt_dict or {}).get("dateTime") or "").strip()
+    if not s:
+        return None
+    s2 = s.replace("Z", "+00:00")
+    try:
+        dtp = datetime.fromisoformat(s2)
+    except Exception:
+        return None
+    if dtp.tzinfo is None:
+        # 無時區資訊：視為已是台灣時間（因為我們在請求中帶了 Prefer: Taipei）
+        try:
+            return TAIWAN_TZ.localize(dtp)
+        except Exception:
+            return dtp
+    return dtp.astimezone(TAIWAN_TZ)
+
+
+def invalidate_rooms_cache() -> None:
+    """清除會議室列表快取（會議室設定變更後由管理端呼叫）"""
+    global _rooms_cache
+    _rooms_cache = None
+
 
 class MeetingService:
     """會議管理業務邏輯服務"""
@@ -31,10 +114,13 @@ class MeetingService:
         self.config = config
         self.user_repository = user_repository
         self.graph_client = graph_client
+        # (user_mail 小寫, days_ahead) -> 預約列表；預約或取消後移除該用戶的所有項目
+        self._meetings_cache = TTLCache(maxsize=_MEETINGS_CACHE_SIZE, ttl=_MEETINGS_CACHE_TTL)
 
     async def get_meeting_rooms(self) -> List[Dict[str, str]]:
         """獲取可用會議室列表（displayName + emailAddress）。"""
-        return cfg_get_meeting_rooms()
+        rooms, _ = _get_rooms_index()
+        return list(rooms)
 
     async def book_meeting_room(
         self, user_mail: str, booking_data: Dict[str, Any]
@@ -88,13 +174,8 @@ class MeetingService:
 
         # 解析時間（台灣時區）
         try:
-            tz = pytz.timezone("Asia/Taipei")
-            start_dt = tz.localize(
-                datetime.strptime(f"{date_str} {start_str}", "%Y-%m-%d %H:%M")
-            )
-            end_dt = tz.localize(
-                datetime.strptime(f"{date_str} {end_str}", "%Y-%m-%d %H:%M")
-            )
+            start_dt = _parse_booking_datetime(date_str, start_str)
+            end_dt = _parse_booking_datetime(date_str, end_str)
         except Exception:
             return {"success": False, "error": "日期或時間格式不正確"}
 
@@ -115,6 +196,7 @@ class MeetingService:
                     attendees=[],  # 可擴充外部傳入
                     room_email=room_id,
                 )
+            self._invalidate_user_meetings(user_mail)
 
             # 正常情況 Graph 會回傳 event 物件
             booking_info = {
@@ -137,17 +219,16 @@ class MeetingService:
         self, user_mail: str, days_ahead: int = 7
     ) -> List[Dict[str, Any]]:
         """獲取用戶的會議安排（使用 Graph calendarView，台灣時區）。"""
-        tz = pytz.timezone("Asia/Taipei")
-        now = get_taiwan_time()
-        end_dt = now + timedelta(days=days_ahead)
+        cache_key = self._meetings_cache_key(user_mail, days_ahead)
+        cached = self._meetings_cache.get(cache_key)
+        if cached is not None:
+            return [dict(meeting) for meeting in cached]
 
-        # 依原始作法使用 calendarView 並傳入 +08:00 字串
-        start_str = now.strftime("%Y-%m-%dT%H:%M:%S+08:00")
-        end_str = end_dt.strftime("%Y-%m-%dT%H:%M:%S+08:00")
+        now = get_taiwan_time()
+        start_str, end_str = self._calendar_window(now, days_ahead)
 
-        # 會議室 email 列表（以 email 篩選會議室預約）
-        rooms = await self.get_meeting_rooms()
-        room_email_set = {r.get("emailAddress", "").lower() for r in rooms}
+        # 會議室 email 索引（以 email 篩選會議室預約）
+        _, room_names = _get_rooms_index()
 
         try:
             async with self.graph_client as gclient:
@@ -155,103 +236,105 @@ class MeetingService:
                     user_email=user_mail,
                     start_time=start_str,
                     end_time=end_str,
-                    select="id,subject,start,end,location,organizer,attendees",
+                    select=_CALENDAR_SELECT,
                 )
+            meetings = self._meetings_from_events(events, user_mail, room_names, now)
+
+        except Exception as e:
+            # 回退：出錯時回傳空列表，避免影響 UI（不寫入快取）
+            logger.error("取得我的預約失敗: %s", e)
+            return []
 
-            results: List[Dict[str, Any]] = []
+        self._meetings_cache.set(cache_key, [dict(meeting) for meeting in meetings])
+        return meetings
 
-            for ev in events:
-                attendees = ev.get("attendees", []) or []
-                # 是否包含任一會議室資源
-                has_room = False
-                matched_room_name = None
-                for a in attendees:
-                    addr = (
-                        ((a or {}).get("emailAddress") or {}).get("address", "").lower()
-                    )
-                    if addr in room_email_set:
-                        has_room = True
-                        # 找出對應的顯示名稱
-                        matched = next(
-                            (
-                                r
-                                for r in rooms
-                                if r.get("emailAddress", "").lower() == addr
-                            ),
-                            None,
-                        )
-                        matched_room_name = (
-                            matched.get("displayName") if matched else None
-                        )
-                        break
-
-                if not has_room:
-                    continue
-
-                # 解析時間：若 Graph 回傳已為台灣時間（header Prefer 設為 Taipei），則不再額外 +8
-                # 若包含 Z 或明確時區偏移，才轉為台灣時區
-                def parse_to_local(dt_dict: dict) -> Optional[datetime]:
-                    s = ((dt_dict or {}).get("dateTime") or "").strip()
-                    if not s:
-                        return None
-                    s2 = s.replace("Z", "+00:00")
-                    try:
-                        dtp = datetime.fromisoformat(s2)
-                    except Exception:
-                        return None
-                    if dtp.tzinfo is None:
-                        # 無時區資訊：視為已是台灣時間（因為我們在請求中帶了 Prefer: Taipei）
-                        try:
-                            return tz.localize(dtp)
-                        except Exception:
-                            return dtp
-                    else:
-                        return dtp.astimezone(tz)
-
-                dt_start_tw = parse_to_local(ev.get("start"))
-                dt_end_tw = parse_to_local(ev.get("end"))
-                if not dt_start_tw or not dt_end_tw:
-                    continue
-
-                # 僅保留未來的預約
-                if dt_start_tw <= now:
-                    continue
-
-                # 友善格式：日期/時間分離，卡片會直接印字串
-                date_str = dt_start_tw.strftime("%Y/%m/%d (%a)")
-                time_str = f"{dt_start_tw.strftime('%H:%M')} - {dt_end_tw.strftime('%H:%M')}"
-
-                # 判斷是否為發起人（Organizer）
-                organizer_email = (
-                    ((ev.get("organizer") or {}).get("emailAddress") or {}).get("address", "")
-                ).lower()
-                is_organizer = organizer_email == (user_mail or "").lower()
+    @staticmethod
+    def _meetings_cache_key(user_mail: str, days_ahead: int) -> Tuple[str, int]:
+        return ((user_mail or "").lower(), days_ahead)
 
-                results.append(
-                    {
-                        "id": ev.get("id"),
-                        "subject": ev.get("subject") or "會議",
-                        "location": matched_room_name
-                        or ((ev.get("location") or {}).get("displayName") or "會議室"),
-                        "is_organizer": is_organizer,
-                        # 供不同卡片/場景使用的字串欄位
-                        "date": date_str,
-                        "start_time": dt_start_tw.strftime("%Y-%m-%d %H:%M"),
-                        "end_time": dt_end_tw.strftime("%Y-%m-%d %H:%M"),
-                        # 也保留原始 ISO 以便後續可能使用
-                        "start_iso": dt_start_tw.isoformat(),
-                        "end_iso": dt_end_tw.isoformat(),
-                    }
-                )
+    def _invalidate_user_meetings(self, user_mail: str) -> None:
+        """移除該用戶所有 days_ahead 的預約快取"""
+        user = (user_mail or "").lower()
+        self._meetings_cache.remove_if(lambda key: key[0] == user)
 
-            # 依開始時間排序
-            results.sort(key=lambda x: x.get("start_iso", ""))
-            return results
+    @staticmethod
+    def _calendar_window(now: datetime, days_ahead: int) -> Tuple[str, str]:
+        """查詢區間：依原始作法使用 calendarView 並傳入 +08:00 字串"""
+        end_dt = now + timedelta(days=days_ahead)
+        return (
+            now.strftime("%Y-%m-%dT%H:%M:%S+08:00"),
+            end_dt.strftime("%Y-%m-%dT%H:%M:%S+08:00"),
+        )
 
-        except Exception as e:
-            # 回退：出錯時回傳空列表，避免影響 UI
-            logger.error("取得我的預約失敗: %s", e)
-            return []
+    @staticmethod
+    def _meetings_from_events(
+        events: List[Dict[str, Any]],
+        user_mail: str,
+        room_names: Dict[str, str],
+        now: datetime,
+    ) -> List[Dict[str, Any]]:
+        """由 calendarView 事件挑出含會議室的未來預約，轉為卡片使用的格式
+
+        room_names 為小寫會議室 email 對應顯示名稱的索引。
+        """
+        results: List[Dict[str, Any]] = []
+
+        for ev in events:
+            # 第一個屬於會議室資源的與會者（依與會者順序）；沒有則略過此事件
+            room_addr = next(
+                (
+                    addr
+                    for addr in (
+                        (((a or {}).get("emailAddress") or {}).get("address") or "").lower()
+                        for a in ev.get("attendees") or ()
+                    )
+                    if addr in room_names
+                ),
+                None,
+            )
+            if room_addr is None:
+                continue
+            matched_room_name = room_names[room_addr]
+
+            # 解析時間（台灣時區）
+            dt_start_tw = _parse_graph_datetime(ev.get("start"))
+            dt_end_tw = _parse_graph_datetime(ev.get("end"))
+            if not dt_start_tw or not dt_end_tw:
+                continue
+
+            # 僅保留未來的預約
+            if dt_start_tw <= now:
+                continue
+
+            # 友善格式：日期/時間分離，卡片會直接印字串
+            date_str = dt_start_tw.strftime("%Y/%m/%d (%a)")
+
+            # 判斷是否為發起人（Organizer）
+            organizer_email = (
+                ((ev.get("organizer") or {}).get("emailAddress") or {}).get("address", "")
+            ).lower()
+            is_organizer = organizer_email == (user_mail or "").lower()
+
+            results.append(
+                {
+                    "id": ev.get("id"),
+                    "subject": ev.get("subject") or "會議",
+                    "location": matched_room_name
+                    or ((ev.get("location") or {}).get("displayName") or "會議室"),
+                    "is_organizer": is_organizer,
+                    # 供不同卡片/場景使用的字串欄位
+                    "date": date_str,
+                    "start_time": dt_start_tw.strftime("%Y-%m-%d %H:%M"),
+                    "end_time": dt_end_tw.strftime("%Y-%m-%d %H:%M"),
+                    # 也保留原始 ISO 以便後續可能使用
+                    "start_iso": dt_start_tw.isoformat(),
+                    "end_iso": dt_end_tw.isoformat(),
+                }
+            )
+
+        # 依開始時間排序
+        results.sort(key=lambda x: x.get("start_iso", ""))
+        return results
 
     async def list_meeting_rooms_graph(self) -> List[Dict[str, Any]]:
         """使用 Graph API 取得會議室列表。"""
@@ -303,6 +386,7 @@ class MeetingService:
                     action = "declined_self"
                     note = "已取消參與（不影響其他人），並自行從行事曆移除"
 
+            self._invalidate_user_meetings(user_mail)
             return {
                 "success": True,
                 "cancellation": {
@@ -314,6 +398,8 @@ class MeetingService:
                 },
             }
         except Exception as e:
+            # 可能已部分完成（如已拒絕但刪除失敗），一律讓快取失效
+            self._invalidate_user_meetings(user_mail)
             msg = str(e)
             if " 403" in msg or "403" in msg:
                 friendly = "無權限執行此操作"
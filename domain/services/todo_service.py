@@ -2,7 +2,9 @@
 待辦事項業務邏輯服務
 重構自原始 app.py 中的待辦事項相關功能
 """
+import heapq
 import logging
+import re
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 
@@ -10,10 +12,31 @@ from domain.models.todo import TodoItem, TodoStatus
 from domain.repositories.todo_repository import TodoRepository
 from config.settings import AppConfig
 from shared.exceptions import BusinessLogicError, NotFoundError
-from shared.utils.helpers import get_taiwan_time
+from shared.utils.helpers import TTLCache, get_taiwan_time
 
 logger = logging.getLogger(__name__)
 
+# 時間相關關鍵字（子字串比對，合併為單一正則一次掃描）
+_TIME_KEYWORDS = (
+    "下午", "上午", "晚上", "早上", "今天", "明天", "後天",
+    "週一", "週二", "週三", "週四", "週五", "週六", "週日",
+    "月份", "小時", "分鐘", "點", "時", "分", "秒"
+)
+_TIME_KEYWORD_RE = re.compile("|".join(map(re.escape, _TIME_KEYWORDS)))
+
+# 動作關鍵字（關鍵字彼此可能重疊，如「開會」「會議」，逐一比對以保留所有命中）
+_ACTION_KEYWORDS = (
+    "討論", "開會", "會議", "聯絡", "打電話", "發信", "寫",
+    "完成", "處理", "檢查", "確認", "準備"
+)
+
+# 人員（簡單的中文姓名或英文名模式）
+_PERSON_RE = re.compile(r"([A-Za-z]+|[\u4e00-\u9fff]{2,4})")
+
+# 既有待辦內容的特徵快取（以內容為鍵，內容變更即自然失效）
+_FEATURE_CACHE_SIZE = 2048
+_FEATURE_CACHE_TTL = 3600.0
+
 
 class TodoSimilarityAnalyzer:
     """待辦事項相似度分析器"""
@@ -23,46 +46,42 @@ class TodoSimilarityAnalyzer:
         """提取待辦事項的特徵"""
         content_lower = content.lower()
         
-        # 時間相關關鍵字
-        time_keywords = [
-            "下午", "上午", "晚上", "早上", "今天", "明天", "後天",
-            "週一", "週二", "週三", "週四", "週五", "週六", "週日",
-            "月份", "小時", "分鐘", "點", "時", "分", "秒"
-        ]
-        
-        # 動作關鍵字
-        action_keywords = [
-            "討論", "開會", "會議", "聯絡", "打電話", "發信", "寫",
-            "完成", "處理", "檢查", "確認", "準備"
-        ]
-        
-        # 提取人員（簡單的中文姓名或英文名模式）
-        import re
-        person_pattern = r"([A-Za-z]+|[\u4e00-\u9fff]{2,4})"
-        potential_persons = re.findall(person_pattern, content)
-        persons = [p for p in potential_persons if len(p) >= 2]
+        # 提取人員
+        persons = [p for p in _PERSON_RE.findall(content) if len(p) >= 2]
+        actions = [keyword for keyword in _ACTION_KEYWORDS if keyword in content_lower]
         
         return {
-            "time_mentioned": any(keyword in content_lower for keyword in time_keywords),
+            "time_mentioned": _TIME_KEYWORD_RE.search(content_lower) is not None,
             "persons": persons,
-            "actions": [keyword for keyword in action_keywords if keyword in content_lower],
+            "actions": actions,
             "content_words": set(content_lower.split()),
+            # 比對時直接使用的集合，避免每組比對重建
+            "person_set": frozenset(persons),
+            "action_set": frozenset(actions),
         }
     
     @staticmethod
     def calculate_similarity(content1: str, content2: str) -> float:
         """計算兩個待辦事項的相似度（0-1之間）"""
-        features1 = TodoSimilarityAnalyzer.extract_features(content1)
-        features2 = TodoSimilarityAnalyzer.extract_features(content2)
-        
+        return TodoSimilarityAnalyzer.calculate_similarity_prepared(
+            TodoSimilarityAnalyzer.extract_features(content1),
+            TodoSimilarityAnalyzer.extract_features(content2),
+        )
+    
+    @staticmethod
+    def calculate_similarity_prepared(
+        features1: Dict[str, Any], features2: Dict[str, Any]
+    ) -> float:
+        """以已提取的特徵計算相似度（0-1之間），供同一內容比對多筆時重用特徵"""
         similarity_score = 0
         weight_total = 0
         
         # 人員相似度（權重：0.4）
         person_weight = 0.4
-        if features1["persons"] or features2["persons"]:
-            common_persons = set(features1["persons"]) & set(features2["persons"])
-            total_persons = set(features1["persons"]) | set(features2["persons"])
+        persons1, persons2 = features1["person_set"], features2["person_set"]
+        if persons1 or persons2:
+            common_persons = persons1 & persons2
+            total_persons = persons1 | persons2
             if total_persons:
                 person_similarity = len(common_persons) / len(total_persons)
                 similarity_score += person_similarity * person_weight
@@ -70,9 +89,10 @@ class TodoSimilarityAnalyzer:
         
         # 動作相似度（權重：0.3）
         action_weight = 0.3
-        if features1["actions"] or features2["actions"]:
-            common_actions = set(features1["actions"]) & set(features2["actions"])
-            total_actions = set(features1["actions"]) | set(features2["actions"])
+        actions1, actions2 = features1["action_set"], features2["action_set"]
+        if actions1 or actions2:
+            common_actions = actions1 & actions2
+            total_actions = actions1 | actions2
             if total_actions:
                 action_similarity = len(common_actions) / len(total_actions)
                 similarity_score += action_similarity * action_weight
@@ -106,6 +126,7 @@ class TodoService:
         self.config = config
         self.todo_repository = todo_repository
         self.similarity_threshold = 0.6  # 相似度閾值
+        self._feature_cache = TTLCache(maxsize=_FEATURE_CACHE_SIZE, ttl=_FEATURE_CACHE_TTL)
     
     async def create_todo(self, user_mail: str, content: str) -> TodoItem:
         """創建待辦事項"""
@@ -146,8 +167,12 @@ class TodoService:
         pending_todos = await self.todo_repository.get_pending_by_user(user_mail)
         similar_todos = []
         
+        # 新內容只提取一次特徵；既有待辦的特徵沿用快取
+        new_features = TodoSimilarityAnalyzer.extract_features(content)
         for todo in pending_todos:
-            similarity = TodoSimilarityAnalyzer.calculate_similarity(content, todo.content)
+            similarity = TodoSimilarityAnalyzer.calculate_similarity_prepared(
+                new_features, self._get_features(todo.content)
+            )
             if similarity > self.similarity_threshold:
                 similar_todos.append({
                     "todo": todo,
@@ -155,9 +180,16 @@ class TodoService:
                     "similarity_percent": int(similarity * 100)
                 })
         
-        # 按相似度排序
-        similar_todos.sort(key=lambda x: x["similarity"], reverse=True)
-        return similar_todos[:3]  # 最多返回 3 個相似項目
+        # 按相似度排序，最多返回 3 個相似項目
+        return heapq.nlargest(3, similar_todos, key=lambda x: x["similarity"])
+    
+    def _get_features(self, content: str) -> Dict[str, Any]:
+        """取得待辦內容的特徵（快取）"""
+        features = self._feature_cache.get(content)
+        if features is None:
+            features = TodoSimilarityAnalyzer.extract_features(content)
+            self._feature_cache.set(content, features)
+        return features
     
     async def get_user_todos(self, user_mail: str, include_completed: bool = False) -> List[TodoItem]:
         """獲取用戶的待辦事項"""
@@ -192,17 +224,20 @@ class TodoService:
         if not pending_todos:
             raise BusinessLogicError("沒有待辦事項可完成")
         
-        completed_todos = []
-        
-        for index in todo_indices:
-            # 檢查索引範圍
-            if 0 <= index < len(pending_todos):
-                todo = pending_todos[index]
-                try:
-                    completed_todo = await self.complete_todo(todo.id, user_mail)
-                    completed_todos.append(completed_todo)
-                except Exception as e:
-                    logger.warning("完成待辦事項 %s 失敗: %s", todo.id, e)
+        # 檢查索引範圍並去除重複，再一次交由 repository 完成
+        todo_ids = list(dict.fromkeys(
+            pending_todos[index].id
+            for index in todo_indices
+            if 0 <= index < len(pending_todos)
+        ))
+        completed_todos = await self.todo_repository.batch_mark_completed(todo_ids, user_mail)
+        
+        if len(completed_todos) < len(todo_ids):
+            logger.warning(
+                "批量完成待辦事項略過 %d 筆（已完成或不存在） user_mail=%s",
+                len(todo_ids) - len(completed_todos),
+                user_mail,
+            )
         
         return completed_todos
     
@@ -220,26 +255,16 @@ class TodoService:
     
     async def get_user_stats(self, user_mail: str) -> Dict[str, Any]:
         """獲取用戶統計信息"""
-        stats = await self.todo_repository.get_user_stats(user_mail)
-        
-        # 添加額外統計信息
-        todos = await self.todo_repository.get_by_user(user_mail)
-        
-        if todos:
-            # 計算平均完成時間
-            completed_todos = [t for t in todos if t.is_completed and t.completed_at]
-            if completed_todos:
-                total_completion_time = sum(
-                    (t.completed_at - t.created_at).total_seconds() 
-                    for t in completed_todos
-                )
-                avg_completion_hours = total_completion_time / len(completed_todos) / 3600
-                stats["average_completion_hours"] = round(avg_completion_hours, 2)
-            
+        week_ago = get_taiwan_time() - timedelta(days=7)
+        extended = await self.todo_repository.get_user_stats_extended(user_mail, week_ago)
+        
+        stats = {key: extended[key] for key in ("total", "pending", "completed", "cancelled")}
+        if stats["total"]:
+            # 平均完成時間（有已完成項目時才提供）
+            if extended["average_completion_hours"] is not None:
+                stats["average_completion_hours"] = round(extended["average_completion_hours"], 2)
             # 最近 7 天的活動
-            week_ago = get_taiwan_time() - timedelta(days=7)
-            recent_todos = [t for t in todos if t.created_at >= week_ago]
-            stats["recent_week_count"] = len(recent_todos)
+            stats["recent_week_count"] = extended["recent_count"]
         
         return stats
     
@@ -258,16 +283,8 @@ class TodoService:
     
     async def get_todos_for_reminder(self) -> Dict[str, List[TodoItem]]:
         """獲取需要提醒的待辦事項（按用戶分組）"""
-        # 獲取所有有待辦事項的用戶
-        all_users = await self.todo_repository.get_all_users_with_todos()
-        
-        reminders = {}
-        for user_mail in all_users:
-            pending_todos = await self.todo_repository.get_pending_by_user(user_mail)
-            if pending_todos:
-                reminders[user_mail] = pending_todos
-        
-        return reminders
+        # 一次取得所有用戶的待處理事項，不逐一查詢每位用戶
+        return await self.todo_repository.get_all_pending_grouped()
     
     async def search_todos(
         self, 
@@ -277,35 +294,11 @@ class TodoService:
         date_from: Optional[datetime] = None,
         date_to: Optional[datetime] = None
     ) -> List[TodoItem]:
-        """搜索待辦事項"""
-        todos = await self.todo_repository.get_by_user(user_mail)
-        
-        # 應用過濾條件
-        filtered_todos = todos
-        
-        if keyword:
-            keyword_lower = keyword.lower()
-            filtered_todos = [
-                todo for todo in filtered_todos 
-                if keyword_lower in todo.content.lower()
-            ]
-        
-        if status:
-            filtered_todos = [
-                todo for todo in filtered_todos 
-                if todo.status == status
-            ]
-        
-        if date_from:
-            filtered_todos = [
-                todo for todo in filtered_todos 
-                if todo.created_at >= date_from
-            ]
-        
-        if date_to:
-            filtered_todos = [
-                todo for todo in filtered_todos 
-                if todo.created_at <= date_to
-            ]
-        
-        return filtered_todos
\ No newline at end of file
+        """搜索待辦事項（條件於 repository 單次走訪中套用）"""
+        return await self.todo_repository.search(
+            user_mail,
+            keyword=keyword,
+            status=status,
+            date_from=date_from,
+            date_to=date_to,
+        )
\ No newline at end of file
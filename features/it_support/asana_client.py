@@ -1,45 +1,163 @@
+import asyncio
+import gzip
+import json
+import logging
 import os
-from typing import Any, Dict, Optional
+import random
+from typing import Any, BinaryIO, Dict, Optional, Union
 import httpx
 
+try:
+    import h2  # noqa: F401  # httpx 的 HTTP/2 支援需要 h2 套件
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 依賴環境
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# 共用連線池上限（同一 AsanaClient 的所有請求重用連線，避免每次呼叫重新 TCP/TLS 握手）
+_POOL_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=100)
+
+# 建單（POST /tasks）非冪等：只在確定請求未被處理時重試——429 限流，以及帶 Retry-After 的 503。
+# 500 / 502 / 504 時 Asana 端可能已建立（或仍在建立）任務，重試會重複建單，因此不重試
+_RETRY_STATUS = frozenset({429})
+_RETRY_AFTER_STATUS = frozenset({503})
+_MAX_ATTEMPTS = 3
+_DEFAULT_RETRY_AFTER = 1.0
+
+# 請求內容超過此大小才 gzip 壓縮（壓縮等級 1：每 KB 僅數微秒，典型 JSON 約可減半）
+_GZIP_MIN_BYTES = 1024
+_GZIP_LEVEL = 1
+
+# 附件上傳逾時：大檔（截圖、錄影）回應較慢，讀取逾時放寬到 120 秒
+_UPLOAD_TIMEOUT = httpx.Timeout(60.0, read=120.0)
+
+
+def _dumps(data: Any) -> bytes:
+    """序列化請求內容；有 orjson 時優先使用"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+
+def _loads(resp: httpx.Response) -> Any:
+    """解析回應內容；有 orjson 時優先使用（取代 httpx 內建的 stdlib resp.json()）"""
+    if orjson is not None:
+        return orjson.loads(resp.content)
+    return json.loads(resp.content)
+
 
 class AsanaClient:
     """Minimal async Asana API client (tasks create)."""
 
     def __init__(self,
                  token: Optional[str] = None,
-                 base_url: str = "https://app.asana.com/api/1.0"):
+                 base_url: str = "https://app.asana.com/api/1.0",
+                 compress_requests: Optional[bool] = None):
         self.token = token or os.getenv("ASANA_ACCESS_TOKEN", "")
+        # 大型請求內容是否以 gzip 上傳（預設關閉，可用 ASANA_GZIP_REQUESTS=true 開啟）
+        if compress_requests is None:
+            compress_requests = os.getenv("ASANA_GZIP_REQUESTS", "false").strip().lower() == "true"
+        self.compress_requests = compress_requests
         self.base_url = base_url.rstrip("/")
-
-    def _headers(self) -> Dict[str, str]:
-        if not self.token:
-            raise ValueError("ASANA_ACCESS_TOKEN 未設置或為空")
-        return {
+        # 請求標頭只在建立時組一次，之後每次呼叫直接重用（httpx 會自行複製，不會改到這裡）
+        self._json_headers: Dict[str, str] = {
             "Authorization": f"Bearer {self.token}",
             "Accept": "application/json",
             "Content-Type": "application/json",
         }
+        self._gzip_json_headers: Dict[str, str] = {**self._json_headers, "Content-Encoding": "gzip"}
+        # multipart 上傳由 httpx 自行帶 Content-Type boundary，只需授權標頭
+        self._auth_headers: Dict[str, str] = {"Authorization": f"Bearer {self.token}"}
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def __aenter__(self) -> "AsanaClient":
+        return self
 
-    async def create_task(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.aclose()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """取得長駐的 httpx.AsyncClient（首次使用時建立，關閉後再次使用會重建）"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(20.0, connect=5.0),
+                limits=_POOL_LIMITS,
+                http2=_HTTP2_AVAILABLE,
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """關閉共用連線池"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _headers(self) -> Dict[str, str]:
+        if not self.token:
+            raise ValueError("ASANA_ACCESS_TOKEN 未設置或為空")
+        return self._json_headers
+
+    @staticmethod
+    def _retry_delay(resp: httpx.Response, attempt: int) -> float:
+        """依 Retry-After 標頭（Asana 429 會帶）加上指數成長的隨機抖動計算等待秒數"""
+        try:
+            retry_after = float(resp.headers.get("Retry-After", _DEFAULT_RETRY_AFTER))
+        except ValueError:
+            retry_after = _DEFAULT_RETRY_AFTER
+        return retry_after + random.uniform(0, 0.5) * (2 ** attempt)
+
+    @staticmethod
+    def _should_retry(resp: httpx.Response) -> bool:
+        """429 一律重試；503 僅在伺服器明確帶 Retry-After（表示未處理請求）時重試"""
+        if resp.status_code in _RETRY_STATUS:
+            return True
+        return resp.status_code in _RETRY_AFTER_STATUS and "Retry-After" in resp.headers
+
+    async def _request_with_retry(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """送出請求；遇到 429（或帶 Retry-After 的 503）時退避後重試，最多 _MAX_ATTEMPTS 次，回傳最後一次回應"""
+        client = self._get_client()
+        for attempt in range(_MAX_ATTEMPTS):
+            resp = await client.request(method, url, **kwargs)
+            if not self._should_retry(resp) or attempt == _MAX_ATTEMPTS - 1:
+                return resp
+            delay = self._retry_delay(resp, attempt)
+            logger.warning("Asana 回應 %s，%.1f 秒後重試 (%s/%s)", resp.status_code, delay, attempt + 1, _MAX_ATTEMPTS)
+            await asyncio.sleep(delay)
+        return resp
+
+    async def create_task(self, data: Dict[str, Any], opt_fields: Optional[str] = None) -> Dict[str, Any]:
         """
         Create a task via Asana API.
         Expects payload like {"data": { ... task fields ... }} matching Postman spec.
+        429, and 503 with Retry-After, are retried with backoff; other failures are
+        returned after one attempt (POST /tasks is not idempotent, a retry could duplicate the ticket).
+        opt_fields 可限制回應欄位（如 "gid,permalink_url"），避免解析完整任務內容。
         """
         url = f"{self.base_url}/tasks"
-        async with httpx.AsyncClient(timeout=20.0) as client:
-            resp = await client.post(url, headers=self._headers(), json=data)
+        headers = self._headers()
+        body = _dumps(data)
+        if self.compress_requests and len(body) > _GZIP_MIN_BYTES:
+            body = gzip.compress(body, compresslevel=_GZIP_LEVEL)
+            headers = self._gzip_json_headers
+        params = {"opt_fields": opt_fields} if opt_fields else None
+        resp = await self._request_with_retry("POST", url, headers=headers, content=body, params=params)
+        try:
+            resp.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            # Surface Asana error details if available
+            detail = None
             try:
-                resp.raise_for_status()
-            except httpx.HTTPStatusError as e:
-                # Surface Asana error details if available
-                detail = None
-                try:
-                    detail = resp.json()
-                except Exception:
-                    detail = resp.text
-                raise httpx.HTTPStatusError(f"Asana API error {resp.status_code}: {detail}", request=e.request, response=e.response)
-            return resp.json()
+                detail = _loads(resp)
+            except Exception:
+                detail = resp.text
+            raise httpx.HTTPStatusError(f"Asana API error {resp.status_code}: {detail}", request=e.request, response=e.response)
+        return _loads(resp)
 
     async def get_user_gid_by_email(self, email: str) -> Optional[str]:
         """透過 email 查詢 Asana 使用者 GID，結果會快取避免重複呼叫。"""
@@ -53,16 +171,16 @@ class AsanaClient:
 
         url = f"{self.base_url}/users/{email}"
         try:
-            async with httpx.AsyncClient(timeout=15.0) as client:
-                resp = await client.get(
-                    url, headers=self._headers(),
-                    params={"opt_fields": "gid,name,email"}
-                )
-                resp.raise_for_status()
-                data = resp.json().get("data", {})
-                gid = data.get("gid")
-                self._user_gid_cache[email] = gid
-                return gid
+            resp = await self._get_client().get(
+                url, headers=self._headers(),
+                params={"opt_fields": "gid,name,email"},
+                timeout=15.0,
+            )
+            resp.raise_for_status()
+            data = _loads(resp).get("data", {})
+            gid = data.get("gid")
+            self._user_gid_cache[email] = gid
+            return gid
         except Exception:
             self._user_gid_cache[email] = None
             return None
@@ -72,39 +190,36 @@ class AsanaClient:
         if not task_gid:
             raise ValueError("無效的任務 ID")
         url = f"{self.base_url}/tasks/{task_gid}"
-        async with httpx.AsyncClient(timeout=20.0) as client:
-            resp = await client.get(
-                url, headers=self._headers(),
-                params={"opt_fields": "name,completed,notes,assignee,permalink_url,external,created_at,custom_fields"}
-            )
-            resp.raise_for_status()
-            return resp.json()
+        resp = await self._get_client().get(
+            url, headers=self._headers(),
+            params={"opt_fields": "name,completed,notes,assignee,permalink_url,external,created_at,custom_fields"}
+        )
+        resp.raise_for_status()
+        return _loads(resp)
 
     async def get_story(self, story_gid: str) -> Dict[str, Any]:
         """獲取特定 Story (評論/紀錄) 細節。"""
         if not story_gid:
             raise ValueError("無效的 Story ID")
         url = f"{self.base_url}/stories/{story_gid}"
-        async with httpx.AsyncClient(timeout=20.0) as client:
-            resp = await client.get(
-                url, headers=self._headers(),
-                params={"opt_fields": "text,type,created_at,created_by.name,resource_subtype"}
-            )
-            resp.raise_for_status()
-            return resp.json()
+        resp = await self._get_client().get(
+            url, headers=self._headers(),
+            params={"opt_fields": "text,type,created_at,created_by.name,resource_subtype"}
+        )
+        resp.raise_for_status()
+        return _loads(resp)
 
     async def get_task_stories(self, task_gid: str) -> Dict[str, Any]:
         """獲取任務的 Stories (含評論與紀錄)。"""
         if not task_gid:
             raise ValueError("無效的任務 ID")
         url = f"{self.base_url}/tasks/{task_gid}/stories"
-        async with httpx.AsyncClient(timeout=20.0) as client:
-            resp = await client.get(
-                url, headers=self._headers(),
-                params={"opt_fields": "text,type,created_at,created_by.name,resource_subtype"}
-            )
-            resp.raise_for_status()
-            return resp.json()
+        resp = await self._get_client().get(
+            url, headers=self._headers(),
+            params={"opt_fields": "text,type,created_at,created_by.name,resource_subtype"}
+        )
+        resp.raise_for_status()
+        return _loads(resp)
 
     async def create_webhook(self, resource_gid: str, target_url: str) -> Dict[str, Any]:
         """Create a webhook subscription on a resource (project or task).
@@ -121,21 +236,20 @@ class AsanaClient:
                 ]
             }
         }
-        async with httpx.AsyncClient(timeout=20.0) as client:
-            resp = await client.post(url, headers=self._headers(), json=data)
+        resp = await self._get_client().post(url, headers=self._headers(), content=_dumps(data))
+        try:
+            resp.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            detail = None
             try:
-                resp.raise_for_status()
-            except httpx.HTTPStatusError as e:
-                detail = None
-                try:
-                    detail = resp.json()
-                except Exception:
-                    detail = resp.text
-                raise httpx.HTTPStatusError(
-                    f"Asana Webhook 建立失敗 {resp.status_code}: {detail}",
-                    request=e.request, response=e.response
-                )
-            return resp.json()
+                detail = _loads(resp)
+            except Exception:
+                detail = resp.text
+            raise httpx.HTTPStatusError(
+                f"Asana Webhook 建立失敗 {resp.status_code}: {detail}",
+                request=e.request, response=e.response
+            )
+        return _loads(resp)
 
     async def get_project_tasks(
         self, project_gid: str, completed_since: Optional[str] = None, limit: int = 100,
@@ -150,28 +264,28 @@ class AsanaClient:
         all_tasks: list[Dict[str, Any]] = []
         offset = None
 
-        async with httpx.AsyncClient(timeout=20.0) as client:
-            while True:
-                params: Dict[str, Any] = {
-                    "project": project_gid,
-                    "opt_fields": "name,completed,completed_at,created_at,notes",
-                    "limit": limit,
-                }
-                if completed_since:
-                    params["completed_since"] = completed_since
-                if offset:
-                    params["offset"] = offset
-
-                resp = await client.get(url, headers=self._headers(), params=params)
-                resp.raise_for_status()
-                data = resp.json()
-                all_tasks.extend(data.get("data", []))
-
-                next_page = data.get("next_page")
-                if next_page and next_page.get("offset"):
-                    offset = next_page["offset"]
-                else:
-                    break
+        client = self._get_client()
+        while True:
+            params: Dict[str, Any] = {
+                "project": project_gid,
+                "opt_fields": "name,completed,completed_at,created_at,notes",
+                "limit": limit,
+            }
+            if completed_since:
+                params["completed_since"] = completed_since
+            if offset:
+                params["offset"] = offset
+
+            resp = await client.get(url, headers=self._headers(), params=params)
+            resp.raise_for_status()
+            data = _loads(resp)
+            all_tasks.extend(data.get("data", []))
+
+            next_page = data.get("next_page")
+            if next_page and next_page.get("offset"):
+                offset = next_page["offset"]
+            else:
+                break
 
         return all_tasks
 
@@ -184,47 +298,52 @@ class AsanaClient:
         }
         if resource_gid:
             params["resource"] = resource_gid
-        async with httpx.AsyncClient(timeout=20.0) as client:
-            resp = await client.get(url, headers=self._headers(), params=params)
-            resp.raise_for_status()
-            return resp.json().get("data", [])
+        resp = await self._get_client().get(url, headers=self._headers(), params=params)
+        resp.raise_for_status()
+        return _loads(resp).get("data", [])
 
     async def get_task_attachments(self, task_gid: str) -> list[Dict[str, Any]]:
         """取得任務的附件列表（含 download_url）。"""
         if not task_gid:
             return []
         url = f"{self.base_url}/tasks/{task_gid}/attachments"
-        async with httpx.AsyncClient(timeout=20.0) as client:
-            resp = await client.get(
-                url, headers=self._headers(),
-                params={"opt_fields": "name,download_url,host,resource_subtype"},
-            )
-            resp.raise_for_status()
-            return resp.json().get("data", [])
+        resp = await self._get_client().get(
+            url, headers=self._headers(),
+            params={"opt_fields": "name,download_url,host,resource_subtype"},
+        )
+        resp.raise_for_status()
+        return _loads(resp).get("data", [])
 
     async def download_attachment(self, download_url: str) -> Optional[bytes]:
         """下載附件內容到記憶體，回傳 bytes。"""
         if not download_url:
             return None
         try:
-            async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-                resp = await client.get(download_url)
-                resp.raise_for_status()
-                return resp.content
+            resp = await self._get_client().get(
+                download_url, timeout=30.0, follow_redirects=True
+            )
+            resp.raise_for_status()
+            return resp.content
         except Exception:
             return None
 
-    async def upload_attachment(self, task_gid: str, filename: str, content: bytes, mime_type: str) -> Dict[str, Any]:
-        """Upload an attachment file to a task."""
+    async def upload_attachment(
+        self, task_gid: str, filename: str, content: Union[bytes, BinaryIO], mime_type: str
+    ) -> Dict[str, Any]:
+        """Upload an attachment file to a task.
+
+        content 可為 bytes 或二進位檔案物件；傳入檔案物件時 httpx 會分段讀取並串流
+        multipart 內容，不需先將整個檔案載入記憶體。
+        """
         if not task_gid:
             raise ValueError("無效的任務 ID")
         url = f"{self.base_url}/attachments"
-        headers = {"Authorization": f"Bearer {self.token}"}
+        if not self.token:
+            raise ValueError("ASANA_ACCESS_TOKEN 未設置或為空")
         files = {
             "file": (filename, content, mime_type),
             "parent": (None, task_gid),
         }
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            resp = await client.post(url, headers=headers, files=files)
-            resp.raise_for_status()
-            return resp.json()
+        resp = await self._get_client().post(url, headers=self._auth_headers, files=files, timeout=_UPLOAD_TIMEOUT)
+        resp.raise_for_status()
+        return _loads(resp)
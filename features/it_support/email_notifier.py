@@ -2,17 +2,34 @@
 Email 通知模組
 透過 SMTP 發送 IT 單完成通知郵件
 """
+import asyncio
 import os
 import re
 import html as html_mod
 import logging
 import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from typing import Optional
+import threading
+import time
+from dataclasses import dataclass, field
+from email.message import EmailMessage
+from email.policy import SMTP as SMTP_POLICY
+from typing import Any, Dict, List, Optional
+
+try:
+    import aiosmtplib
+except ImportError:  # pragma: no cover - 依賴環境
+    aiosmtplib = None
 
 logger = logging.getLogger(__name__)
 
+# aiosmtplib 連線池：同時最多幾條已登入連線、每條連線送幾封後換新、閒置多久後不再重用（秒）
+_SMTP_POOL_MAX = 5
+_SMTP_MAX_MESSAGES_PER_CONN = 1000
+_SMTP_IDLE_TTL = 100.0
+
+# 批次發送時同時建信／送信的上限（aiosmtplib 連線池可平行送出；同步 smtplib 退路則依序送出）
+_BULK_SEND_CONCURRENCY = 4
+
 # ── 共用樣式常數 ──────────────────────────────────────────────
 _FONT = "'Segoe UI', Helvetica, Arial, sans-serif"
 _CLR_NAVY = "#1B2A4A"
@@ -51,9 +68,8 @@ def _info_row(label: str, value: str, is_last: bool = False, value_style: str =
     )
 
 
-def _wrap_email(header_html: str, body_html: str) -> str:
-    """將 header + body 包進完整 email 骨架（table-based layout for Outlook）"""
-    return f"""\
+# 完整 email 骨架（table-based layout for Outlook）；樣式於 import 時展開一次，只留 header_html / body_html 佔位
+_EMAIL_TMPL = f"""\
 <html>
 <body style="margin: 0; padding: 0; -webkit-text-size-adjust: 100%;">
 <table role="presentation" width="100%" cellpadding="0" cellspacing="0"
@@ -63,9 +79,9 @@ def _wrap_email(header_html: str, body_html: str) -> str:
        style="background-color: #ffffff; border-radius: 16px; overflow: hidden;
               box-shadow: 0 2px 24px rgba(0,0,0,0.08);">
 
-  {header_html}
+  {{header_html}}
 
-  {body_html}
+  {{body_html}}
 
   <!-- FOOTER -->
   <tr>
@@ -95,64 +111,15 @@ def _wrap_email(header_html: str, body_html: str) -> str:
 </html>"""
 
 
-class EmailNotifier:
-    """SMTP Email 通知服務"""
-
-    def __init__(
-        self,
-        smtp_host: Optional[str] = None,
-        smtp_port: Optional[int] = None,
-        smtp_user: Optional[str] = None,
-        smtp_password: Optional[str] = None,
-    ):
-        self.smtp_host = smtp_host or os.getenv("SMTP_HOST", "smtp.office365.com")
-        self.smtp_port = smtp_port or int(os.getenv("SMTP_PORT", "25"))
-        self.smtp_user = smtp_user or os.getenv("SMTP_USER", "")
-        self.smtp_password = smtp_password or os.getenv("SMTP_PASSWORD", "")
+def _wrap_email(header_html: str, body_html: str) -> str:
+    """將 header + body 包進完整 email 骨架"""
+    return _EMAIL_TMPL.format_map({"header_html": header_html, "body_html": body_html})
 
-    # ── 完成通知 ──────────────────────────────────────────────────
 
-    def _build_completion_email(
-        self,
-        to_email: str,
-        issue_id: str,
-        task_name: str,
-        permalink_url: str = "",
-        comments: str = "",
-        description: str = "",
-        images: Optional[list] = None,
-    ) -> MIMEMultipart:
-        """建立任務完成通知郵件。
-        images: list of {"filename": str, "data": bytes, "content_type": str}
-        """
-        # permalink_url 保留 signature（caller 仍傳值），但不再放進信件內容
-        # （使用者沒 Asana 帳號，連結會看到登入頁；見 memory: feedback_user_notifications_no_asana_link）
-        msg = MIMEMultipart("related")
-        msg["From"] = self.smtp_user
-        msg["To"] = to_email
-        msg["Subject"] = f"IT 單 {issue_id} 已處理完成"
-        alt_part = MIMEMultipart("alternative")
-        images = images or []
-
-        # ── 純文字版本 ──
-        text_body = (
-            f"您好，\n\n"
-            f"您提交的 IT 支援需求已由服務台工程師處理完成：\n\n"
-            f"  單號：{issue_id}\n"
-            f"  摘要：{task_name}\n"
-        )
-        if description:
-            text_body += f"\n您當初提交的需求內容：\n{description}\n"
-        if comments:
-            text_body += f"\n處理評論：\n{comments}\n"
-        # 不放 Asana permalink — 使用者沒 Asana 帳號，連結只會看到登入頁
-        text_body += (
-            f"\n如有其他問題，請在 Teams 中使用 @it 再次提單。\n\n"
-            f"台灣林內-TR GPT"
-        )
+# ── 預先展開的固定區塊與範本 ──────────────────────────────────
+# 樣式常數只在 import 時展開一次；建信時只剩 format_map 代入動態欄位
 
-        # ── HTML header ──
-        header_html = f"""
+_COMPLETION_HEADER_HTML = f"""
   <tr>
     <td style="background-color: {_CLR_NAVY}; padding: 0;">
       <table role="presentation" width="100%" cellpadding="0" cellspacing="0">
@@ -184,112 +151,343 @@ class EmailNotifier:
     </td>
   </tr>"""
 
-        # ── HTML body sections ──
-        body_parts = []
+_SUBMISSION_HEADER_HTML = f"""
+  <tr>
+    <td style="background-color: {_CLR_NAVY}; padding: 0;">
+      <table role="presentation" width="100%" cellpadding="0" cellspacing="0">
+        <tr>
+          <td style="padding: 36px 40px 32px;">
+            <table role="presentation" cellpadding="0" cellspacing="0"><tr>
+              <td style="width: 36px; height: 36px; background-color: {_CLR_BLUE};
+                         border-radius: 10px; text-align: center; vertical-align: middle;
+                         font-size: 16px; color: #ffffff;">&#9998;</td>
+              <td style="padding-left: 14px;">
+                <span style="font-family: {_FONT}; color: #ffffff; font-size: 13px;
+                             font-weight: 600; letter-spacing: 3px; text-transform: uppercase;
+                             opacity: 0.7;">RINNAI IT</span></td>
+            </tr></table>
+          </td>
+        </tr>
+        <tr>
+          <td style="padding: 0 40px 36px;">
+            <h1 style="font-family: {_FONT}; color: #ffffff; margin: 0;
+                       font-size: 28px; font-weight: 700; line-height: 1.2;">
+              IT 支援單已受理</h1>
+            <p style="font-family: {_FONT}; color: rgba(255,255,255,0.65); margin: 12px 0 0;
+                      font-size: 15px; line-height: 1.5;">
+              您的需求已進入處理流程，IT 團隊將儘速為您處理。</p>
+            <div style="margin-top: 16px; display: inline-block; background-color: {_CLR_BLUE};
+                        border-radius: 20px; padding: 6px 16px;">
+              <span style="font-family: {_FONT}; color: #ffffff; font-size: 12px;
+                           font-weight: 700; letter-spacing: 1px;">處理中</span></div>
+          </td>
+        </tr>
+      </table>
+    </td>
+  </tr>"""
+
+_CUSTOM_HEADER_HTML = f"""
+  <tr>
+    <td style="background-color: {_CLR_NAVY}; padding: 0;">
+      <table role="presentation" width="100%" cellpadding="0" cellspacing="0">
+        <tr>
+          <td style="padding: 36px 40px;">
+            <table role="presentation" cellpadding="0" cellspacing="0"><tr>
+              <td style="width: 36px; height: 36px; background-color: #8B5CF6;
+                         border-radius: 10px; text-align: center; vertical-align: middle;
+                         font-size: 16px; color: #ffffff;">&#9993;</td>
+              <td style="padding-left: 14px;">
+                <span style="font-family: {_FONT}; color: #ffffff; font-size: 13px;
+                             font-weight: 600; letter-spacing: 3px; text-transform: uppercase;
+                             opacity: 0.7;">RINNAI IT</span></td>
+            </tr></table>
+          </td>
+        </tr>
+      </table>
+    </td>
+  </tr>"""
+
+_COMPLETION_TIP_HTML = f"""
+  <tr><td style="padding: 24px 40px 40px;">
+    <table role="presentation" width="100%" cellpadding="0" cellspacing="0"><tr>
+      <td style="background-color: #F0FDF4; border-radius: 10px; padding: 20px;
+                 border: 1px solid #BBF7D0;">
+        <p style="font-family: {_FONT}; color: #166534; font-size: 13px; margin: 0; line-height: 1.6;">
+          <strong>需要進一步協助？</strong><br>
+          如問題尚未解決或有後續需求，請在 Teams 中輸入
+          <code style="background-color: #DCFCE7; padding: 2px 6px; border-radius: 4px;
+                       font-size: 12px; color: #15803D;">@it</code> 重新提單。</p>
+      </td>
+    </tr></table>
+  </td></tr>"""
+
+_SUBMISSION_TIP_HTML = f"""
+  <tr><td style="padding: 24px 40px 40px;">
+    <table role="presentation" width="100%" cellpadding="0" cellspacing="0"><tr>
+      <td style="background-color: #EFF6FF; border-radius: 10px; padding: 20px;
+                 border: 1px solid #BFDBFE;">
+        <p style="font-family: {_FONT}; color: #1E40AF; font-size: 13px; margin: 0; line-height: 1.6;">
+          <strong>小提示</strong><br>
+          如需補充資訊或附加檔案，可直接在 Teams 中將檔案傳送給 IT Bot，系統將自動為您關聯至此支援單。
+          處理完成後，系統會再次通知您。</p>
+      </td>
+    </tr></table>
+  </td></tr>"""
 
-        # 支援單資訊
-        body_parts.append(f"""
+# 支援單資訊卡片（完成通知）：issue_id / task_name
+_COMPLETION_INFO_TMPL = f"""
   <tr><td style="padding: 40px 40px 16px;">
     <table role="presentation" width="100%" cellpadding="0" cellspacing="0"
            style="border: 1px solid {_CLR_BORDER}; border-radius: 12px; overflow: hidden;">
       {_section_header('支援單資訊')}
       <tr><td style="padding: 0;">
         <table role="presentation" width="100%" cellpadding="0" cellspacing="0">
-          {_info_row('單號', issue_id, value_style=f'color: {_CLR_NAVY}; font-size: 15px; font-weight: 700;')}
-          {_info_row('摘要', html_mod.escape(task_name), is_last=True)}
+          {_info_row('單號', '{issue_id}', value_style=f'color: {_CLR_NAVY}; font-size: 15px; font-weight: 700;')}
+          {_info_row('摘要', '{task_name}', is_last=True)}
         </table>
       </td></tr>
     </table>
-  </td></tr>""")
+  </td></tr>"""
 
-        # 需求內容
-        if description:
-            desc_html = html_mod.escape(description).replace("\n", "<br>")
-            body_parts.append(f"""
-  <tr><td style="padding: 16px 40px;">
+# 支援單資訊卡片（提單確認）：issue_id / summary / category / priority / priority_color / created_at
+_SUBMISSION_INFO_TMPL = f"""
+  <tr><td style="padding: 24px 40px 16px;">
+    <table role="presentation" width="100%" cellpadding="0" cellspacing="0"
+           style="border: 1px solid {_CLR_BORDER}; border-radius: 12px; overflow: hidden;">
+      {_section_header('支援單資訊')}
+      <tr><td style="padding: 0;">
+        <table role="presentation" width="100%" cellpadding="0" cellspacing="0">
+          {_info_row('單號', '{issue_id}', value_style=f'color: {_CLR_NAVY}; font-size: 15px; font-weight: 700;')}
+          {_info_row('摘要', '{summary}')}
+          {_info_row('分類', '{category}')}
+          {_info_row('優先序', '{priority}', value_style=f'color: {{priority_color}}; font-size: 14px; font-weight: 700;')}
+          {_info_row('提交時間', '{created_at}', is_last=True)}
+        </table>
+      </td></tr>
+    </table>
+  </td></tr>"""
+
+# 需求內容區塊：padding / desc_html
+_DESCRIPTION_SECTION_TMPL = f"""
+  <tr><td style="padding: {{padding}};">
     <table role="presentation" width="100%" cellpadding="0" cellspacing="0"
            style="border: 1px solid {_CLR_BORDER}; border-radius: 12px; overflow: hidden;">
       {_section_header('您提交的需求內容')}
       <tr><td style="padding: 20px;">
         <p style="font-family: {_FONT}; color: #4B5563; font-size: 14px;
-                  line-height: 1.7; margin: 0; white-space: pre-wrap;">{desc_html}</p>
+                  line-height: 1.7; margin: 0; white-space: pre-wrap;">{{desc_html}}</p>
       </td></tr>
     </table>
-  </td></tr>""")
+  </td></tr>"""
 
-        # 評論
-        if comments:
-            comment_rows = self._build_comment_rows(comments)
-            if comment_rows:
-                body_parts.append(f"""
+# 處理評論區塊：rows 為 _build_comment_rows 產生的表格列
+_COMMENTS_SECTION_TMPL = f"""
   <tr><td style="padding: 16px 40px;">
     <table role="presentation" width="100%" cellpadding="0" cellspacing="0"
            style="border: 1px solid {_CLR_BORDER}; border-radius: 12px; overflow: hidden;">
       {_section_header('處理評論')}
       <tr><td style="padding: 0;">
         <table role="presentation" width="100%" cellpadding="0" cellspacing="0">
-          {comment_rows}
+          {{rows}}
         </table>
       </td></tr>
     </table>
-  </td></tr>""")
+  </td></tr>"""
 
-        # 附件圖片
-        if images:
-            img_items = ""
-            for idx, img in enumerate(images):
-                cid = f"att_img_{idx}"
-                fname = html_mod.escape(img.get("filename", f"image_{idx}"))
-                img_items += (
-                    f'<tr><td style="padding: 12px 20px; border-bottom: 1px solid {_CLR_BORDER_LIGHT};">'
-                    f'<p style="font-family: {_FONT}; color: {_CLR_MUTED}; font-size: 12px; margin: 0 0 8px;">{fname}</p>'
-                    f'<img src="cid:{cid}" style="max-width: 100%; border-radius: 8px; display: block;" alt="{fname}">'
-                    f'</td></tr>'
-                )
-            body_parts.append(f"""
+# 附件圖片的單列：cid / fname（已跳脫）
+_IMAGE_ROW_TMPL = (
+    f'<tr><td style="padding: 12px 20px; border-bottom: 1px solid {_CLR_BORDER_LIGHT};">'
+    f'<p style="font-family: {_FONT}; color: {_CLR_MUTED}; font-size: 12px; margin: 0 0 8px;">{{fname}}</p>'
+    f'<img src="cid:{{cid}}" style="max-width: 100%; border-radius: 8px; display: block;" alt="{{fname}}">'
+    f'</td></tr>'
+)
+
+# 附件圖片區塊：rows 為多個 _IMAGE_ROW_TMPL
+_IMAGES_SECTION_TMPL = f"""
   <tr><td style="padding: 16px 40px;">
     <table role="presentation" width="100%" cellpadding="0" cellspacing="0"
            style="border: 1px solid {_CLR_BORDER}; border-radius: 12px; overflow: hidden;">
       {_section_header('附件圖片')}
       <tr><td style="padding: 0;">
         <table role="presentation" width="100%" cellpadding="0" cellspacing="0">
-          {img_items}
+          {{rows}}
         </table>
       </td></tr>
     </table>
-  </td></tr>""")
+  </td></tr>"""
+
+# 完成通知郵件完整 HTML：issue_id / task_name，選填區塊 description_section / comments_section / images_section
+# （選填區塊有內容時需自帶開頭換行，沒有時代入空字串）
+_COMPLETION_HTML_TMPL = _wrap_email(
+    _COMPLETION_HEADER_HTML,
+    _COMPLETION_INFO_TMPL
+    + "{description_section}{comments_section}{images_section}\n"
+    + _COMPLETION_TIP_HTML,
+)
+
+# 自訂通知郵件完整 HTML：html_content（已跳脫）
+_CUSTOM_HTML_TMPL = _wrap_email(
+    _CUSTOM_HEADER_HTML,
+    f"""
+  <tr><td style="padding: 40px;">
+    <div style="font-family: {_FONT}; color: {_CLR_BODY}; font-size: 15px; line-height: 1.7;">
+      {{html_content}}
+    </div>
+  </td></tr>""",
+)
+
+# 提單確認郵件純文字版：display_name / issue_id / summary / category / priority / created_at / description_text
+_SUBMISSION_TEXT_TMPL = (
+    "{display_name} 您好，\n\n"
+    "您的 IT 支援需求已成功提交，IT 團隊將儘速為您處理。\n\n"
+    "  單號：{issue_id}\n"
+    "  需求摘要：{summary}\n"
+    "  分類：{category}\n"
+    "  優先順序：{priority}\n"
+    "  提交時間：{created_at}\n"
+    "{description_text}"
+    "\n如需補充資訊或附件，請在 Teams 中直接傳送檔案給 Bot。\n"
+    "處理完成後，系統會再次通知您。\n\n"
+    "台灣林內-TR GPT\n"
+    "services@rinnai.com.tw"
+)
+
+# 提單確認郵件完整 HTML：問候、資訊卡、（選填）需求內容、提示一次展開，建信時單次 format_map
+# 欄位同 _SUBMISSION_INFO_TMPL，另有 display_name / description_section
+_SUBMISSION_HTML_TMPL = _wrap_email(
+    _SUBMISSION_HEADER_HTML,
+    f"""
+  <tr><td style="padding: 36px 40px 0;">
+    <p style="font-family: {_FONT}; color: #1F2937; font-size: 16px; font-weight: 600; margin: 0;">
+      {{display_name}} 您好，</p>
+  </td></tr>"""
+    + "\n" + _SUBMISSION_INFO_TMPL + "{description_section}\n" + _SUBMISSION_TIP_HTML,
+)
 
-        # 提示
-        body_parts.append(f"""
-  <tr><td style="padding: 24px 40px 40px;">
-    <table role="presentation" width="100%" cellpadding="0" cellspacing="0"><tr>
-      <td style="background-color: #F0FDF4; border-radius: 10px; padding: 20px;
-                 border: 1px solid #BBF7D0;">
-        <p style="font-family: {_FONT}; color: #166534; font-size: 13px; margin: 0; line-height: 1.6;">
-          <strong>需要進一步協助？</strong><br>
-          如問題尚未解決或有後續需求，請在 Teams 中輸入
-          <code style="background-color: #DCFCE7; padding: 2px 6px; border-radius: 4px;
-                       font-size: 12px; color: #15803D;">@it</code> 重新提單。</p>
-      </td>
-    </tr></table>
-  </td></tr>""")
 
-        html_body = _wrap_email(header_html, "\n".join(body_parts))
-        alt_part.attach(MIMEText(text_body, "plain", "utf-8"))
-        alt_part.attach(MIMEText(html_body, "html", "utf-8"))
-        msg.attach(alt_part)
+@dataclass
+class _PooledSMTP:
+    """連線池中的一條已登入 aiosmtplib 連線"""
+    smtp: Any
+    sent_count: int = 0
+    last_used: float = field(default_factory=time.monotonic)
 
-        # 內嵌圖片為 cid 附件
+
+class EmailNotifier:
+    """SMTP Email 通知服務"""
+
+    def __init__(
+        self,
+        smtp_host: Optional[str] = None,
+        smtp_port: Optional[int] = None,
+        smtp_user: Optional[str] = None,
+        smtp_password: Optional[str] = None,
+    ):
+        self.smtp_host = smtp_host or os.getenv("SMTP_HOST", "smtp.office365.com")
+        self.smtp_port = smtp_port or int(os.getenv("SMTP_PORT", "25"))
+        self.smtp_user = smtp_user or os.getenv("SMTP_USER", "")
+        self.smtp_password = smtp_password or os.getenv("SMTP_PASSWORD", "")
+        # 帳密於建立時檢查一次；未設定時各 send_* 直接回傳 False
+        self._enabled = bool(self.smtp_user and self.smtp_password)
+        # 已登入的 SMTP 連線跨郵件重用，避免每封信都重做 STARTTLS + AUTH
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._smtp_lock = threading.Lock()
+        # 有 aiosmtplib 時改用原生 asyncio 連線池，不佔用 executor 執行緒
+        self._smtp_pool: List[_PooledSMTP] = []
+        self._smtp_pool_slots = asyncio.Semaphore(_SMTP_POOL_MAX)
+
+    def _new_message(self, to_email: str, subject: str) -> EmailMessage:
+        """建立帶寄件人/收件人/主旨的空白郵件（SMTP policy：CRLF 行尾、標頭自動編碼）"""
+        msg = EmailMessage(policy=SMTP_POLICY)
+        msg["From"] = self.smtp_user
+        msg["To"] = to_email
+        msg["Subject"] = subject
+        return msg
+
+    # ── 完成通知 ──────────────────────────────────────────────────
+
+    def _build_completion_email(
+        self,
+        to_email: str,
+        issue_id: str,
+        task_name: str,
+        permalink_url: str = "",
+        comments: str = "",
+        description: str = "",
+        images: Optional[list] = None,
+    ) -> EmailMessage:
+        """建立任務完成通知郵件。
+        images: list of {"filename": str, "data": bytes, "content_type": str}
+        """
+        # permalink_url 保留 signature（caller 仍傳值），但不再放進信件內容
+        # （使用者沒 Asana 帳號，連結會看到登入頁；見 memory: feedback_user_notifications_no_asana_link）
+        msg = self._new_message(to_email, f"IT 單 {issue_id} 已處理完成")
+        images = images or []
+
+        # ── 純文字版本 ──
+        text_body = (
+            f"您好，\n\n"
+            f"您提交的 IT 支援需求已由服務台工程師處理完成：\n\n"
+            f"  單號：{issue_id}\n"
+            f"  摘要：{task_name}\n"
+        )
+        if description:
+            text_body += f"\n您當初提交的需求內容：\n{description}\n"
+        if comments:
+            text_body += f"\n處理評論：\n{comments}\n"
+        # 不放 Asana permalink — 使用者沒 Asana 帳號，連結只會看到登入頁
+        text_body += (
+            f"\n如有其他問題，請在 Teams 中使用 @it 再次提單。\n\n"
+            f"台灣林內-TR GPT"
+        )
+
+        # ── HTML：選填區塊先各自展開，再單次代入完整範本 ──
+        description_section = ""
+        if description:
+            desc_html = html_mod.escape(description).replace("\n", "<br>")
+            description_section = "\n" + _DESCRIPTION_SECTION_TMPL.format_map(
+                {"padding": "16px 40px", "desc_html": desc_html}
+            )
+
+        comments_section = ""
+        if comments:
+            comment_rows = self._build_comment_rows(comments)
+            if comment_rows:
+                comments_section = "\n" + _COMMENTS_SECTION_TMPL.format_map({"rows": comment_rows})
+
+        images_section = ""
         if images:
-            from email.mime.image import MIMEImage
+            img_items = "".join(
+                _IMAGE_ROW_TMPL.format_map({
+                    "cid": f"att_img_{idx}",
+                    "fname": html_mod.escape(img.get("filename", f"image_{idx}")),
+                })
+                for idx, img in enumerate(images)
+            )
+            images_section = "\n" + _IMAGES_SECTION_TMPL.format_map({"rows": img_items})
+
+        html_body = _COMPLETION_HTML_TMPL.format_map({
+            "issue_id": html_mod.escape(issue_id),
+            "task_name": html_mod.escape(task_name),
+            "description_section": description_section,
+            "comments_section": comments_section,
+            "images_section": images_section,
+        })
+        msg.set_content(text_body)
+        msg.add_alternative(html_body, subtype="html")
+
+        # 內嵌圖片為 cid 附件（掛在 HTML 部分下，形成 multipart/related）
+        if images:
+            html_part = msg.get_payload()[1]
             for idx, img in enumerate(images):
                 cid = f"att_img_{idx}"
                 ct = img.get("content_type", "image/png")
-                maintype, subtype = ct.split("/", 1) if "/" in ct else ("image", "png")
-                mime_img = MIMEImage(img["data"], _subtype=subtype)
-                mime_img.add_header("Content-ID", f"<{cid}>")
-                mime_img.add_header("Content-Disposition", "inline", filename=img.get("filename", f"image_{idx}"))
-                msg.attach(mime_img)
+                subtype = ct.split("/", 1)[1] if "/" in ct else "png"
+                html_part.add_related(
+                    img["data"], "image", subtype,
+                    cid=f"<{cid}>", disposition="inline",
+                    filename=img.get("filename", f"image_{idx}"),
+                )
 
         return msg
 
@@ -307,7 +505,7 @@ class EmailNotifier:
                 text = html_mod.escape(m.group(2))
                 initials = author[0] if author else "ℹ"
             else:
-                line = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', line)
+                line = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', html_mod.escape(line))
                 author = ""
                 text = line
                 initials = "ℹ"
@@ -343,16 +541,14 @@ class EmailNotifier:
         """發送任務完成通知郵件。回傳 True 表示成功。
         images: list of {"filename": str, "data": bytes, "content_type": str}
         """
-        if not self.smtp_user or not self.smtp_password:
+        if not self._enabled:
             logger.warning("SMTP 未設定，跳過 Email 通知")
             return False
 
         try:
             msg = self._build_completion_email(to_email, issue_id, task_name, permalink_url, comments, description, images)
 
-            import asyncio
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(None, self._send_smtp, msg, to_email)
+            await self._deliver(msg, to_email)
 
             logger.info("Email 通知已發送至 %s (單號: %s)", to_email, issue_id)
             return True
@@ -360,26 +556,168 @@ class EmailNotifier:
             logger.error("Email 通知發送失敗: %s", e)
             return False
 
-    def _send_smtp(self, msg: MIMEMultipart, to_email: str, cc_emails: Optional[list] = None) -> None:
-        """同步 SMTP 發送（在 executor 中執行）"""
+    async def send_completion_bulk(self, payloads: List[Dict[str, Any]]) -> List[bool]:
+        """批次發送完成通知（例如下班前一次結案多張單），回傳與 payloads 對應的成功與否。
+        payloads 每筆為 send_completion_notification 的關鍵字參數。
+        """
+        semaphore = asyncio.Semaphore(_BULK_SEND_CONCURRENCY)
+
+        async def _send_one(payload: Dict[str, Any]) -> bool:
+            async with semaphore:
+                return await self.send_completion_notification(**payload)
+
+        return list(await asyncio.gather(*(_send_one(p) for p in payloads)))
+
+    def _connect_smtp(self) -> smtplib.SMTP:
+        """建立新的 SMTP 連線並完成 STARTTLS 與登入"""
         logger.info("SMTP connecting: %s:%s", self.smtp_host, self.smtp_port)
+        server = smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=30)
         try:
-            with smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=30) as server:
-                server.set_debuglevel(0)
-                server.ehlo()
-                server.starttls()
-                server.ehlo()
-                logger.info("SMTP login: %s", self.smtp_user)
-                server.login(self.smtp_user, self.smtp_password)
-                recipients = [to_email]
-                if cc_emails:
-                    recipients.extend(cc_emails)
-                logger.info("SMTP send: %s -> %s (CC: %s)", self.smtp_user, to_email, cc_emails or "none")
-                server.sendmail(self.smtp_user, recipients, msg.as_string())
-                logger.info("SMTP send complete")
-        except Exception as e:
-            logger.error("SMTP error: %s: %s", type(e).__name__, e)
+            server.set_debuglevel(0)
+            server.ehlo()
+            server.starttls()
+            server.ehlo()
+            logger.info("SMTP login: %s", self.smtp_user)
+            server.login(self.smtp_user, self.smtp_password)
+        except Exception:
+            server.close()
             raise
+        return server
+
+    def _get_connection(self) -> smtplib.SMTP:
+        """取得可用的已登入連線；既有連線 NOOP 失敗（逾時斷線、421 等）時重新連線。呼叫端需持有 _smtp_lock"""
+        if self._smtp is not None:
+            try:
+                status, _ = self._smtp.noop()
+                if status == 250:
+                    return self._smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._discard_connection()
+        self._smtp = self._connect_smtp()
+        return self._smtp
+
+    def _discard_connection(self) -> None:
+        """丟棄目前連線（盡量送出 QUIT，失敗則直接關閉 socket）"""
+        server, self._smtp = self._smtp, None
+        if server is None:
+            return
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    def _send_smtp(self, msg: EmailMessage, to_email: str, cc_emails: Optional[list] = None) -> None:
+        """同步 SMTP 發送（在 executor 中執行），重用已登入的連線"""
+        recipients = [to_email]
+        if cc_emails:
+            recipients.extend(cc_emails)
+        with self._smtp_lock:
+            try:
+                logger.debug("SMTP send: %s -> %s (CC: %s)", self.smtp_user, to_email, cc_emails or "none")
+                try:
+                    self._get_connection().send_message(msg, self.smtp_user, recipients)
+                except smtplib.SMTPServerDisconnected:
+                    # NOOP 之後到送出之間被伺服器斷線，重連後再送一次
+                    self._discard_connection()
+                    self._get_connection().send_message(msg, self.smtp_user, recipients)
+                logger.debug("SMTP send complete")
+            except Exception as e:
+                logger.error("SMTP error: %s: %s", type(e).__name__, e)
+                self._discard_connection()
+                raise
+
+    def close(self) -> None:
+        """關閉共用的同步 SMTP 連線"""
+        with self._smtp_lock:
+            self._discard_connection()
+
+    async def _deliver(self, msg: EmailMessage, to_email: str, cc_emails: Optional[list] = None) -> None:
+        """發送郵件：有 aiosmtplib 時走原生 asyncio，否則退回 executor 中的 smtplib"""
+        if aiosmtplib is not None:
+            await self._send_smtp_async(msg, to_email, cc_emails)
+            return
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._send_smtp, msg, to_email, cc_emails)
+
+    async def _open_async_connection(self) -> _PooledSMTP:
+        """建立新的 aiosmtplib 連線並登入（start_tls=True 會在 connect 時完成 STARTTLS）"""
+        logger.info("SMTP connecting: %s:%s", self.smtp_host, self.smtp_port)
+        smtp = aiosmtplib.SMTP(hostname=self.smtp_host, port=self.smtp_port, timeout=30, start_tls=True)
+        await smtp.connect()
+        try:
+            logger.info("SMTP login: %s", self.smtp_user)
+            await smtp.login(self.smtp_user, self.smtp_password)
+        except Exception:
+            smtp.close()
+            raise
+        return _PooledSMTP(smtp)
+
+    @staticmethod
+    async def _close_async_connection(conn: _PooledSMTP) -> None:
+        """關閉一條連線（盡量送出 QUIT，失敗則直接關閉）"""
+        try:
+            await conn.smtp.quit()
+        except Exception:
+            conn.smtp.close()
+
+    async def _acquire_async_connection(self) -> _PooledSMTP:
+        """從池中取出可用連線；閒置過久或 NOOP 失敗者關閉後略過，池空時建立新連線。
+        呼叫端需持有一個 _smtp_pool_slots 名額。
+        """
+        now = time.monotonic()
+        while self._smtp_pool:
+            conn = self._smtp_pool.pop()
+            if now - conn.last_used <= _SMTP_IDLE_TTL:
+                try:
+                    if (await conn.smtp.noop()).code == 250:
+                        return conn
+                except (aiosmtplib.SMTPException, OSError):
+                    pass
+            await self._close_async_connection(conn)
+        return await self._open_async_connection()
+
+    async def _release_async_connection(self, conn: _PooledSMTP) -> None:
+        """送信完成後歸還連線；已送滿 _SMTP_MAX_MESSAGES_PER_CONN 封則關閉"""
+        conn.sent_count += 1
+        conn.last_used = time.monotonic()
+        if conn.sent_count >= _SMTP_MAX_MESSAGES_PER_CONN:
+            await self._close_async_connection(conn)
+        else:
+            self._smtp_pool.append(conn)
+
+    async def _send_smtp_async(self, msg: EmailMessage, to_email: str, cc_emails: Optional[list] = None) -> None:
+        """以 aiosmtplib 發送，從連線池取用已登入的連線"""
+        recipients = [to_email]
+        if cc_emails:
+            recipients.extend(cc_emails)
+        async with self._smtp_pool_slots:
+            conn: Optional[_PooledSMTP] = None
+            try:
+                logger.debug("SMTP send: %s -> %s (CC: %s)", self.smtp_user, to_email, cc_emails or "none")
+                conn = await self._acquire_async_connection()
+                try:
+                    await conn.smtp.send_message(msg, sender=self.smtp_user, recipients=recipients)
+                except aiosmtplib.SMTPServerDisconnected:
+                    # NOOP 之後到送出之間被伺服器斷線，換新連線再送一次
+                    await self._close_async_connection(conn)
+                    conn = None
+                    conn = await self._open_async_connection()
+                    await conn.smtp.send_message(msg, sender=self.smtp_user, recipients=recipients)
+                logger.debug("SMTP send complete")
+            except Exception as e:
+                logger.error("SMTP error: %s: %s", type(e).__name__, e)
+                if conn is not None:
+                    await self._close_async_connection(conn)
+                raise
+            await self._release_async_connection(conn)
+
+    async def aclose(self) -> None:
+        """關閉所有共用的 SMTP 連線（應用程式關閉時呼叫）"""
+        pool, self._smtp_pool = self._smtp_pool, []
+        for conn in pool:
+            await self._close_async_connection(conn)
+        self.close()
 
     # ── 提單確認通知 ──────────────────────────────────────────────
 
@@ -394,135 +732,43 @@ class EmailNotifier:
         permalink_url: str = "",
         reporter_name: str = "",
         description: str = "",
-    ) -> MIMEMultipart:
+    ) -> EmailMessage:
         """建立提單確認通知郵件"""
-        msg = MIMEMultipart("alternative")
-        msg["From"] = self.smtp_user
-        msg["To"] = to_email
-        msg["Subject"] = f"IT 支援單已受理 — {issue_id}"
+        msg = self._new_message(to_email, f"IT 支援單已受理 — {issue_id}")
 
         display_name = reporter_name or to_email.split("@")[0]
         priority_color = "#DC2626" if priority in ("P1", "P2") else _CLR_BODY
 
-        # ── 純文字版本 ──
-        text_body = (
-            f"{display_name} 您好，\n\n"
-            f"您的 IT 支援需求已成功提交，IT 團隊將儘速為您處理。\n\n"
-            f"  單號：{issue_id}\n"
-            f"  需求摘要：{summary}\n"
-            f"  分類：{category}\n"
-            f"  優先順序：{priority}\n"
-            f"  提交時間：{created_at}\n"
-        )
-        if description:
-            text_body += f"\n您提交的需求內容：\n{description}\n"
-        # 不放 Asana 連結 — 使用者沒 Asana 帳號（見 memory: feedback_user_notifications_no_asana_link）
-        text_body += (
-            f"\n如需補充資訊或附件，請在 Teams 中直接傳送檔案給 Bot。\n"
-            f"處理完成後，系統會再次通知您。\n\n"
-            f"台灣林內-TR GPT\n"
-            f"services@rinnai.com.tw"
-        )
-
-        # ── HTML header ──
-        header_html = f"""
-  <tr>
-    <td style="background-color: {_CLR_NAVY}; padding: 0;">
-      <table role="presentation" width="100%" cellpadding="0" cellspacing="0">
-        <tr>
-          <td style="padding: 36px 40px 32px;">
-            <table role="presentation" cellpadding="0" cellspacing="0"><tr>
-              <td style="width: 36px; height: 36px; background-color: {_CLR_BLUE};
-                         border-radius: 10px; text-align: center; vertical-align: middle;
-                         font-size: 16px; color: #ffffff;">&#9998;</td>
-              <td style="padding-left: 14px;">
-                <span style="font-family: {_FONT}; color: #ffffff; font-size: 13px;
-                             font-weight: 600; letter-spacing: 3px; text-transform: uppercase;
-                             opacity: 0.7;">RINNAI IT</span></td>
-            </tr></table>
-          </td>
-        </tr>
-        <tr>
-          <td style="padding: 0 40px 36px;">
-            <h1 style="font-family: {_FONT}; color: #ffffff; margin: 0;
-                       font-size: 28px; font-weight: 700; line-height: 1.2;">
-              IT 支援單已受理</h1>
-            <p style="font-family: {_FONT}; color: rgba(255,255,255,0.65); margin: 12px 0 0;
-                      font-size: 15px; line-height: 1.5;">
-              您的需求已進入處理流程，IT 團隊將儘速為您處理。</p>
-            <div style="margin-top: 16px; display: inline-block; background-color: {_CLR_BLUE};
-                        border-radius: 20px; padding: 6px 16px;">
-              <span style="font-family: {_FONT}; color: #ffffff; font-size: 12px;
-                           font-weight: 700; letter-spacing: 1px;">處理中</span></div>
-          </td>
-        </tr>
-      </table>
-    </td>
-  </tr>"""
-
-        # ── HTML body ──
-        body_parts = []
-
-        # 問候
-        body_parts.append(f"""
-  <tr><td style="padding: 36px 40px 0;">
-    <p style="font-family: {_FONT}; color: #1F2937; font-size: 16px; font-weight: 600; margin: 0;">
-      {html_mod.escape(display_name)} 您好，</p>
-  </td></tr>""")
-
-        # 資訊卡
-        body_parts.append(f"""
-  <tr><td style="padding: 24px 40px 16px;">
-    <table role="presentation" width="100%" cellpadding="0" cellspacing="0"
-           style="border: 1px solid {_CLR_BORDER}; border-radius: 12px; overflow: hidden;">
-      {_section_header('支援單資訊')}
-      <tr><td style="padding: 0;">
-        <table role="presentation" width="100%" cellpadding="0" cellspacing="0">
-          {_info_row('單號', issue_id, value_style=f'color: {_CLR_NAVY}; font-size: 15px; font-weight: 700;')}
-          {_info_row('摘要', html_mod.escape(summary))}
-          {_info_row('分類', html_mod.escape(category))}
-          {_info_row('優先序', priority, value_style=f'color: {priority_color}; font-size: 14px; font-weight: 700;')}
-          {_info_row('提交時間', html_mod.escape(created_at), is_last=True)}
-        </table>
-      </td></tr>
-    </table>
-  </td></tr>""")
-
-        # 需求內容
+        description_text = f"\n您提交的需求內容：\n{description}\n" if description else ""
+        description_section = ""
         if description:
             desc_html = html_mod.escape(description).replace("\n", "<br>")
-            body_parts.append(f"""
-  <tr><td style="padding: 0 40px 16px;">
-    <table role="presentation" width="100%" cellpadding="0" cellspacing="0"
-           style="border: 1px solid {_CLR_BORDER}; border-radius: 12px; overflow: hidden;">
-      {_section_header('您提交的需求內容')}
-      <tr><td style="padding: 20px;">
-        <p style="font-family: {_FONT}; color: #4B5563; font-size: 14px;
-                  line-height: 1.7; margin: 0; white-space: pre-wrap;">{desc_html}</p>
-      </td></tr>
-    </table>
-  </td></tr>""")
-
-        # 「進入任務中心」按鈕已移除：使用者沒 Asana 帳號，連結會看到登入頁
-        # （見 memory: feedback_user_notifications_no_asana_link）
-
-        # 提示
-        body_parts.append(f"""
-  <tr><td style="padding: 24px 40px 40px;">
-    <table role="presentation" width="100%" cellpadding="0" cellspacing="0"><tr>
-      <td style="background-color: #EFF6FF; border-radius: 10px; padding: 20px;
-                 border: 1px solid #BFDBFE;">
-        <p style="font-family: {_FONT}; color: #1E40AF; font-size: 13px; margin: 0; line-height: 1.6;">
-          <strong>小提示</strong><br>
-          如需補充資訊或附加檔案，可直接在 Teams 中將檔案傳送給 IT Bot，系統將自動為您關聯至此支援單。
-          處理完成後，系統會再次通知您。</p>
-      </td>
-    </tr></table>
-  </td></tr>""")
+            description_section = "\n" + _DESCRIPTION_SECTION_TMPL.format_map(
+                {"padding": "0 40px 16px", "desc_html": desc_html}
+            )
 
-        html_body = _wrap_email(header_html, "\n".join(body_parts))
-        msg.attach(MIMEText(text_body, "plain", "utf-8"))
-        msg.attach(MIMEText(html_body, "html", "utf-8"))
+        # 不放 Asana 連結 — 使用者沒 Asana 帳號（見 memory: feedback_user_notifications_no_asana_link）
+        text_body = _SUBMISSION_TEXT_TMPL.format_map({
+            "display_name": display_name,
+            "issue_id": issue_id,
+            "summary": summary,
+            "category": category,
+            "priority": priority,
+            "created_at": created_at,
+            "description_text": description_text,
+        })
+        html_body = _SUBMISSION_HTML_TMPL.format_map({
+            "display_name": html_mod.escape(display_name),
+            "issue_id": html_mod.escape(issue_id),
+            "summary": html_mod.escape(summary),
+            "category": html_mod.escape(category),
+            "priority": html_mod.escape(priority),
+            "priority_color": priority_color,
+            "created_at": html_mod.escape(created_at),
+            "description_section": description_section,
+        })
+        msg.set_content(text_body)
+        msg.add_alternative(html_body, subtype="html")
         return msg
 
     async def send_submission_notification(
@@ -539,7 +785,7 @@ class EmailNotifier:
         description: str = "",
     ) -> bool:
         """發送提單確認通知郵件。可選 cc_email 用於 @itt 代提單時 CC 給提出人。回傳 True 表示成功。"""
-        if not self.smtp_user or not self.smtp_password:
+        if not self._enabled:
             logger.warning("SMTP 未設定，跳過提單確認 Email")
             return False
 
@@ -554,9 +800,7 @@ class EmailNotifier:
                 msg["Cc"] = cc_email
                 cc_list = [cc_email]
 
-            import asyncio
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(None, self._send_smtp, msg, to_email, cc_list)
+            await self._deliver(msg, to_email, cc_list)
 
             cc_log = f" (CC: {cc_email})" if cc_email else ""
             logger.info("提單確認 Email 已發送至 %s%s (單號: %s)", to_email, cc_log, issue_id)
@@ -574,52 +818,18 @@ class EmailNotifier:
         body_text: str,
     ) -> bool:
         """發送自訂內容的通知郵件。"""
-        if not self.smtp_user or not self.smtp_password:
+        if not self._enabled:
             return False
 
         try:
-            msg = MIMEMultipart("alternative")
-            msg["From"] = self.smtp_user
-            msg["To"] = to_email
-            msg["Subject"] = subject
+            msg = self._new_message(to_email, subject)
 
             html_content = html_mod.escape(body_text).replace("\n", "<br>")
+            full_html = _CUSTOM_HTML_TMPL.format_map({"html_content": html_content})
+            msg.set_content(body_text)
+            msg.add_alternative(full_html, subtype="html")
 
-            header_html = f"""
-  <tr>
-    <td style="background-color: {_CLR_NAVY}; padding: 0;">
-      <table role="presentation" width="100%" cellpadding="0" cellspacing="0">
-        <tr>
-          <td style="padding: 36px 40px;">
-            <table role="presentation" cellpadding="0" cellspacing="0"><tr>
-              <td style="width: 36px; height: 36px; background-color: #8B5CF6;
-                         border-radius: 10px; text-align: center; vertical-align: middle;
-                         font-size: 16px; color: #ffffff;">&#9993;</td>
-              <td style="padding-left: 14px;">
-                <span style="font-family: {_FONT}; color: #ffffff; font-size: 13px;
-                             font-weight: 600; letter-spacing: 3px; text-transform: uppercase;
-                             opacity: 0.7;">RINNAI IT</span></td>
-            </tr></table>
-          </td>
-        </tr>
-      </table>
-    </td>
-  </tr>"""
-
-            body_html = f"""
-  <tr><td style="padding: 40px;">
-    <div style="font-family: {_FONT}; color: {_CLR_BODY}; font-size: 15px; line-height: 1.7;">
-      {html_content}
-    </div>
-  </td></tr>"""
-
-            full_html = _wrap_email(header_html, body_html)
-            msg.attach(MIMEText(body_text, "plain", "utf-8"))
-            msg.attach(MIMEText(full_html, "html", "utf-8"))
-
-            import asyncio
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(None, self._send_smtp, msg, to_email)
+            await self._deliver(msg, to_email)
             return True
         except Exception as e:
             logger.error("自訂 Email 通知發送失敗: %s", e)
@@ -1,6 +1,49 @@
+import functools
 import json
 import os
-from typing import Tuple, Optional
+from typing import Dict, List, Tuple, Optional
+
+try:
+    import ahocorasick  # pyahocorasick: one pass over the text for all keywords
+except ImportError:  # pragma: no cover - fall back to per-keyword substring checks
+    ahocorasick = None
+
+
+def _build_keyword_index(categories: List[dict]):
+    """
+    Pre-lowercase every keyword once and, when pyahocorasick is available,
+    build an automaton mapping keyword -> indices of the categories listing it.
+    Returns (per-category keyword tuples, automaton or None).
+    """
+    keywords = []
+    owners: Dict[str, List[int]] = {}
+    for ci, c in enumerate(categories):
+        lowered = tuple(kw.lower() for kw in c.get("keywords", []) if kw)
+        keywords.append(lowered)
+        for kw in lowered:
+            owners.setdefault(kw, []).append(ci)
+
+    automaton = None
+    if ahocorasick is not None and owners:
+        automaton = ahocorasick.Automaton()
+        for kw, idxs in owners.items():
+            automaton.add_word(kw, (kw, tuple(idxs)))
+        automaton.make_automaton()
+    return keywords, automaton
+
+
+@functools.lru_cache(maxsize=8)
+def _load_taxonomy(path: str, mtime_ns: int):
+    """
+    Parse taxonomy.json and build its keyword index once per (path, mtime).
+    Classifier instances share the result; editing the file changes the key,
+    so the next instance picks up the new taxonomy.
+    Returns (categories, per-category keyword tuples, automaton or None).
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    categories = data.get("categories", [])
+    return (categories, *_build_keyword_index(categories))
 
 
 class ITIntentClassifier:
@@ -12,33 +55,38 @@ class ITIntentClassifier:
     def __init__(self, taxonomy_path: Optional[str] = None):
         if taxonomy_path is None:
             taxonomy_path = os.path.join(os.path.dirname(__file__), "taxonomy.json")
-        with open(taxonomy_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        self.categories = data.get("categories", [])
+        self.categories, self._keywords, self._automaton = _load_taxonomy(
+            taxonomy_path, os.stat(taxonomy_path).st_mtime_ns
+        )
+        self._other = ("other", self._label_for("other"))
+
+    def _scores(self, lower: str) -> List[int]:
+        if self._automaton is not None:
+            # each distinct keyword scores once per category, like the `in` check
+            matched = {kw: idxs for _, (kw, idxs) in self._automaton.iter(lower)}
+            scores = [0] * len(self._keywords)
+            for idxs in matched.values():
+                for ci in idxs:
+                    scores[ci] += 1
+            return scores
+        # case-insensitive simple scoring
+        return [sum(1 for kw in kws if kw in lower) for kws in self._keywords]
 
     def classify(self, text: str) -> Tuple[str, str]:
         if not text:
-            return ("other", self._label_for("other"))
-        lower = text.lower()
-        best = ("other", self._label_for("other"), 0)
-        for c in self.categories:
-            code = c.get("code", "other")
-            label = c.get("label", code)
-            keywords = c.get("keywords", [])
-            score = 0
-            for kw in keywords:
-                if not kw:
-                    continue
-                # case-insensitive simple scoring
-                if kw.lower() in lower:
-                    score += 1
-            if score > best[2]:
-                best = (code, label, score)
-        return (best[0], best[1])
+            return self._other
+        best, best_score = None, 0
+        for ci, score in enumerate(self._scores(text.lower())):
+            if score > best_score:
+                best, best_score = ci, score
+        if best is None:
+            return self._other
+        c = self.categories[best]
+        code = c.get("code", "other")
+        return (code, c.get("label", code))
 
     def _label_for(self, code: str) -> str:
         for c in self.categories:
             if c.get("code") == code:
                 return c.get("label", code)
         return code
-
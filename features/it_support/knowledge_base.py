@@ -1,15 +1,36 @@
 import os
+import re
 import json
 import logging
-from datetime import datetime, timezone
-from pathlib import Path
+from datetime import datetime
 from typing import Dict, Any, List, Optional
 import pytz
 
 from infrastructure.external.graph_api_client import GraphAPIClient
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 依賴環境
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# 關鍵字擷取：連續 2 字以上中文或 3 字母以上英文
+_KW_RE = re.compile(r"[\u4e00-\u9fa5]{2,}|[a-zA-Z]{3,}")
+# 每筆條目最多保留的關鍵字數
+_MAX_KEYWORDS = 10
+
+# 台北時區（模組載入時建立一次）
+_TAIPEI = pytz.timezone("Asia/Taipei")
+
+
+def _dumps_entry(entry: Dict[str, Any]) -> bytes:
+    """將知識條目序列化為縮排 2 格的 UTF-8 JSON；有 orjson 時直接在 C 端產生 bytes。"""
+    if orjson is not None:
+        return orjson.dumps(entry, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(entry, ensure_ascii=False, indent=2).encode("utf-8")
+
+
 class ITKnowledgeBase:
     """
     負責 IT 知識庫條目的建立、本地備份及 SharePoint 上傳。
@@ -21,13 +42,15 @@ class ITKnowledgeBase:
         self.site_path = os.getenv("SHAREPOINT_SITE_PATH", "/sites/IT")
         self.root_path = os.getenv("SHAREPOINT_ROOT_PATH", "IT/Knowledge_Base")
 
-    def create_entry(self, task: Dict[str, Any], reporter_info: Dict[str, str], stories: List[Dict[str, Any]] = None) -> Dict[str, Any]:
+    def create_entry(self, task: Dict[str, Any], reporter_info: Dict[str, str], stories: List[Dict[str, Any]] = None,
+                     now: Optional[datetime] = None) -> Dict[str, Any]:
         """從 Asana 任務資料建立 AI-Ready 的 JSON 知識條目。
         若 Asana task 帶有 external.data（提單時 AI 寫入的 structured JSON v1.0），
         則加入頂層 structured 欄位供後續分析使用（schema v2.0 加欄位、不破壞舊結構）。
+        now 為結案時間（台北時區）；應與 save_to_sharepoint 傳入同一值，
+        讓 resolved_at 與上傳路徑的年月一致。
         """
-        taipei = pytz.timezone("Asia/Taipei")
-        now = datetime.now(taipei)
+        now = now or datetime.now(_TAIPEI)
 
         issue_id = reporter_info.get("issue_id", "UNKNOWN")
         resolution = self._extract_resolution(task)
@@ -78,20 +101,20 @@ class ITKnowledgeBase:
 
         return entry
 
-    async def save_to_sharepoint(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+    async def save_to_sharepoint(self, entry: Dict[str, Any], now: Optional[datetime] = None) -> Dict[str, Any]:
         """
         將知識條目上傳至 SharePoint。
+        now 決定 YYYY/MM 目錄，應與 create_entry 使用同一時間。
         """
         issue_id = entry.get("metadata", {}).get("entry_id", "UNKNOWN")
-        taipei = pytz.timezone("Asia/Taipei")
-        now = datetime.now(taipei)
+        now = now or datetime.now(_TAIPEI)
         
         # 路徑：IT/Knowledge_Base/YYYY/MM/ID.json
         year_str = now.strftime("%Y")
         month_str = now.strftime("%m")
         file_path = f"{self.root_path}/{year_str}/{month_str}/{issue_id}.json".replace("//", "/")
         
-        content = json.dumps(entry, ensure_ascii=False, indent=2).encode("utf-8")
+        content = _dumps_entry(entry)
         
         try:
             result = await self.graph_client.upload_to_sharepoint(
@@ -124,11 +147,19 @@ class ITKnowledgeBase:
         """
         簡單的關鍵字產生邏輯。
         """
-        import re
         all_text = title + " " + resolution
         # 這裡可以實作更複雜的斷詞，目前簡單過濾長度 > 1 的詞
-        words = re.findall(r"[\u4e00-\u9fa5]{2,}|[a-zA-Z]{3,}", all_text)
-        return list(set(words))[:10]
+        # 依出現順序去重，取滿上限即停止，不必先建立完整詞表
+        seen = set()
+        keywords = []
+        for m in _KW_RE.finditer(all_text):
+            word = m.group(0)
+            if word not in seen:
+                seen.add(word)
+                keywords.append(word)
+                if len(keywords) == _MAX_KEYWORDS:
+                    break
+        return keywords
 
     async def list_entries(self, year: Optional[str] = None, month: Optional[str] = None) -> List[Dict[str, Any]]:
         """
@@ -17,6 +17,9 @@ from .kb_client import KBVectorClient
 
 logger = logging.getLogger(__name__)
 
+# 台北時區（模組載入時建立一次）
+_TAIPEI = pytz.timezone("Asia/Taipei")
+
 
 class ITSupportService:
     """
@@ -220,8 +223,7 @@ class ITSupportService:
         name = f"{issue_id} - {category_label}"
 
         # Localize created time to Taiwan time
-        taipei = pytz.timezone("Asia/Taipei")
-        now_taipei = datetime.now(taipei)
+        now_taipei = datetime.now(_TAIPEI)
         created_at = now_taipei.strftime("%Y-%m-%d %H:%M 台北時間")
         created_at_iso = now_taipei.isoformat()
 
@@ -389,7 +391,8 @@ class ITSupportService:
             }
 
         try:
-            result = await self.asana.create_task(data)
+            # 只取建單後用到的欄位，避免回傳並解析完整任務（custom_fields、memberships 等）
+            result = await self.asana.create_task(data, opt_fields="gid,name,permalink_url")
             task = result.get("data", {})
             link = task.get("permalink_url")
             gid = task.get("gid")
@@ -416,13 +419,15 @@ class ITSupportService:
             _email_test_mode = os.getenv("EMAIL_TEST_MODE", "false").strip().lower() == "true"
             _test_emails = {"juncheng.liu@rinnai.com.tw"}
             should_send = (not _email_test_mode) or (reporter_email.lower() in _test_emails)
-            print(f"📧 Email 檢查: reporter={reporter_email.lower()}, test_mode={_email_test_mode}, should_send={should_send}")
+            logger.debug(
+                "Email 檢查: reporter=%s, test_mode=%s, should_send=%s",
+                reporter_email.lower(), _email_test_mode, should_send,
+            )
             if should_send:
                 # 發送提單確認 Email（代提單時 CC 給提出人）
                 cc_target = ""
                 if requester_email and requester_email.lower() != reporter_email.lower():
                     cc_target = requester_email
-                print(f"📧 準備發送提單確認 Email 至 {reporter_email}" + (f" (CC: {cc_target})" if cc_target else ""))
                 try:
                     email_ok = await self.email_notifier.send_submission_notification(
                         to_email=reporter_email,
@@ -436,13 +441,11 @@ class ITSupportService:
                         cc_email=cc_target,
                         description=description,
                     )
-                    print(f"📧 提單確認 Email → {reporter_email}: {'✅ 成功' if email_ok else '❌ 失敗'}")
-                except Exception as mail_err:
-                    import traceback
-                    print(f"❌ 提單確認 Email 發送例外: {mail_err}")
-                    traceback.print_exc()
+                    logger.debug("提單確認 Email → %s: %s", reporter_email, "成功" if email_ok else "失敗")
+                except Exception:
+                    logger.exception("提單確認 Email 發送例外")
             else:
-                print(f"📧 跳過 Email 通知（測試模式，{reporter_email} 不在白名單中）")
+                logger.debug("跳過 Email 通知（測試模式，%s 不在白名單中）", reporter_email)
             return {
                 "success": True,
                 "task_gid": gid,
@@ -458,8 +461,7 @@ class ITSupportService:
         Stores state in local_audit_logs/it_issue_seq.json.
         Returns (issue_id, dt).
         """
-        taipei = pytz.timezone("Asia/Taipei")
-        now = datetime.now(taipei)
+        now = datetime.now(_TAIPEI)
         date_str = now.strftime("%Y%m%d")
         dt_str = now.strftime("%Y%m%d%H%M")
 
@@ -1182,10 +1184,12 @@ class ITSupportService:
         if self.knowledge_base:
             async def _kb_bg():
                 try:
+                    # 同一個結案時間供條目 resolved_at 與上傳路徑共用（避免跨午夜/跨月不一致）
+                    resolved_now = datetime.now(_TAIPEI)
                     entry = self.knowledge_base.create_entry(
-                        task, reporter_info, stories_for_kb,
+                        task, reporter_info, stories_for_kb, now=resolved_now,
                     )
-                    await self.knowledge_base.save_to_sharepoint(entry)
+                    await self.knowledge_base.save_to_sharepoint(entry, now=resolved_now)
                     logger.info("IT 知識庫處理完成: %s", issue_id)
                 except Exception as kb_err:
                     logger.error("處理 IT 知識庫失敗: %s", kb_err)
@@ -18,6 +18,15 @@ from infrastructure.external.token_manager import TokenManager
 
 logger = logging.getLogger(__name__)
 
+# calendarView 單頁筆數（Graph 預設僅 10 筆；放大每頁筆數以減少依 @odata.nextLink 翻頁的次數）
+_CALENDAR_PAGE_SIZE = 50
+
+# 未設定 graph_api.max_concurrency 時的同時請求上限
+_DEFAULT_MAX_CONCURRENCY = 16
+
+# 行事曆/會議查詢使用的 Outlook 時區偏好
+_TAIPEI_TIMEZONE_PREFER = "outlook.timezone=\"Taipei Standard Time\""
+
 
 class GraphAPIClient:
     """Microsoft Graph API 客戶端"""
@@ -27,6 +36,11 @@ class GraphAPIClient:
         self.token_manager = token_manager
         self.base_url = "https://graph.microsoft.com/v1.0"
         self.session: Optional[aiohttp.ClientSession] = None
+        # 限制同時進行中的 Graph 請求數；重試等待期間不佔用名額
+        max_concurrency = getattr(config.graph_api, "max_concurrency", None)
+        if not isinstance(max_concurrency, int) or max_concurrency <= 0:
+            max_concurrency = _DEFAULT_MAX_CONCURRENCY
+        self._semaphore = asyncio.Semaphore(max_concurrency)
 
     async def __aenter__(self):
         """異步上下文管理器入口"""
@@ -47,6 +61,22 @@ class GraphAPIClient:
             "Accept": "application/json",
         }
 
+    @staticmethod
+    def _prefers_taipei_timezone(method: str, endpoint: str) -> bool:
+        """是否為需加上 Taipei 時區偏好的行事曆/會議查詢"""
+        ep_lower = endpoint.lower()
+        is_calendar_get = (
+            method.upper() == "GET"
+            and (
+                "calendarview" in ep_lower
+                or "/events" in ep_lower
+                or "calendar" in ep_lower
+            )
+        )
+        # getSchedule/findMeetingTimes 雖為 POST，但屬查詢性質
+        is_schedule_query = ("getschedule" in ep_lower) or ("findmeetingtimes" in ep_lower)
+        return is_calendar_get or is_schedule_query
+
     async def _ensure_session(self) -> None:
         """確保 aiohttp session 已初始化且未關閉。"""
         if self.session is None or self.session.closed:
@@ -67,25 +97,11 @@ class GraphAPIClient:
         headers = await self._get_headers()
 
         # 針對會議/行事曆查詢加上 Outlook 時區偏好（Taipei Standard Time）
-        try:
-            ep_lower = endpoint.lower()
-            is_calendar_get = (
-                method.upper() == "GET"
-                and (
-                    "calendarview" in ep_lower
-                    or "/events" in ep_lower
-                    or "calendar" in ep_lower
-                )
-            )
-            # getSchedule/findMeetingTimes 雖為 POST，但屬查詢性質
-            is_schedule_query = ("getschedule" in ep_lower) or ("findmeetingtimes" in ep_lower)
-            if is_calendar_get or is_schedule_query:
-                headers["Prefer"] = "outlook.timezone=\"Taipei Standard Time\""
-        except Exception:
-            pass
+        if self._prefers_taipei_timezone(method, endpoint):
+            headers["Prefer"] = _TAIPEI_TIMEZONE_PREFER
 
         try:
-            async with self.session.request(
+            async with self._semaphore, self.session.request(
                 method, url, headers=headers, json=data, params=params
             ) as response:
                 response_text = await response.text()
@@ -124,21 +140,10 @@ class GraphAPIClient:
         headers = await self._get_headers()
 
         # 行事曆/會議查詢時加入 Prefer 時區
-        try:
-            ep_lower = endpoint.lower()
-            is_calendar_get = (
-                method.upper() == "GET"
-                and (
-                    "calendarview" in ep_lower or "/events" in ep_lower or "calendar" in ep_lower
-                )
-            )
-            is_schedule_query = ("getschedule" in ep_lower) or ("findmeetingtimes" in ep_lower)
-            if is_calendar_get or is_schedule_query:
-                headers["Prefer"] = "outlook.timezone=\"Taipei Standard Time\""
-        except Exception:
-            pass
+        if self._prefers_taipei_timezone(method, endpoint):
+            headers["Prefer"] = _TAIPEI_TIMEZONE_PREFER
 
-        async with self.session.request(
+        async with self._semaphore, self.session.request(
             method, url, headers=headers, json=data, params=params
         ) as response:
             text = await response.text()
@@ -285,7 +290,7 @@ class GraphAPIClient:
             headers = await self._get_headers()
             url = f"{self.base_url}/{endpoint}"
 
-            async with self.session.get(url, headers=headers) as response:
+            async with self._semaphore, self.session.get(url, headers=headers) as response:
                 if response.status == 200:
                     return await response.read()
                 return None
@@ -316,18 +321,24 @@ class GraphAPIClient:
     ) -> Dict[str, Any]:
         """檢查會議室可用性"""
         try:
-            data = {
-                "schedules": room_emails,
-                "startTime": {"dateTime": start_time, "timeZone": "Asia/Taipei"},
-                "endTime": {"dateTime": end_time, "timeZone": "Asia/Taipei"},
-                "availabilityViewInterval": 15,
-            }
-
-            endpoint = "calendar/getSchedule"
-            return await self._make_request("POST", endpoint, data)
+            return await self._make_request(
+                "POST", "calendar/getSchedule", self.room_availability_body(room_emails, start_time, end_time)
+            )
         except Exception as e:
             raise GraphAPIError(f"檢查會議室可用性失敗: {str(e)}") from e
 
+    @staticmethod
+    def room_availability_body(
+        room_emails: List[str], start_time: str, end_time: str
+    ) -> Dict[str, Any]:
+        """getSchedule 的請求內容"""
+        return {
+            "schedules": room_emails,
+            "startTime": {"dateTime": start_time, "timeZone": "Asia/Taipei"},
+            "endTime": {"dateTime": end_time, "timeZone": "Asia/Taipei"},
+            "availabilityViewInterval": 15,
+        }
+
     async def get_room_schedule(
         self, room_email: str, start_time: str, end_time: str
     ) -> Dict[str, Any]:
@@ -413,20 +424,41 @@ class GraphAPIClient:
         end_time: str,
         select: str = "id,subject,start,end,location,organizer,attendees",
     ) -> List[Dict[str, Any]]:
-        """取得用戶行事曆事件（時間區間）。時間字串使用 ISO 格式（建議 +08:00）。"""
+        """取得用戶行事曆事件（時間區間）。時間字串使用 ISO 格式（建議 +08:00）。
+
+        事件超過一頁時依 @odata.nextLink 逐頁取回並合併。
+        """
         try:
             endpoint = f"users/{user_email}/calendarView"
-            params = {
-                "startDateTime": start_time,
-                "endDateTime": end_time,
-                "$select": select,
-                "$orderby": "start/dateTime",
-            }
-            resp = await self._make_request("GET", endpoint, params=params)
-            return resp.get("value", [])
+            params: Optional[Dict[str, Any]] = self.calendar_view_params(start_time, end_time, select)
+            events: List[Dict[str, Any]] = []
+            while True:
+                resp = await self._make_request("GET", endpoint, params=params)
+                events.extend(resp.get("value", []))
+
+                next_link = resp.get("@odata.nextLink")
+                if not next_link:
+                    break
+                if not next_link.startswith(self.base_url):
+                    raise GraphAPIError(f"無法識別的分頁連結: {next_link}")
+                # nextLink 為完整網址且已含查詢字串（含 $skiptoken），不再另帶參數
+                endpoint = next_link[len(self.base_url):]
+                params = None
+            return events
         except Exception as e:
             raise GraphAPIError(f"獲取用戶行事曆失敗: {str(e)}") from e
 
+    @staticmethod
+    def calendar_view_params(start_time: str, end_time: str, select: str) -> Dict[str, Any]:
+        """calendarView 的查詢參數"""
+        return {
+            "startDateTime": start_time,
+            "endDateTime": end_time,
+            "$select": select,
+            "$orderby": "start/dateTime",
+            "$top": _CALENDAR_PAGE_SIZE,
+        }
+
     async def get_user_by_id(self, aad_object_id: str) -> Dict[str, Any]:
         """使用 AAD Object Id 取得用戶資訊（對齊 app_bak 行為）。"""
         try:
@@ -629,7 +661,7 @@ class GraphAPIClient:
         headers["Content-Type"] = content_type
         
         url = f"{self.base_url}/{endpoint}"
-        async with self.session.put(url, headers=headers, data=content) as resp:
+        async with self._semaphore, self.session.put(url, headers=headers, data=content) as resp:
             resp_text = await resp.text()
             if resp.status >= 400:
                 raise GraphAPIError(f"SharePoint 檔案上傳失敗: {resp.status} - {resp_text}")
@@ -668,7 +700,7 @@ class GraphAPIClient:
         headers = await self._get_headers()
         url = f"{self.base_url}/{endpoint}"
         
-        async with self.session.get(url, headers=headers, allow_redirects=True) as resp:
+        async with self._semaphore, self.session.get(url, headers=headers, allow_redirects=True) as resp:
             if resp.status >= 400:
                 return None
             
@@ -91,7 +91,7 @@ class OpenAIClient:
                     {**responses_params, "endpoint": "responses.create"},
                 )
 
-                response = await asyncio.get_event_loop().run_in_executor(
+                response = await asyncio.get_running_loop().run_in_executor(
                     None, lambda: self.client.responses.create(**responses_params)
                 )
 
@@ -167,7 +167,7 @@ class OpenAIClient:
                     request_params,
                 )
 
-                response = await asyncio.get_event_loop().run_in_executor(
+                response = await asyncio.get_running_loop().run_in_executor(
                     None, lambda: self.client.chat.completions.create(**request_params)
                 )
 
@@ -268,12 +268,18 @@ class OpenAIClient:
                 if "temperature" in kwargs:
                     request_params["temperature"] = kwargs["temperature"]
 
-            response = await asyncio.get_event_loop().run_in_executor(
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(
                 None, lambda: self.client.chat.completions.create(**request_params)
             )
 
-            for chunk in response:
-                if chunk.choices[0].delta.content is not None:
+            # 同步串流的每次讀取都會等待網路，於執行緒池中逐段取得，避免阻塞事件迴圈
+            chunks = iter(response)
+            while True:
+                chunk = await loop.run_in_executor(None, next, chunks, None)
+                if chunk is None:
+                    break
+                if chunk.choices and chunk.choices[0].delta.content is not None:
                     yield chunk.choices[0].delta.content
 
             self.logger.info(
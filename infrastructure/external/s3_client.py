@@ -106,7 +106,7 @@ class S3Client:
                 upload_args['Metadata'] = metadata
             
             # 執行上傳
-            loop = asyncio.get_event_loop()
+            loop = asyncio.get_running_loop()
             await loop.run_in_executor(
                 None,
                 lambda: self.client.upload_file(
@@ -142,7 +142,7 @@ class S3Client:
             # 確保本地目錄存在
             os.makedirs(os.path.dirname(local_path), exist_ok=True)
             
-            loop = asyncio.get_event_loop()
+            loop = asyncio.get_running_loop()
             await loop.run_in_executor(
                 None,
                 lambda: self.client.download_file(
@@ -174,7 +174,7 @@ class S3Client:
             if not self.bucket_name:
                 raise S3ServiceError("S3 儲存桶名稱未設置")
             
-            loop = asyncio.get_event_loop()
+            loop = asyncio.get_running_loop()
             response = await loop.run_in_executor(
                 None,
                 lambda: self.client.list_objects_v2(
@@ -206,7 +206,7 @@ class S3Client:
             if not self.bucket_name:
                 raise S3ServiceError("S3 儲存桶名稱未設置")
             
-            loop = asyncio.get_event_loop()
+            loop = asyncio.get_running_loop()
             await loop.run_in_executor(
                 None,
                 lambda: self.client.delete_object(
@@ -234,7 +234,7 @@ class S3Client:
             if not self.bucket_name:
                 raise S3ServiceError("S3 儲存桶名稱未設置")
             
-            loop = asyncio.get_event_loop()
+            loop = asyncio.get_running_loop()
             url = await loop.run_in_executor(
                 None,
                 lambda: self.client.generate_presigned_url(
@@ -257,7 +257,7 @@ class S3Client:
             if not self.bucket_name:
                 return False
             
-            loop = asyncio.get_event_loop()
+            loop = asyncio.get_running_loop()
             await loop.run_in_executor(
                 None,
                 lambda: self.client.head_object(
@@ -278,7 +278,7 @@ class S3Client:
             if not self.bucket_name:
                 raise S3ServiceError("S3 儲存桶名稱未設置")
             
-            loop = asyncio.get_event_loop()
+            loop = asyncio.get_running_loop()
             
             # 獲取儲存桶位置
             location = await loop.run_in_executor(
@@ -326,7 +326,7 @@ class S3Client:
                 }
             
             # 測試列出物件（限制為 1 個以減少開銷）
-            loop = asyncio.get_event_loop()
+            loop = asyncio.get_running_loop()
             response = await loop.run_in_executor(
                 None,
                 lambda: self.client.list_objects_v2(
@@ -6,16 +6,27 @@ import time
 import json
 import asyncio
 import logging
-from typing import Any, Dict, List, Optional, Union
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Union
 from datetime import datetime
 import pytz
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 依賴環境
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
 # 台灣時區
 TAIWAN_TZ = pytz.timezone("Asia/Taipei")
 
+# AI 回應 JSON 清理／擷取用的正則（模組載入時編譯一次）
+_CODE_FENCE_START_RE = re.compile(r'^```(?:json)?\n?')
+_CODE_FENCE_END_RE = re.compile(r'\n?```$')
+_JSON_OBJECT_RE = re.compile(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}')
+
 
 def get_taiwan_time() -> datetime:
     """獲取台灣時間"""
@@ -44,8 +55,8 @@ def clean_json_response(response_text: str) -> str:
     # 移除 markdown 代碼塊標記
     cleaned = response_text.strip()
     if cleaned.startswith("```"):
-        cleaned = re.sub(r'^```(?:json)?\n?', '', cleaned)
-        cleaned = re.sub(r'\n?```$', '', cleaned)
+        cleaned = _CODE_FENCE_START_RE.sub('', cleaned)
+        cleaned = _CODE_FENCE_END_RE.sub('', cleaned)
     
     return cleaned.strip()
 
@@ -54,19 +65,39 @@ def extract_json_from_text(text: str) -> Optional[Dict[str, Any]]:
     """從文本中提取 JSON 對象"""
     try:
         # 首先嘗試直接解析
-        return json.loads(text)
-    except json.JSONDecodeError:
+        return json_loads(text)
+    except ValueError:
         # 嘗試提取 JSON 對象
-        json_match = re.search(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', text)
+        json_match = _JSON_OBJECT_RE.search(text)
         if json_match:
             try:
-                return json.loads(json_match.group())
-            except json.JSONDecodeError:
+                return json_loads(json_match.group())
+            except ValueError:
                 pass
     
     return None
 
 
+def json_dumps_bytes(obj: Any, indent: bool = False) -> bytes:
+    """序列化為 UTF-8 JSON bytes（非 ASCII 字元原樣保留）；有 orjson 時優先使用。"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None).encode("utf-8")
+
+
+def json_dumps(obj: Any, indent: bool = False) -> str:
+    """序列化為 JSON 字串（非 ASCII 字元原樣保留）"""
+    return json_dumps_bytes(obj, indent=indent).decode("utf-8")
+
+
+def json_loads(data: Union[str, bytes]) -> Any:
+    """解析 JSON 字串或 bytes；有 orjson 時優先使用。"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 def generate_id() -> str:
     """生成唯一 ID"""
     return f"{int(time.time())}{int(time.time() * 1000000) % 1000000}"
@@ -125,6 +156,48 @@ class AsyncRetry:
         return wrapper
 
 
+class TTLCache:
+    """有存活時間與容量上限的記憶體快取（超過容量時淘汰最久未使用的項目）"""
+    
+    def __init__(self, maxsize: int = 256, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """取得未過期的值，不存在或已過期時回傳 None"""
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+    
+    def set(self, key: Hashable, value: Any) -> None:
+        """寫入快取"""
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+    
+    def remove_if(self, predicate: Callable[[Hashable], bool]) -> int:
+        """移除鍵符合條件的項目，回傳移除數量"""
+        keys = [key for key in self._data if predicate(key)]
+        for key in keys:
+            del self._data[key]
+        return len(keys)
+    
+    def clear(self) -> None:
+        """清空快取"""
+        self._data.clear()
+    
+    def __len__(self) -> int:
+        return len(self._data)
+
+
 def validate_email(email: str) -> bool:
     """驗證郵箱格式"""
     if not email:
@@ -0,0 +1,78 @@
+from datetime import timedelta
+
+import pytest
+
+from domain.models.audit import MessageRole
+from domain.models.conversation import ConversationMessage
+from domain.repositories.conversation_repository import InMemoryConversationRepository
+from shared.utils.helpers import get_taiwan_time
+
+
+def _message(content, role=MessageRole.USER):
+    return ConversationMessage(role=role, content=content, timestamp=get_taiwan_time(), metadata={})
+
+
+@pytest.fixture
+def repo():
+    return InMemoryConversationRepository()
+
+
+class TestSearchByKeyword:
+    async def test_matches_case_insensitively_and_sees_new_messages(self, repo):
+        await repo.create("conv_00001", "wang@rinnai.com.tw")
+        await repo.create("conv_00002", "wang@rinnai.com.tw")
+        await repo.add_message("conv_00001", _message("VPN 連不上"))
+        await repo.add_message("conv_00002", _message("印表機卡紙"))
+
+        results = await repo.search_by_keyword("wang@rinnai.com.tw", keyword="vpn")
+        assert [c.id for c in results] == ["conv_00001"]
+
+        await repo.add_message("conv_00002", _message("vpn 也有問題", MessageRole.ASSISTANT))
+        results = await repo.search_by_keyword("wang@rinnai.com.tw", keyword="VPN")
+        assert sorted(c.id for c in results) == ["conv_00001", "conv_00002"]
+
+    async def test_keyword_does_not_span_messages(self, repo):
+        await repo.create("conv_00001", "wang@rinnai.com.tw")
+        await repo.add_messages("conv_00001", [_message("ab"), _message("cd")])
+        assert await repo.search_by_keyword("wang@rinnai.com.tw", keyword="bc") == []
+
+    async def test_index_extends_on_append_and_rebuilds_after_clear(self, repo):
+        await repo.create("conv_00001", "wang@rinnai.com.tw")
+        await repo.add_message("conv_00001", _message("ab"))
+        assert await repo.search_by_keyword("wang@rinnai.com.tw", keyword="ab")
+
+        await repo.add_message("conv_00001", _message("cd"))
+        assert await repo.search_by_keyword("wang@rinnai.com.tw", keyword="bc") == []
+        assert await repo.search_by_keyword("wang@rinnai.com.tw", keyword="cd")
+
+        await repo.clear_conversation_messages("conv_00001")
+        await repo.add_messages("conv_00001", [_message("ef"), _message("gh")])
+        assert await repo.search_by_keyword("wang@rinnai.com.tw", keyword="ab") == []
+        assert await repo.search_by_keyword("wang@rinnai.com.tw", keyword="gh")
+
+    async def test_filters_by_created_at(self, repo):
+        conversation = await repo.create("conv_00001", "wang@rinnai.com.tw")
+        future = get_taiwan_time() + timedelta(days=1)
+        assert await repo.search_by_keyword("wang@rinnai.com.tw", date_from=future) == []
+        assert await repo.search_by_keyword("wang@rinnai.com.tw", date_to=future) == [conversation]
+
+
+class TestStats:
+    async def test_aggregates_counts_in_one_call(self, repo):
+        from domain.models.conversation import ConversationState
+
+        await repo.create("conv_00001", "wang@rinnai.com.tw")
+        await repo.create("conv_00002", "wang@rinnai.com.tw")
+        await repo.create("conv_00003", "lee@rinnai.com.tw")
+        await repo.add_messages("conv_00001", [_message("a"), _message("b")])
+        await repo.update_state("conv_00002", ConversationState.COMPLETED)
+
+        stats = await repo.get_stats("wang@rinnai.com.tw", get_taiwan_time() - timedelta(days=7))
+
+        assert stats == {
+            "total_conversations": 2,
+            "active_conversations": 1,
+            "completed_conversations": 1,
+            "total_messages": 2,
+            "recent_conversations": 2,
+        }
@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from domain.repositories.user_repository import InMemoryUserRepository
+
+
+@pytest.fixture
+def graph_client():
+    client = MagicMock()
+
+    async def _get_user_info(email):
+        await asyncio.sleep(0.01)
+        return {"displayName": "王小明", "department": "資訊課"}
+
+    client.get_user_info = AsyncMock(side_effect=_get_user_info)
+    return client
+
+
+@pytest.fixture
+def repo(graph_client):
+    return InMemoryUserRepository(graph_client)
+
+
+class TestGetOrCreateProfile:
+    async def test_concurrent_calls_fetch_graph_once(self, repo, graph_client):
+        results = await asyncio.gather(
+            *(repo.get_or_create_profile("wang@rinnai.com.tw") for _ in range(5))
+        )
+        assert graph_client.get_user_info.await_count == 1
+        assert all(p is results[0] for p in results)
+        assert repo._inflight == {}
+
+    async def test_existing_profile_is_returned(self, repo):
+        created = await repo.get_or_create_profile("wang@rinnai.com.tw")
+        again = await repo.get_or_create_profile("wang@rinnai.com.tw")
+        assert again is created
+
+
+class TestProfileChangeEvents:
+    async def test_update_profile_syncs_display_name(self, repo):
+        profile = await repo.get_or_create_profile("wang@rinnai.com.tw")
+        profile.display_name = "王大明"
+        await repo.update_profile(profile)
+        assert await repo.get_display_name("wang@rinnai.com.tw") == "王大明"
+
+    async def test_set_display_name_notifies_subscribers(self, repo):
+        await repo.get_or_create_profile("wang@rinnai.com.tw")
+        events = []
+        repo.subscribe_profile_change(lambda email, p: events.append((email, p.display_name)))
+        await repo.set_display_name("wang@rinnai.com.tw", "小明")
+        assert events == [("wang@rinnai.com.tw", "小明")]
+        assert await repo.get_display_name("wang@rinnai.com.tw") == "小明"
+
+
+class TestActivityTracking:
+    async def test_stats_and_purge_use_last_active(self, repo):
+        await repo.get_or_create_profile("wang@rinnai.com.tw")
+        stats = await repo.get_user_stats()
+        assert stats["total_profiles"] == 1
+        assert stats["recent_active_users"] == 1
+
+        assert await repo.purge_inactive_profiles(inactive_days=0) == 1
+        assert repo._last_active == {}
@@ -0,0 +1,14 @@
+import ast
+import inspect
+from collections import Counter
+
+import domain.services.audit_service as audit_service_module
+
+
+def test_audit_service_has_no_shadowed_methods():
+    tree = ast.parse(inspect.getsource(audit_service_module))
+    (cls,) = [n for n in tree.body if isinstance(n, ast.ClassDef) and n.name == "AuditService"]
+    names = Counter(
+        n.name for n in cls.body if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))
+    )
+    assert [name for name, count in names.items() if count > 1] == []
@@ -0,0 +1,60 @@
+import json
+import os
+
+import pytest
+from unittest.mock import MagicMock
+
+from domain.repositories.audit_repository import InMemoryAuditRepository
+from domain.services.audit_service import AuditService
+
+
+@pytest.fixture
+def audit_service(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return AuditService(config=MagicMock(), audit_repository=InMemoryAuditRepository())
+
+
+def _local_files():
+    return sorted(os.listdir("./local_audit_logs"))
+
+
+class TestLocalAuditLog:
+    async def test_entries_are_appended_as_json_lines(self, audit_service):
+        await audit_service.log_user_message("conv_12345", "wang@rinnai.com.tw", "你好")
+        await audit_service.log_assistant_message("conv_12345", "wang@rinnai.com.tw", "您好")
+        await audit_service.aclose()
+
+        (filename,) = _local_files()
+        assert filename.endswith(".jsonl")
+        with open(os.path.join("./local_audit_logs", filename), encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f]
+        assert [r["content"] for r in rows] == ["你好", "您好"]
+
+    async def test_local_file_listing_counts_jsonl_and_legacy_json(self, audit_service):
+        await audit_service.log_user_message("conv_12345", "wang@rinnai.com.tw", "你好")
+        os.makedirs("./local_audit_logs", exist_ok=True)
+        with open("./local_audit_logs/lee@rinnai.com.tw_2026-01-01.json", "w", encoding="utf-8") as f:
+            json.dump([{"content": "a"}, {"content": "b"}], f)
+
+        files = {f["filename"]: f for f in await audit_service.get_local_audit_files()}
+        counts = sorted(f["record_count"] for f in files.values())
+        assert counts == [1, 2]
+        await audit_service.aclose()
+
+    async def test_record_count_tracks_appends(self, audit_service):
+        await audit_service.log_user_message("conv_12345", "wang@rinnai.com.tw", "你好")
+        (first,) = await audit_service.get_local_audit_files()
+        assert first["record_count"] == 1
+
+        await audit_service.log_assistant_message("conv_12345", "wang@rinnai.com.tw", "您好")
+        (second,) = await audit_service.get_local_audit_files()
+        assert second["record_count"] == 2
+        await audit_service.aclose()
+
+    async def test_writes_are_deferred_to_background_flush(self, audit_service):
+        await audit_service.log_user_message("conv_12345", "wang@rinnai.com.tw", "你好")
+        assert not os.path.exists("./local_audit_logs")
+
+        await audit_service.flush_local_logs()
+        assert len(_local_files()) == 1
+        await audit_service.aclose()
@@ -0,0 +1,121 @@
+from datetime import timedelta
+
+import pytest
+from unittest.mock import MagicMock
+
+from domain.models.audit import MessageRole
+from domain.repositories.audit_repository import InMemoryAuditRepository
+
+
+@pytest.fixture
+def repo():
+    return InMemoryAuditRepository()
+
+
+@pytest.fixture
+def audit_service(repo):
+    from domain.services.audit_service import AuditService
+
+    config = MagicMock()
+    config.database.retention_days = 30
+    return AuditService(config=config, audit_repository=repo)
+
+
+async def _seed(repo):
+    await repo.create_entry("conv_00001", "wang@rinnai.com.tw", MessageRole.USER, "印表機卡紙")
+    await repo.create_entry("conv_00001", "wang@rinnai.com.tw", MessageRole.ASSISTANT, "請重新開機")
+    await repo.create_entry("conv_00002", "lee@rinnai.com.tw", MessageRole.USER, "VPN 連不上")
+
+
+class TestSummaries:
+    async def test_audit_summary_counts_pending_per_user(self, audit_service, repo):
+        await _seed(repo)
+        summary = await audit_service.get_audit_summary()
+        assert summary["total_users"] == 2
+        assert summary["total_pending_logs"] == 3
+        pending = {u["user_mail"]: u["pending_logs"] for u in summary["users"]}
+        assert pending == {"wang@rinnai.com.tw": 2, "lee@rinnai.com.tw": 1}
+
+    async def test_system_overview_uses_bulk_counts(self, audit_service, repo):
+        await _seed(repo)
+        overview = await audit_service.get_system_audit_overview()
+        assert overview["total_entries"] == 3
+        assert overview["last_24h_entries"] == 3
+
+    async def test_user_status_uses_log_meta(self, audit_service, repo):
+        await _seed(repo)
+        repo.get_user_log = MagicMock(side_effect=AssertionError("不應載入完整日誌"))
+        status = await audit_service.get_user_audit_status("wang@rinnai.com.tw")
+        assert status["pending_logs"] == 2
+        assert status["last_activity"] is not None
+
+        empty = await audit_service.get_user_audit_status("nobody@rinnai.com.tw")
+        assert (empty["pending_logs"], empty["last_activity"]) == (0, None)
+
+
+class TestUsersCache:
+    async def test_user_list_is_memoized_until_new_user_logs(self, audit_service, repo):
+        await _seed(repo)
+        repo.get_all_users_with_logs = MagicMock(wraps=repo.get_all_users_with_logs)
+
+        await audit_service.get_audit_summary()
+        await audit_service.get_system_audit_overview()
+        assert repo.get_all_users_with_logs.call_count == 1
+
+        await audit_service.log_admin_action("admin@rinnai.com.tw", "清理日誌")
+        users = await audit_service.get_all_users_with_logs()
+        assert repo.get_all_users_with_logs.call_count == 2
+        assert "admin@rinnai.com.tw" in users
+
+
+class TestSearch:
+    async def test_search_filters_by_role_and_keyword(self, audit_service, repo):
+        await _seed(repo)
+        results = await audit_service.search_audit_logs(role=MessageRole.USER, keyword="vpn")
+        assert [e.content for e in results] == ["VPN 連不上"]
+
+    async def test_search_returns_newest_first_within_limit(self, audit_service, repo):
+        await _seed(repo)
+        results = await audit_service.search_audit_logs(user_mail="wang@rinnai.com.tw", limit=1)
+        assert len(results) == 1
+        assert results[0].content == "請重新開機"
+
+
+class TestConversationHistory:
+    async def test_pages_backwards_with_before_ts(self, audit_service, repo):
+        entries = []
+        for i in range(5):
+            entry = await repo.create_entry("conv_00001", "wang@rinnai.com.tw", MessageRole.USER, f"訊息{i}")
+            entry.timestamp = entry.timestamp + timedelta(seconds=i)
+            entries.append(entry)
+
+        page = await audit_service.get_conversation_history("conv_00001", limit=2)
+        assert [e.content for e in page] == ["訊息3", "訊息4"]
+
+        older = await audit_service.get_conversation_history("conv_00001", limit=2, before_ts=page[0].timestamp)
+        assert [e.content for e in older] == ["訊息1", "訊息2"]
+
+        everything = await audit_service.get_conversation_history("conv_00001", limit=None)
+        assert len(everything) == 5
+
+
+class TestIntegrity:
+    async def test_reports_order_empty_content_and_bad_conversation_ids(self, audit_service, repo):
+        await _seed(repo)
+        late = await repo.create_entry("conv_00001", "wang@rinnai.com.tw", MessageRole.USER, " ")
+        late.timestamp = late.timestamp - timedelta(days=1)
+        await repo.create_entry("c1", "wang@rinnai.com.tw", MessageRole.USER, "ok")
+
+        result = await audit_service.validate_audit_integrity("wang@rinnai.com.tw")
+
+        assert result["status"] == "issues_found"
+        assert result["issues"] == [
+            f"時間序列異常: 條目 {late.id}",
+            "空內容條目: 1 個",
+            "無效對話ID: 1 個",
+        ]
+
+    async def test_clean_log_is_valid(self, audit_service, repo):
+        await _seed(repo)
+        result = await audit_service.validate_audit_integrity("lee@rinnai.com.tw")
+        assert result == {**result, "status": "valid", "issues": [], "total_entries": 1}
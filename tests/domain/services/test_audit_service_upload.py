@@ -0,0 +1,126 @@
+import os
+import re
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from domain.models.audit import MessageRole
+from domain.repositories.audit_repository import InMemoryAuditRepository
+from domain.services.audit_service import AuditService
+
+pyzipper = pytest.importorskip("pyzipper")
+
+
+@pytest.fixture
+def s3_client():
+    client = MagicMock()
+    client.bucket_name = "audit-bucket"
+    client.uploaded = []
+    client.client.upload_file.side_effect = (
+        lambda path, bucket, key, ExtraArgs=None: client.uploaded.append(key)
+    )
+    return client
+
+
+@pytest.fixture
+def repo():
+    return InMemoryAuditRepository()
+
+
+@pytest.fixture
+def audit_service(tmp_path, monkeypatch, repo, s3_client):
+    monkeypatch.chdir(tmp_path)
+    config = MagicMock()
+    config.s3.upload_concurrency = 2
+    return AuditService(config=config, audit_repository=repo, s3_client=s3_client)
+
+
+class TestUploadAllUsers:
+    async def test_uploads_each_user_once_and_clears_local_cache(self, audit_service, repo, s3_client):
+        for user in ("wang@rinnai.com.tw", "lee@rinnai.com.tw", "chen@rinnai.com.tw"):
+            await audit_service.log_user_message("conv_12345", user, "你好")
+
+        result = await audit_service.upload_all_users_audit_logs()
+
+        assert result["success"] is True
+        assert len(s3_client.uploaded) == 3
+        key_pattern = re.compile(r"^trgpt/(?P<u>[^/]+)/(?P<d>[\d-]{10})/(?P=u)_(?P=d)_\d{8}_\d{6}\.json\.zip$")
+        assert all(key_pattern.match(key) for key in s3_client.uploaded)
+        assert os.listdir("./local_audit_logs") == []
+        assert (await repo.get_user_log("wang@rinnai.com.tw")).entries == []
+        assert audit_service._s3_executor._max_workers == 2
+        await audit_service.aclose()
+        assert audit_service._s3_executor is None
+
+    async def test_users_without_pending_entries_are_skipped(self, audit_service, repo, s3_client):
+        await repo.create_entry("conv_12345", "wang@rinnai.com.tw", MessageRole.USER, "你好")
+        await repo.clear_uploaded_logs(["wang@rinnai.com.tw"])
+
+        result = await audit_service.upload_all_users_audit_logs()
+
+        assert result["total_files"] == 0
+        assert s3_client.uploaded == []
+
+
+class TestKmsUpload:
+    async def test_kms_key_switches_to_gzip_with_sse_kms(self, audit_service, s3_client):
+        audit_service.config.s3.kms_key_id = "alias/audit-logs"
+        calls = []
+        s3_client.client.upload_file.side_effect = (
+            lambda path, bucket, key, ExtraArgs=None, Config=None: calls.append((path, key, ExtraArgs, Config))
+        )
+        await audit_service.log_user_message("conv_12345", "wang@rinnai.com.tw", "你好")
+
+        result = await audit_service.upload_user_audit_logs("wang@rinnai.com.tw")
+
+        assert result["success"] is True
+        ((path, key, extra_args, config),) = calls
+        assert path.endswith(".jsonl.gz") and key.endswith(".jsonl.gz")
+        assert extra_args["ServerSideEncryption"] == "aws:kms"
+        assert extra_args["SSEKMSKeyId"] == "alias/audit-logs"
+        assert config.multipart_threshold == 8 * 1024 * 1024
+        assert os.listdir("./local_audit_logs") == []
+
+
+class TestListAuditFiles:
+    async def test_listing_is_cached_until_upload(self, audit_service, s3_client):
+        s3_client.list_objects = AsyncMock(return_value=[])
+
+        await audit_service.list_audit_files(user_mail="wang@rinnai.com.tw")
+        await audit_service.list_audit_files(user_mail="wang@rinnai.com.tw")
+        assert s3_client.list_objects.await_count == 2  # 兩個前綴各查一次
+
+        await audit_service.log_user_message("conv_12345", "wang@rinnai.com.tw", "你好")
+        await audit_service.upload_user_audit_logs("wang@rinnai.com.tw")
+        await audit_service.list_audit_files(user_mail="wang@rinnai.com.tw")
+        assert s3_client.list_objects.await_count == 3  # 僅使用者前綴重新查詢
+
+    async def test_cached_prefixes_are_bounded(self, audit_service, s3_client, monkeypatch):
+        s3_client.list_objects = AsyncMock(return_value=[])
+        monkeypatch.setattr(audit_service._list_cache, "maxsize", 3)
+
+        for day in range(1, 6):
+            await audit_service._list_objects_cached(f"trgpt/wang@rinnai.com.tw/2026-01-0{day}/")
+
+        assert len(audit_service._list_cache) == 3
+
+    async def test_download_urls_are_attached_per_file(self, audit_service, s3_client):
+        s3_client.list_objects = AsyncMock(return_value=[
+            {"key": "trgpt/wang@rinnai.com.tw/2026-01-01/a.json.zip", "last_modified": "2026-01-01"},
+            {"key": "trgpt/wang@rinnai.com.tw/2026-01-02/b.json.zip", "last_modified": "2026-01-02"},
+        ])
+
+        async def _presign(key, expiration):
+            if key.endswith("a.json.zip"):
+                raise RuntimeError("presign failed")
+            return f"https://example.com/{key}"
+
+        s3_client.generate_presigned_url = AsyncMock(side_effect=_presign)
+
+        files = await audit_service.list_audit_files(user_mail="wang@rinnai.com.tw", include_download_url=True)
+
+        urls = {f["filename"]: f["presigned_download_url"] for f in files}
+        assert urls == {
+            "a.json.zip": None,
+            "b.json.zip": "https://example.com/trgpt/wang@rinnai.com.tw/2026-01-02/b.json.zip",
+        }
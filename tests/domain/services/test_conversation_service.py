@@ -0,0 +1,181 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from domain.models.audit import MessageRole
+from domain.repositories.conversation_repository import InMemoryConversationRepository
+from domain.services.conversation_service import ConversationService
+from shared.exceptions import OpenAIServiceError
+
+
+@pytest.fixture
+def repo():
+    return InMemoryConversationRepository()
+
+
+@pytest.fixture
+def audit_service():
+    service = MagicMock()
+    service.log_user_message = AsyncMock()
+    service.log_assistant_message = AsyncMock()
+    service.log_system_action = AsyncMock()
+    return service
+
+
+@pytest.fixture
+def openai_client():
+    client = MagicMock()
+    client.chat_completion = AsyncMock(return_value="請重新開機試試看")
+    return client
+
+
+@pytest.fixture
+def service(repo, audit_service, openai_client):
+    config = MagicMock()
+    config.openai.model = "gpt-4o"
+    config.openai.context_window = 128000
+    return ConversationService(config, repo, audit_service, openai_client)
+
+
+class TestGetAiResponse:
+    async def test_reads_once_and_writes_turn_in_one_batch(self, service, repo, audit_service, openai_client):
+        repo.get_by_id = AsyncMock(wraps=repo.get_by_id)
+        reads_before_write = []
+        add_messages = repo.add_messages
+
+        async def _add_messages(conversation_id, messages):
+            reads_before_write.append(repo.get_by_id.await_count)
+            return await add_messages(conversation_id, messages)
+
+        repo.add_messages = _add_messages
+
+        response = await service.get_ai_response("conv_12345", "wang@rinnai.com.tw", "印表機卡紙")
+
+        assert response == "請重新開機試試看"
+        assert reads_before_write == [1]
+        conversation = await repo.get_by_id("conv_12345")
+        assert [m.role for m in conversation.messages] == [MessageRole.USER, MessageRole.ASSISTANT]
+
+        context = openai_client.chat_completion.await_args.kwargs["messages"]
+        assert context[0]["role"] == "system"
+        assert context[-1] == {"role": "user", "content": "印表機卡紙"}
+        audit_service.log_user_message.assert_awaited_once()
+        audit_service.log_assistant_message.assert_awaited_once()
+
+    async def test_context_keeps_recent_history(self, service, repo, openai_client):
+        for i in range(12):
+            await service.get_ai_response("conv_12345", "wang@rinnai.com.tw", f"問題{i}")
+
+        context = openai_client.chat_completion.await_args.kwargs["messages"]
+        assert len(context) == 10
+        assert context[-1]["content"] == "問題11"
+
+    async def test_user_message_is_kept_when_ai_call_fails(self, service, repo, audit_service, openai_client):
+        openai_client.chat_completion.side_effect = RuntimeError("timeout")
+
+        with pytest.raises(OpenAIServiceError):
+            await service.get_ai_response("conv_12345", "wang@rinnai.com.tw", "印表機卡紙")
+
+        conversation = await repo.get_by_id("conv_12345")
+        assert [m.content for m in conversation.messages] == ["印表機卡紙"]
+        audit_service.log_user_message.assert_awaited_once()
+        audit_service.log_assistant_message.assert_not_awaited()
+
+    async def test_identical_request_uses_cached_response(self, service, openai_client):
+        await service.get_ai_response("conv_00001", "wang@rinnai.com.tw", "如何設定 VPN")
+        response = await service.get_ai_response("conv_00002", "lee@rinnai.com.tw", "如何設定 VPN")
+
+        assert response == "請重新開機試試看"
+        assert openai_client.chat_completion.await_count == 1
+
+    async def test_blank_input_skips_model_and_history(self, service, repo, openai_client):
+        assert await service.get_ai_response("conv_12345", "wang@rinnai.com.tw", "   ") == ""
+        openai_client.chat_completion.assert_not_awaited()
+        assert await repo.get_by_id("conv_12345") is None
+
+    async def test_over_length_input_is_truncated(self, repo, audit_service, openai_client):
+        config = MagicMock()
+        config.openai.model = "gpt-4o"
+        config.openai.context_window = 100
+        service = ConversationService(config, repo, audit_service, openai_client)
+
+        await service.get_ai_response("conv_12345", "wang@rinnai.com.tw", "字" * 500)
+
+        context = openai_client.chat_completion.await_args.kwargs["messages"]
+        assert context[-1]["content"] == "字" * 80
+
+
+class TestStreamAiResponse:
+    async def test_chunks_are_yielded_and_turn_is_written_after_stream(self, service, repo, openai_client):
+        async def _stream(**kwargs):
+            for chunk in ["請重新", "開機"]:
+                yield chunk
+
+        openai_client.chat_completion_stream = MagicMock(side_effect=_stream)
+
+        chunks = [c async for c in service.stream_ai_response("conv_12345", "wang@rinnai.com.tw", "印表機卡紙")]
+        await service.wait_pending_writes()
+
+        assert chunks == ["請重新", "開機"]
+        conversation = await repo.get_by_id("conv_12345")
+        assert [m.content for m in conversation.messages] == ["印表機卡紙", "請重新開機"]
+
+    async def test_stream_failure_keeps_user_message(self, service, repo, openai_client):
+        async def _stream(**kwargs):
+            yield "請"
+            raise RuntimeError("connection reset")
+
+        openai_client.chat_completion_stream = MagicMock(side_effect=_stream)
+
+        with pytest.raises(OpenAIServiceError):
+            async for _ in service.stream_ai_response("conv_12345", "wang@rinnai.com.tw", "印表機卡紙"):
+                pass
+
+        conversation = await repo.get_by_id("conv_12345")
+        assert [m.content for m in conversation.messages] == ["印表機卡紙"]
+
+
+class TestAddMessages:
+    async def test_user_message_is_stored_and_audited(self, service, repo, audit_service):
+        message = await service.add_user_message("conv_12345", "wang@rinnai.com.tw", "VPN 連不上")
+
+        conversation = await repo.get_by_id("conv_12345")
+        assert conversation.messages == [message]
+        audit_service.log_user_message.assert_awaited_once_with(
+            conversation_id="conv_12345",
+            user_mail="wang@rinnai.com.tw",
+            content="VPN 連不上",
+            metadata=None,
+        )
+
+
+class TestConversationContext:
+    async def test_context_reads_only_recent_messages(self, service, repo):
+        for i in range(5):
+            await service.add_user_message("conv_12345", "wang@rinnai.com.tw", f"問題{i}")
+        repo.get_recent_messages = AsyncMock(wraps=repo.get_recent_messages)
+
+        context = await service.get_conversation_context("conv_12345", "wang@rinnai.com.tw", max_messages=2)
+
+        repo.get_recent_messages.assert_awaited_once_with("conv_12345", 2)
+        assert [c["content"] for c in context] == ["問題3", "問題4"]
+
+    async def test_old_messages_over_budget_are_summarized(self, service, repo):
+        service.config.openai.context_window = 100  # 預算 80 tokens
+        await service.add_user_message("conv_12345", "wang@rinnai.com.tw", "印表機卡紙。" + "細節" * 60)
+        await service.add_assistant_message("conv_12345", "wang@rinnai.com.tw", "請重新開機")
+        await service.add_user_message("conv_12345", "wang@rinnai.com.tw", "還是不行")
+
+        context = await service.get_conversation_context("conv_12345", "wang@rinnai.com.tw")
+
+        assert [c["content"] for c in context[1:]] == ["請重新開機", "還是不行"]
+        assert context[0]["role"] == "system"
+        assert "user: 印表機卡紙。" in context[0]["content"]
+        assert "細節" not in context[0]["content"]
+
+    async def test_explicit_timestamp_is_used(self, service):
+        from shared.utils.helpers import get_taiwan_time
+
+        now = get_taiwan_time()
+        user = await service.add_user_message("conv_12345", "wang@rinnai.com.tw", "你好", timestamp=now)
+        reply = await service.add_assistant_message("conv_12345", "wang@rinnai.com.tw", "您好", timestamp=now)
+        assert user.timestamp is now and reply.timestamp is now
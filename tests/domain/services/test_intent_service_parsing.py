@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 from domain.services.intent_service import IntentService, IntentResult
 
 
@@ -26,6 +26,12 @@ class TestIntentResponseParsing:
         result = intent_service._parse_intent_response(raw)
         assert result.category == "meeting"
 
+    def test_parse_json_embedded_in_text(self, intent_service):
+        raw = '判斷結果如下：{"is_existing_feature": true, "category": "todo", "action": "query", "content": "", "confidence": 0.8} 以上'
+        result = intent_service._parse_intent_response(raw)
+        assert result.category == "todo"
+        assert result.action == "query"
+
     def test_parse_empty_response(self, intent_service):
         result = intent_service._parse_intent_response("")
         assert result.is_existing_feature is False
@@ -46,6 +52,7 @@ class TestIntentResponseParsing:
         normalized = intent_service._normalize_intent_result(result)
         assert normalized.is_existing_feature is False
         assert normalized.confidence == 0.0
+        assert normalized.reason == "不支援的類別: weather"
 
     def test_normalize_azure_blocks_model_category(self, intent_service):
         intent_service.config.openai.use_azure = True
@@ -81,3 +88,71 @@ class TestIntentResponseParsing:
         )
         normalized = intent_service._normalize_intent_result(result)
         assert normalized.confidence == 1.0
+
+
+class TestIntentCache:
+    async def test_same_message_is_analyzed_once(self, intent_service):
+        intent_service.openai_client.chat_completion = AsyncMock(
+            return_value='{"is_existing_feature": true, "category": "todo", "action": "query", "content": "", "confidence": 0.9}'
+        )
+
+        first = await intent_service.analyze_intent("查詢待辦")
+        second = await intent_service.analyze_intent("  查詢待辦 ")
+
+        assert intent_service.openai_client.chat_completion.await_count == 1
+        assert second == first and second is not first
+
+    async def test_case_differences_are_not_shared(self, intent_service):
+        intent_service.openai_client.chat_completion = AsyncMock(side_effect=[
+            '{"is_existing_feature": true, "category": "todo", "action": "add", "content": "Call John 3PM", "confidence": 0.9}',
+            '{"is_existing_feature": true, "category": "todo", "action": "add", "content": "call john 3pm", "confidence": 0.9}',
+        ])
+
+        first = await intent_service.analyze_intent("新增待辦 Call John 3PM")
+        second = await intent_service.analyze_intent("新增待辦 call john 3pm")
+
+        assert intent_service.openai_client.chat_completion.await_count == 2
+        assert first.content == "Call John 3PM"
+        assert second.content == "call john 3pm"
+
+    async def test_model_change_bypasses_cache(self, intent_service):
+        intent_service.openai_client.chat_completion = AsyncMock(
+            return_value='{"is_existing_feature": true, "category": "todo", "action": "query", "content": "", "confidence": 0.9}'
+        )
+
+        await intent_service.analyze_intent("查詢待辦")
+        intent_service.config.openai.intent_model = "gpt-4o"
+        await intent_service.analyze_intent("查詢待辦")
+
+        assert intent_service.openai_client.chat_completion.await_count == 2
+        assert intent_service.openai_client.chat_completion.await_args.kwargs["model"] == "gpt-4o"
+
+    async def test_unparseable_response_is_not_cached(self, intent_service):
+        intent_service.openai_client.chat_completion = AsyncMock(return_value="這完全不是JSON")
+
+        await intent_service.analyze_intent("查詢待辦")
+        await intent_service.analyze_intent("查詢待辦")
+
+        assert intent_service.openai_client.chat_completion.await_count == 2
+
+
+class TestIntentCallPlan:
+    async def test_o1_model_merges_system_prompt_into_user_message(self, intent_service):
+        intent_service.config.openai.intent_model = "o1-mini"
+        intent_service.openai_client.chat_completion = AsyncMock(return_value="")
+
+        await intent_service.analyze_intent("查詢待辦")
+
+        kwargs = intent_service.openai_client.chat_completion.await_args.kwargs
+        assert [m["role"] for m in kwargs["messages"]] == ["user"]
+        assert kwargs["messages"][0]["content"].endswith("用戶輸入: 查詢待辦")
+        assert kwargs["temperature"] is None
+
+    async def test_standard_model_keeps_system_role(self, intent_service):
+        intent_service.openai_client.chat_completion = AsyncMock(return_value="")
+
+        await intent_service.analyze_intent("查詢待辦")
+
+        kwargs = intent_service.openai_client.chat_completion.await_args.kwargs
+        assert [m["role"] for m in kwargs["messages"]] == ["system", "user"]
+        assert kwargs["temperature"] == 0.1
@@ -0,0 +1,183 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import timedelta
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from domain.services import meeting_service as meeting_service_module
+from domain.services.meeting_service import MeetingService, _parse_booking_datetime, invalidate_rooms_cache
+from infrastructure.external.graph_api_client import GraphAPIClient
+from shared.utils.helpers import get_taiwan_time
+
+
+def _room_event(event_id, start):
+    return {
+        "id": event_id,
+        "subject": "週會",
+        "start": {"dateTime": start.strftime("%Y-%m-%dT%H:%M:%S")},
+        "end": {"dateTime": (start + timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M:%S")},
+        "organizer": {"emailAddress": {"address": "wang@rinnai.com.tw"}},
+        "attendees": [{"emailAddress": {"address": "MeetingRoom01@rinnai.com.tw"}}],
+    }
+
+
+@pytest.fixture(autouse=True)
+def _fresh_rooms_cache():
+    invalidate_rooms_cache()
+    yield
+    invalidate_rooms_cache()
+
+
+@pytest.fixture
+def graph_client():
+    client = GraphAPIClient(config=MagicMock(), token_manager=MagicMock())
+    client._make_request = AsyncMock()
+    return client
+
+
+@pytest.fixture
+def meeting_service(graph_client):
+    return MeetingService(config=MagicMock(), user_repository=MagicMock(), graph_client=graph_client)
+
+
+class TestGraphConcurrency:
+    async def test_in_flight_requests_are_capped(self):
+        config = MagicMock()
+        config.graph_api.max_concurrency = 2
+        token_manager = MagicMock()
+        token_manager.get_access_token = AsyncMock(return_value="token")
+        client = GraphAPIClient(config=config, token_manager=token_manager)
+
+        in_flight, peak = 0, 0
+
+        @asynccontextmanager
+        async def _request(*args, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            response = MagicMock(status=200)
+            response.text = AsyncMock(return_value="{}")
+            try:
+                yield response
+            finally:
+                in_flight -= 1
+
+        client.session = MagicMock(closed=False)
+        client.session.request = _request
+
+        await asyncio.gather(*(client.get_user_info(f"user{i}@rinnai.com.tw") for i in range(6)))
+
+        assert peak == 2
+
+
+class TestGetUserMeetings:
+    async def test_calendar_view_is_paged_with_top(self, meeting_service, graph_client):
+        graph_client._make_request.return_value = {"value": []}
+
+        await meeting_service.get_user_meetings("wang@rinnai.com.tw")
+
+        assert graph_client._make_request.await_args.kwargs["params"]["$top"] == 50
+
+    async def test_calendar_view_follows_next_link(self, meeting_service, graph_client):
+        start = get_taiwan_time().replace(tzinfo=None) + timedelta(days=1)
+        next_link = "https://graph.microsoft.com/v1.0/users/wang@rinnai.com.tw/calendarView?$skiptoken=abc"
+        graph_client._make_request.side_effect = [
+            {"value": [_room_event("ev1", start)], "@odata.nextLink": next_link},
+            {"value": [_room_event("ev2", start + timedelta(hours=2))]},
+        ]
+
+        meetings = await meeting_service.get_user_meetings("wang@rinnai.com.tw")
+
+        assert [m["id"] for m in meetings] == ["ev1", "ev2"]
+        second_call = graph_client._make_request.await_args_list[1]
+        assert second_call.args[1] == "/users/wang@rinnai.com.tw/calendarView?$skiptoken=abc"
+        assert second_call.kwargs["params"] is None
+
+    async def test_events_without_room_or_address_are_handled(self, meeting_service, graph_client):
+        start = get_taiwan_time().replace(tzinfo=None) + timedelta(days=1)
+        no_room = _room_event("ev2", start)
+        no_room["attendees"] = [{"emailAddress": {"address": None}}, {"emailAddress": {}}]
+        two_rooms = _room_event("ev3", start)
+        two_rooms["attendees"] = [
+            {"emailAddress": {"address": None}},
+            {"emailAddress": {"address": "meetingroom02@rinnai.com.tw"}},
+            {"emailAddress": {"address": "meetingroom01@rinnai.com.tw"}},
+        ]
+        graph_client._make_request.return_value = {"value": [no_room, two_rooms]}
+
+        meetings = await meeting_service.get_user_meetings("wang@rinnai.com.tw")
+
+        assert [(m["id"], m["location"]) for m in meetings] == [("ev3", "第二會議室")]
+        assert meetings[0]["is_organizer"] is True
+
+
+class TestRoomsCache:
+    async def test_room_list_is_read_once_until_invalidated(self, meeting_service, monkeypatch):
+        calls = []
+
+        def _rooms():
+            calls.append(1)
+            return [{"displayName": "第一會議室", "emailAddress": "meetingroom01@rinnai.com.tw"}]
+
+        monkeypatch.setattr(meeting_service_module, "cfg_get_meeting_rooms", _rooms)
+
+        await meeting_service.get_meeting_rooms()
+        rooms = await meeting_service.get_meeting_rooms()
+        assert len(calls) == 1
+        rooms.clear()
+        assert len(await meeting_service.get_meeting_rooms()) == 1
+
+        invalidate_rooms_cache()
+        await meeting_service.get_meeting_rooms()
+        assert len(calls) == 2
+
+
+class TestParseBookingDatetime:
+    def test_fixed_width_and_fallback_formats(self):
+        parsed = _parse_booking_datetime("2026-03-05", "09:30")
+        assert (parsed.year, parsed.month, parsed.day, parsed.hour, parsed.minute) == (2026, 3, 5, 9, 30)
+        assert parsed.utcoffset() == timedelta(hours=8)
+        assert _parse_booking_datetime("2026-3-5", "9:30") == parsed
+
+    @pytest.mark.parametrize("date_str,time_str", [("2026-02-30", "09:00"), ("2026/03/05", "09:00"), ("2026-03-05", "25:00")])
+    def test_invalid_input_raises_value_error(self, date_str, time_str):
+        with pytest.raises(ValueError):
+            _parse_booking_datetime(date_str, time_str)
+
+
+class TestUserMeetingsCache:
+    async def test_repeat_calls_hit_cache_until_cancel(self, meeting_service, graph_client):
+        start = get_taiwan_time().replace(tzinfo=None) + timedelta(days=1)
+        graph_client._make_request.return_value = {"value": [_room_event("ev1", start)]}
+
+        first = await meeting_service.get_user_meetings("Wang@rinnai.com.tw")
+        first[0]["subject"] = "被呼叫端改掉"
+        second = await meeting_service.get_user_meetings("wang@rinnai.com.tw")
+        assert graph_client._make_request.await_count == 1
+        assert second[0]["subject"] == "週會"
+
+        graph_client._make_request.return_value = {"organizer": {"emailAddress": {"address": "wang@rinnai.com.tw"}}}
+        assert (await meeting_service.cancel_meeting("wang@rinnai.com.tw", "ev1"))["success"] is True
+
+        graph_client._make_request.return_value = {"value": []}
+        assert await meeting_service.get_user_meetings("wang@rinnai.com.tw") == []
+
+    async def test_failures_are_not_cached(self, meeting_service, graph_client):
+        graph_client._make_request.side_effect = [RuntimeError("boom"), {"value": []}]
+
+        assert await meeting_service.get_user_meetings("wang@rinnai.com.tw") == []
+        assert await meeting_service.get_user_meetings("wang@rinnai.com.tw") == []
+        assert graph_client._make_request.await_count == 2
+
+    async def test_invalidation_drops_only_that_users_entries(self, meeting_service, graph_client):
+        graph_client._make_request.return_value = {"value": []}
+        await meeting_service.get_user_meetings("wang@rinnai.com.tw", days_ahead=7)
+        await meeting_service.get_user_meetings("wang@rinnai.com.tw", days_ahead=14)
+        await meeting_service.get_user_meetings("lee@rinnai.com.tw")
+
+        meeting_service._invalidate_user_meetings("Wang@rinnai.com.tw")
+
+        assert len(meeting_service._meetings_cache) == 1
+        assert meeting_service._meetings_cache.get(("lee@rinnai.com.tw", 7)) == []
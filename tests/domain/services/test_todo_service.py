@@ -0,0 +1,117 @@
+from datetime import timedelta
+from unittest.mock import MagicMock
+
+from domain.models.todo import TodoStatus
+from domain.repositories.todo_repository import InMemoryTodoRepository
+from domain.services.todo_service import TodoService, TodoSimilarityAnalyzer
+
+
+class TestExtractFeatures:
+    def test_keywords_persons_and_words(self):
+        features = TodoSimilarityAnalyzer.extract_features("明天下午 跟 Amy 開會議 討論預算")
+
+        assert features["time_mentioned"] is True
+        assert features["actions"] == ["討論", "開會", "會議"]
+        assert "Amy" in features["persons"]
+        assert features["content_words"] == {"明天下午", "跟", "amy", "開會議", "討論預算"}
+
+    def test_no_time_keyword(self):
+        assert TodoSimilarityAnalyzer.extract_features("買牛奶")["time_mentioned"] is False
+
+
+class TestCheckSimilarTodos:
+    async def test_features_extracted_once_per_content(self, monkeypatch):
+        repo = InMemoryTodoRepository()
+        service = TodoService(config=MagicMock(), todo_repository=repo)
+        await repo.create("wang@rinnai.com.tw", "明天下午 跟 Amy 開會 討論預算")
+        await repo.create("wang@rinnai.com.tw", "買牛奶")
+
+        calls = []
+        extract = TodoSimilarityAnalyzer.extract_features
+        monkeypatch.setattr(
+            TodoSimilarityAnalyzer, "extract_features",
+            staticmethod(lambda content: calls.append(content) or extract(content)),
+        )
+
+        similar = await service.check_similar_todos("wang@rinnai.com.tw", "明天下午 跟 Amy 開會 討論預算")
+        await service.check_similar_todos("wang@rinnai.com.tw", "後天 跟 Amy 開會")
+
+        assert [s["todo"].content for s in similar] == ["明天下午 跟 Amy 開會 討論預算"]
+        assert len(calls) == 4  # 兩次查詢內容 + 兩筆既有待辦各一次
+
+    def test_prepared_matches_wrapper(self):
+        a, b = "明天 跟 Amy 開會", "後天 跟 Amy 開會"
+        assert TodoSimilarityAnalyzer.calculate_similarity(a, b) == TodoSimilarityAnalyzer.calculate_similarity_prepared(
+            TodoSimilarityAnalyzer.extract_features(a), TodoSimilarityAnalyzer.extract_features(b)
+        )
+
+
+class TestBatchComplete:
+    async def test_completes_selected_indices_in_one_repository_call(self):
+        repo = InMemoryTodoRepository()
+        service = TodoService(config=MagicMock(), todo_repository=repo)
+        for content in ["買牛奶", "寄信", "繳費"]:
+            await repo.create("wang@rinnai.com.tw", content)
+        await repo.create("lee@rinnai.com.tw", "別人的待辦")
+        repo.mark_completed = MagicMock(side_effect=AssertionError("should use bulk"))
+
+        completed = await service.batch_complete_todos([2, 0, 0, 9], "wang@rinnai.com.tw")
+
+        assert [t.content for t in completed] == ["繳費", "買牛奶"]
+        assert [t.content for t in await repo.get_pending_by_user("wang@rinnai.com.tw")] == ["寄信"]
+        assert completed[0].completed_at.tzinfo is not None
+
+    async def test_bulk_skips_other_users_todos(self):
+        repo = InMemoryTodoRepository()
+        todo = await repo.create("lee@rinnai.com.tw", "別人的待辦")
+        assert await repo.batch_mark_completed([todo.id], "wang@rinnai.com.tw") == []
+        assert todo.is_pending
+
+
+class TestSearchTodos:
+    async def test_filters_are_combined(self):
+        repo = InMemoryTodoRepository()
+        service = TodoService(config=MagicMock(), todo_repository=repo)
+        milk = await repo.create("wang@rinnai.com.tw", "買 Milk")
+        await repo.create("wang@rinnai.com.tw", "買麵包")
+        done = await repo.create("wang@rinnai.com.tw", "milk 已買")
+        await repo.batch_mark_completed([done.id], "wang@rinnai.com.tw")
+
+        assert await service.search_todos("wang@rinnai.com.tw", keyword="MILK") == [milk, done]
+        assert await service.search_todos("wang@rinnai.com.tw", keyword="milk", status=TodoStatus.PENDING) == [milk]
+        assert await service.search_todos("wang@rinnai.com.tw", date_from=milk.created_at + timedelta(days=1)) == []
+
+
+class TestUserStats:
+    async def test_stats_come_from_one_aggregate_call(self):
+        repo = InMemoryTodoRepository()
+        service = TodoService(config=MagicMock(), todo_repository=repo)
+        first = await repo.create("wang@rinnai.com.tw", "買牛奶")
+        await repo.create("wang@rinnai.com.tw", "寄信")
+        await repo.mark_completed(first.id)
+        repo.get_by_user = MagicMock(side_effect=AssertionError("should not list todos"))
+
+        stats = await service.get_user_stats("wang@rinnai.com.tw")
+
+        assert {k: stats[k] for k in ("total", "pending", "completed", "cancelled", "recent_week_count")} == {
+            "total": 2, "pending": 1, "completed": 1, "cancelled": 0, "recent_week_count": 2,
+        }
+        assert stats["average_completion_hours"] >= 0
+
+    async def test_empty_user_has_only_counts(self):
+        service = TodoService(config=MagicMock(), todo_repository=InMemoryTodoRepository())
+        assert await service.get_user_stats("wang@rinnai.com.tw") == {
+            "total": 0, "pending": 0, "completed": 0, "cancelled": 0,
+        }
+
+
+class TestReminders:
+    async def test_pending_todos_grouped_by_user(self):
+        repo = InMemoryTodoRepository()
+        service = TodoService(config=MagicMock(), todo_repository=repo)
+        milk = await repo.create("wang@rinnai.com.tw", "買牛奶")
+        mail = await repo.create("wang@rinnai.com.tw", "寄信")
+        done = await repo.create("lee@rinnai.com.tw", "繳費")
+        await repo.mark_completed(done.id)
+
+        assert await service.get_todos_for_reminder() == {"wang@rinnai.com.tw": [milk, mail]}
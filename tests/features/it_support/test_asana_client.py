@@ -0,0 +1,198 @@
+import io
+
+import httpx
+import pytest
+
+from features.it_support.asana_client import AsanaClient
+
+
+def _mock_client(handler):
+    client = AsanaClient(token="test-token")
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+class TestConnectionReuse:
+    async def test_calls_share_one_http_client(self):
+        seen = []
+
+        def handler(request):
+            seen.append((request.method, request.url.path, request.headers.get("authorization")))
+            return httpx.Response(200, json={"data": {"gid": "1"}})
+
+        client = _mock_client(handler)
+        shared = client._client
+
+        await client.create_task({"data": {"name": "印表機卡紙"}})
+        await client.get_task("1")
+
+        assert client._get_client() is shared
+        assert [s[:2] for s in seen] == [("POST", "/api/1.0/tasks"), ("GET", "/api/1.0/tasks/1")]
+        assert all(s[2] == "Bearer test-token" for s in seen)
+        await client.aclose()
+        assert client._client is None
+
+    async def test_attachment_download_sends_no_token(self):
+        seen = []
+
+        def handler(request):
+            seen.append(request.headers.get("authorization"))
+            return httpx.Response(200, content=b"file")
+
+        client = _mock_client(handler)
+        assert await client.download_attachment("https://files.example.com/a.png") == b"file"
+        assert seen == [None]
+        await client.aclose()
+
+
+class TestUploadAttachment:
+    async def test_file_object_is_streamed_as_multipart(self):
+        bodies = []
+
+        def handler(request):
+            bodies.append(request.read())
+            return httpx.Response(200, json={"data": {"gid": "att1"}})
+
+        client = _mock_client(handler)
+        result = await client.upload_attachment("1", "log.txt", io.BytesIO(b"x" * 100_000), "text/plain")
+
+        assert result == {"data": {"gid": "att1"}}
+        assert b"x" * 100_000 in bodies[0] and b'name="parent"' in bodies[0]
+        await client.aclose()
+
+
+class TestHeaders:
+    def test_headers_are_built_once(self):
+        client = AsanaClient(token="test-token")
+        assert client._headers() is client._headers()
+        assert client._auth_headers == {"Authorization": "Bearer test-token"}
+
+    async def test_missing_token_is_rejected(self, monkeypatch):
+        monkeypatch.delenv("ASANA_ACCESS_TOKEN", raising=False)
+        client = AsanaClient()
+        with pytest.raises(ValueError):
+            client._headers()
+        with pytest.raises(ValueError):
+            await client.upload_attachment("1", "log.txt", b"x", "text/plain")
+
+
+class TestJsonBody:
+    async def test_create_task_sends_utf8_json_body(self):
+        bodies = []
+
+        def handler(request):
+            bodies.append((request.headers.get("content-type"), request.read()))
+            return httpx.Response(200, json={"data": {"gid": "1", "name": "印表機卡紙"}})
+
+        client = _mock_client(handler)
+        result = await client.create_task({"data": {"name": "印表機卡紙"}})
+
+        assert result == {"data": {"gid": "1", "name": "印表機卡紙"}}
+        content_type, body = bodies[0]
+        assert content_type == "application/json"
+        assert "印表機卡紙".encode("utf-8") in body
+        await client.aclose()
+
+
+class TestCreateTaskRetry:
+    async def test_rate_limited_request_is_retried_after_retry_after(self, monkeypatch):
+        delays = []
+
+        async def fake_sleep(seconds):
+            delays.append(seconds)
+
+        monkeypatch.setattr("features.it_support.asana_client.asyncio.sleep", fake_sleep)
+        responses = iter([
+            httpx.Response(429, headers={"Retry-After": "2"}),
+            httpx.Response(503, headers={"Retry-After": "1"}),
+            httpx.Response(201, json={"data": {"gid": "1"}}),
+        ])
+        client = _mock_client(lambda request: next(responses))
+
+        assert await client.create_task({"data": {"name": "印表機卡紙"}}) == {"data": {"gid": "1"}}
+        assert len(delays) == 2
+        assert 2.0 <= delays[0] <= 2.5
+        assert 1.0 <= delays[1] <= 2.0
+        await client.aclose()
+
+    async def test_gives_up_after_max_attempts(self, monkeypatch):
+        async def fake_sleep(seconds):
+            pass
+
+        monkeypatch.setattr("features.it_support.asana_client.asyncio.sleep", fake_sleep)
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(429, json={"errors": [{"message": "rate limited"}]})
+
+        client = _mock_client(handler)
+        with pytest.raises(httpx.HTTPStatusError, match="429"):
+            await client.create_task({"data": {"name": "印表機卡紙"}})
+        assert len(calls) == 3
+        await client.aclose()
+
+    @pytest.mark.parametrize("response", [
+        httpx.Response(500),
+        httpx.Response(502),
+        httpx.Response(504),
+        httpx.Response(503),
+    ], ids=["500", "502", "504", "503-without-retry-after"])
+    async def test_possibly_processed_request_is_not_retried(self, response):
+        # 這些狀態下 Asana 可能已建立任務，重送 POST 會重複建單
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return response
+
+        client = _mock_client(handler)
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.create_task({"data": {"name": "印表機卡紙"}})
+        assert len(calls) == 1
+        await client.aclose()
+
+
+class TestCreateTaskCompression:
+    async def test_large_body_is_gzipped_when_enabled(self):
+        import gzip
+        import json
+
+        seen = []
+
+        def handler(request):
+            seen.append((request.headers.get("content-encoding"), request.read()))
+            return httpx.Response(201, json={"data": {"gid": "1"}})
+
+        client = _mock_client(handler)
+        client.compress_requests = True
+        payload = {"data": {"name": "印表機卡紙", "notes": "卡紙" * 1000}}
+
+        await client.create_task({"data": {"name": "短"}})
+        await client.create_task(payload)
+
+        assert seen[0][0] is None
+        encoding, body = seen[1]
+        assert encoding == "gzip"
+        assert json.loads(gzip.decompress(body)) == payload
+        await client.aclose()
+
+    def test_disabled_by_default(self, monkeypatch):
+        monkeypatch.delenv("ASANA_GZIP_REQUESTS", raising=False)
+        assert AsanaClient(token="test-token").compress_requests is False
+
+
+class TestCreateTaskOptFields:
+    async def test_opt_fields_limit_response(self):
+        seen = []
+
+        def handler(request):
+            seen.append(dict(request.url.params))
+            return httpx.Response(201, json={"data": {"gid": "1", "permalink_url": "https://app.asana.com/0/1"}})
+
+        client = _mock_client(handler)
+        await client.create_task({"data": {"name": "印表機卡紙"}}, opt_fields="gid,permalink_url")
+        await client.create_task({"data": {"name": "印表機卡紙"}})
+
+        assert seen == [{"opt_fields": "gid,permalink_url"}, {}]
+        await client.aclose()
@@ -0,0 +1,33 @@
+from features.it_support.cards import (
+    _IT_ISSUE_CARD_SKELETONS,
+    build_it_issue_card,
+    build_itt_issue_card,
+)
+
+
+def _content(activity):
+    return activity.attachments[0].content
+
+
+class TestItIssueCard:
+    def test_reporter_line_is_filled_without_touching_skeleton(self):
+        first = _content(build_it_issue_card("en", [], "Wang", "wang@rinnai.com.tw"))
+        second = _content(build_it_issue_card("en", [], "Lee", "lee@rinnai.com.tw"))
+
+        assert first["body"][-1]["text"] == "Reporter: Wang <wang@rinnai.com.tw>"
+        assert second["body"][-1]["text"] == "Reporter: Lee <lee@rinnai.com.tw>"
+        assert _IT_ISSUE_CARD_SKELETONS["en"]["body"][-1]["text"] == ""
+
+    def test_unknown_language_falls_back_to_zh(self):
+        content = _content(build_it_issue_card("fr", [], "王小明", "wang@rinnai.com.tw"))
+        assert content["body"][0]["text"] == "🛠️ 提交 IT 問題／請求"
+        assert content["body"][-1]["text"] == "提報人: 王小明 <wang@rinnai.com.tw>"
+
+
+class TestIttIssueCard:
+    def test_proxy_card_adds_requester_email_and_submits_itt(self):
+        content = _content(build_itt_issue_card("zh", [], "王小明", "wang@rinnai.com.tw"))
+
+        assert content["body"][1]["id"] == "requesterEmail"
+        assert content["body"][-1]["text"] == "代理提報人: 王小明 <wang@rinnai.com.tw>"
+        assert content["actions"][0]["data"] == {"action": "submitITT"}
@@ -0,0 +1,242 @@
+import smtplib
+from types import SimpleNamespace
+
+import pytest
+
+from features.it_support import email_notifier as email_notifier_module
+from features.it_support.email_notifier import EmailNotifier
+
+
+def _bodies(msg):
+    parts = [p for p in msg.walk() if p.get_content_maintype() == "text"]
+    return {p.get_content_subtype(): p.get_payload(decode=True).decode("utf-8") for p in parts}
+
+
+class TestEmailTemplates:
+    def test_submission_fields_are_escaped_and_braces_kept(self):
+        notifier = EmailNotifier(smtp_user="it@rinnai.com.tw", smtp_password="secret")
+        msg = notifier._build_submission_email(
+            "wang@rinnai.com.tw", "IT202601010001", "VPN {連不上}", "<網路>", "P1", "2026-01-01 09:00",
+            description="第一行\n{第二行}",
+        )
+        bodies = _bodies(msg)
+
+        assert "VPN {連不上}" in bodies["html"]
+        assert "&lt;網路&gt;" in bodies["html"]
+        assert "第一行<br>{第二行}" in bodies["html"]
+        assert "color: #DC2626;" in bodies["html"]
+        assert "  需求摘要：VPN {連不上}\n" in bodies["plain"]
+
+    def test_completion_email_without_optional_sections(self):
+        notifier = EmailNotifier(smtp_user="it@rinnai.com.tw", smtp_password="secret")
+        msg = notifier._build_completion_email("wang@rinnai.com.tw", "IT202601010001", "印表機卡紙")
+        html = _bodies(msg)["html"]
+
+        assert msg["Subject"] == "IT 單 IT202601010001 已處理完成"
+        assert "印表機卡紙" in html and "需要進一步協助" in html
+        assert "您提交的需求內容" not in html
+
+    def test_comments_and_ids_are_escaped(self):
+        notifier = EmailNotifier(smtp_user="it@rinnai.com.tw", smtp_password="secret")
+        msg = notifier._build_completion_email(
+            "wang@rinnai.com.tw", "IT<1>", "印表機卡紙",
+            comments="- 系統 **已結案** <script>alert(1)</script>\n- **王**: <b>好</b>",
+        )
+        html = _bodies(msg)["html"]
+
+        assert "<script>" not in html and "&lt;script&gt;" in html
+        assert "<strong>已結案</strong>" in html
+        assert "&lt;b&gt;好&lt;/b&gt;" in html
+        assert "IT&lt;1&gt;" in html
+
+    def test_inline_images_are_related_to_html_part(self):
+        notifier = EmailNotifier(smtp_user="it@rinnai.com.tw", smtp_password="secret")
+        msg = notifier._build_completion_email(
+            "wang@rinnai.com.tw", "IT202601010001", "印表機卡紙",
+            images=[{"filename": "卡紙.jpg", "data": b"\xff\xd8jpeg", "content_type": "image/jpeg"}],
+        )
+
+        assert [p.get_content_type() for p in msg.walk()] == [
+            "multipart/alternative", "text/plain", "multipart/related", "text/html", "image/jpeg",
+        ]
+        image = list(msg.walk())[-1]
+        assert image["Content-ID"] == "<att_img_0>"
+        assert image.get_filename() == "卡紙.jpg"
+        assert 'src="cid:att_img_0"' in _bodies(msg)["html"]
+
+
+class FakeSMTP:
+    instances = []
+
+    def __init__(self, host, port, timeout=None):
+        self.logins = 0
+        self.sent = []
+        self.alive = True
+        FakeSMTP.instances.append(self)
+
+    def set_debuglevel(self, level):
+        pass
+
+    def ehlo(self):
+        pass
+
+    def starttls(self):
+        pass
+
+    def login(self, user, password):
+        self.logins += 1
+
+    def noop(self):
+        if not self.alive:
+            raise smtplib.SMTPServerDisconnected("connection closed")
+        return 250, b"OK"
+
+    def send_message(self, msg, sender, recipients):
+        self.sent.append(recipients)
+
+    def quit(self):
+        self.alive = False
+
+    def close(self):
+        self.alive = False
+
+
+@pytest.fixture
+def notifier(monkeypatch):
+    FakeSMTP.instances = []
+    monkeypatch.setattr(email_notifier_module.smtplib, "SMTP", FakeSMTP)
+    monkeypatch.setattr(email_notifier_module, "aiosmtplib", None)
+    return EmailNotifier(smtp_user="it@rinnai.com.tw", smtp_password="secret")
+
+
+class TestSmtpConnectionReuse:
+    async def test_consecutive_emails_share_one_login(self, notifier):
+        assert await notifier.send_completion_notification("wang@rinnai.com.tw", "IT1", "印表機卡紙")
+        assert await notifier.send_submission_notification(
+            "lee@rinnai.com.tw", "IT2", "VPN", cc_email="wang@rinnai.com.tw"
+        )
+
+        (server,) = FakeSMTP.instances
+        assert server.logins == 1
+        assert server.sent == [["wang@rinnai.com.tw"], ["lee@rinnai.com.tw", "wang@rinnai.com.tw"]]
+
+        notifier.close()
+        assert not server.alive and notifier._smtp is None
+
+    async def test_dropped_connection_is_replaced(self, notifier):
+        await notifier.send_completion_notification("wang@rinnai.com.tw", "IT1", "印表機卡紙")
+        FakeSMTP.instances[0].alive = False
+
+        assert await notifier.send_completion_notification("wang@rinnai.com.tw", "IT2", "VPN")
+        assert len(FakeSMTP.instances) == 2
+        assert FakeSMTP.instances[1].sent == [["wang@rinnai.com.tw"]]
+
+
+class FakeAsyncSMTP:
+    instances = []
+
+    def __init__(self, hostname, port, timeout=None, start_tls=None):
+        self.logins = 0
+        self.sent = []
+        self.alive = True
+        FakeAsyncSMTP.instances.append(self)
+
+    async def connect(self):
+        pass
+
+    async def login(self, user, password):
+        self.logins += 1
+
+    async def noop(self):
+        if not self.alive:
+            raise smtplib.SMTPServerDisconnected("connection closed")
+        return SimpleNamespace(code=250)
+
+    async def send_message(self, msg, sender=None, recipients=None):
+        self.sent.append(recipients)
+
+    async def quit(self):
+        self.alive = False
+
+    def close(self):
+        self.alive = False
+
+
+@pytest.fixture
+def async_notifier(monkeypatch):
+    FakeAsyncSMTP.instances = []
+    fake_module = SimpleNamespace(
+        SMTP=FakeAsyncSMTP,
+        SMTPException=smtplib.SMTPException,
+        SMTPServerDisconnected=smtplib.SMTPServerDisconnected,
+    )
+    monkeypatch.setattr(email_notifier_module, "aiosmtplib", fake_module)
+    return EmailNotifier(smtp_user="it@rinnai.com.tw", smtp_password="secret")
+
+
+class TestAsyncSmtp:
+    async def test_sends_natively_and_reuses_connection(self, async_notifier):
+        assert await async_notifier.send_completion_notification("wang@rinnai.com.tw", "IT1", "印表機卡紙")
+        assert await async_notifier.send_custom_notification("lee@rinnai.com.tw", "通知", "內容")
+
+        (server,) = FakeAsyncSMTP.instances
+        assert server.logins == 1
+        assert server.sent == [["wang@rinnai.com.tw"], ["lee@rinnai.com.tw"]]
+
+        await async_notifier.aclose()
+        assert not server.alive and async_notifier._smtp_pool == []
+
+    async def test_dropped_connection_is_replaced(self, async_notifier):
+        await async_notifier.send_completion_notification("wang@rinnai.com.tw", "IT1", "印表機卡紙")
+        FakeAsyncSMTP.instances[0].alive = False
+
+        assert await async_notifier.send_completion_notification("wang@rinnai.com.tw", "IT2", "VPN")
+        assert len(FakeAsyncSMTP.instances) == 2
+
+    async def test_concurrent_sends_use_separate_pooled_connections(self, async_notifier):
+        payloads = [
+            {"to_email": f"user{i}@rinnai.com.tw", "issue_id": f"IT{i}", "task_name": "印表機卡紙"}
+            for i in range(8)
+        ]
+
+        assert await async_notifier.send_completion_bulk(payloads) == [True] * 8
+        assert 1 <= len(FakeAsyncSMTP.instances) <= 4
+        assert sum(len(s.sent) for s in FakeAsyncSMTP.instances) == 8
+        assert len(async_notifier._smtp_pool) == len(FakeAsyncSMTP.instances)
+        await async_notifier.aclose()
+
+    async def test_idle_and_exhausted_connections_are_replaced(self, async_notifier, monkeypatch):
+        await async_notifier.send_completion_notification("wang@rinnai.com.tw", "IT1", "印表機卡紙")
+        async_notifier._smtp_pool[0].last_used -= email_notifier_module._SMTP_IDLE_TTL + 1
+
+        await async_notifier.send_completion_notification("wang@rinnai.com.tw", "IT2", "VPN")
+        assert len(FakeAsyncSMTP.instances) == 2 and not FakeAsyncSMTP.instances[0].alive
+
+        monkeypatch.setattr(email_notifier_module, "_SMTP_MAX_MESSAGES_PER_CONN", 2)
+        await async_notifier.send_completion_notification("wang@rinnai.com.tw", "IT3", "VPN")
+        assert not FakeAsyncSMTP.instances[1].alive
+        assert async_notifier._smtp_pool == []
+
+
+class TestSendCompletionBulk:
+    async def test_results_follow_payload_order(self, notifier):
+        payloads = [
+            {"to_email": f"user{i}@rinnai.com.tw", "issue_id": f"IT{i}", "task_name": "印表機卡紙"}
+            for i in range(6)
+        ]
+
+        assert await notifier.send_completion_bulk(payloads) == [True] * 6
+        (server,) = FakeSMTP.instances
+        assert sorted(server.sent) == sorted([[p["to_email"]] for p in payloads])
+
+
+class TestDisabledNotifier:
+    async def test_missing_credentials_skip_all_sends(self, notifier, monkeypatch):
+        monkeypatch.delenv("SMTP_USER", raising=False)
+        monkeypatch.delenv("SMTP_PASSWORD", raising=False)
+        disabled = EmailNotifier()
+
+        assert await disabled.send_completion_notification("wang@rinnai.com.tw", "IT1", "印表機卡紙") is False
+        assert await disabled.send_submission_notification("wang@rinnai.com.tw", "IT1", "印表機卡紙") is False
+        assert await disabled.send_custom_notification("wang@rinnai.com.tw", "通知", "內容") is False
+        assert FakeSMTP.instances == []
@@ -1,3 +1,4 @@
+import os
 import pytest
 from features.it_support.intent_classifier import ITIntentClassifier
 
@@ -74,3 +75,73 @@ class TestITIntentClassifier:
             code = cat["code"]
             label = classifier._label_for(code)
             assert label and isinstance(label, str)
+
+
+class FakeAutomaton:
+    """Naive stand-in for ahocorasick.Automaton (overlapping matches included)."""
+
+    def __init__(self):
+        self.words = {}
+
+    def add_word(self, key, value):
+        self.words[key] = value
+
+    def make_automaton(self):
+        pass
+
+    def iter(self, text):
+        for kw, value in self.words.items():
+            start = text.find(kw)
+            while start != -1:
+                yield start + len(kw) - 1, value
+                start = text.find(kw, start + 1)
+
+
+class TestAutomatonPath:
+    SAMPLES = [
+        "印表機卡紙無法列印",
+        "VPN 連不上 FortiClient",
+        "帳號鎖定無法登入 login login",
+        "Teams error error 軟體安裝失敗",
+        "新進人員報到開通帳號",
+        "今天天氣不錯想去散步",
+    ]
+
+    def test_matches_substring_scoring(self, classifier, monkeypatch):
+        import types
+        from features.it_support import intent_classifier
+
+        monkeypatch.setattr(
+            intent_classifier, "ahocorasick", types.SimpleNamespace(Automaton=FakeAutomaton)
+        )
+        intent_classifier._load_taxonomy.cache_clear()
+        try:
+            fast = ITIntentClassifier()
+        finally:
+            intent_classifier._load_taxonomy.cache_clear()
+        assert fast._automaton is not None
+        for text in self.SAMPLES:
+            assert fast.classify(text) == classifier.classify(text)
+
+
+class TestTaxonomyCache:
+    def _write(self, path, keyword, mtime_ns):
+        path.write_text(
+            '{"categories": [{"code": "printer", "label": "印表機", "keywords": ["%s"]}]}' % keyword,
+            encoding="utf-8",
+        )
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    def test_instances_share_parsed_taxonomy(self):
+        a, b = ITIntentClassifier(), ITIntentClassifier()
+        assert a.categories is b.categories
+
+    def test_reloads_when_file_changes(self, tmp_path):
+        path = tmp_path / "taxonomy.json"
+        self._write(path, "印表機", 1_000_000_000)
+        assert ITIntentClassifier(str(path)).classify("印表機卡紙")[0] == "printer"
+
+        self._write(path, "卡紙", 2_000_000_000)
+        clf = ITIntentClassifier(str(path))
+        assert clf.classify("印表機")[0] == "other"
+        assert clf.classify("卡紙")[0] == "printer"
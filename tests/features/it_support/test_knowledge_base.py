@@ -0,0 +1,66 @@
+import json
+import pytest
+from features.it_support.knowledge_base import ITKnowledgeBase
+
+
+@pytest.fixture
+def kb():
+    return ITKnowledgeBase(graph_client=None)
+
+
+class TestGenerateKeywords:
+    def test_keeps_first_occurrence_order(self, kb):
+        words = kb._generate_keywords("印表機 卡紙 printer", "重新安裝 printer 驅動 印表機")
+        assert words == ["印表機", "卡紙", "printer", "重新安裝", "驅動"]
+
+    def test_skips_short_tokens(self, kb):
+        assert kb._generate_keywords("a 網 ab", "VPN") == ["VPN"]
+
+    def test_capped_at_ten(self, kb):
+        title = " ".join(f"kw{c}" for c in "abcdefghijkl")
+        words = kb._generate_keywords(title, "")
+        assert len(words) == 10
+        assert words[0] == "kwa"
+
+
+class FakeGraphClient:
+    def __init__(self):
+        self.uploads = []
+
+    async def upload_to_sharepoint(self, **kwargs):
+        self.uploads.append(kwargs)
+        return {"id": "1"}
+
+
+class TestResolvedTimestamp:
+    async def test_entry_and_path_share_one_timestamp(self):
+        from datetime import datetime
+        from features.it_support.knowledge_base import _TAIPEI
+
+        graph = FakeGraphClient()
+        kb = ITKnowledgeBase(graph_client=graph)
+        now = _TAIPEI.localize(datetime(2025, 1, 31, 23, 59, 59))
+        entry = kb.create_entry({"gid": "1", "name": "印表機"}, {"issue_id": "IT202501310001"}, now=now)
+        result = await kb.save_to_sharepoint(entry, now=now)
+
+        assert entry["metadata"]["resolved_at"] == "2025-01-31T23:59:59+08:00"
+        assert result["path"].endswith("/2025/01/IT202501310001.json")
+
+
+class TestDumpsEntry:
+    ENTRY = {
+        "metadata": {"entry_id": "IT1", "asana_task_gid": None},
+        "content": {"title": "印表機 \"卡紙\"", "dialogue": [{"role": "王", "text": "a\nb"}], "keywords": []},
+    }
+
+    def test_matches_stdlib_format(self):
+        from features.it_support.knowledge_base import _dumps_entry
+
+        expected = json.dumps(self.ENTRY, ensure_ascii=False, indent=2).encode("utf-8")
+        assert _dumps_entry(self.ENTRY) == expected
+
+    def test_stdlib_fallback(self, monkeypatch):
+        from features.it_support import knowledge_base
+
+        monkeypatch.setattr(knowledge_base, "orjson", None)
+        assert json.loads(knowledge_base._dumps_entry(self.ENTRY)) == self.ENTRY